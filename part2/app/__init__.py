@@ -1,10 +1,13 @@
+import atexit
+
 from flask import Flask
 from flask_restx import Api
 from config import Config
 from app.services.facade import HBnBFacade
+from app.persistence.repository import VersionedInMemoryRepository
 
-# Create a single instance of the facade
-facade = HBnBFacade()
+# Create a single instance of the facade, shared by all request threads
+facade = HBnBFacade(repository_class=VersionedInMemoryRepository)
 
 def create_app(config_class=Config):
     app = Flask(__name__)
@@ -13,6 +16,12 @@ def create_app(config_class=Config):
     # Store facade in app config for sharing
     app.config['facade'] = facade
     
+    snapshot_path = app.config.get('SNAPSHOT_PATH')
+    oplog_path = app.config.get('OPLOG_PATH')
+    if snapshot_path or oplog_path:
+        facade.open_storage(snapshot_path, oplog_path, app.config.get('OPLOG_SYNC_INTERVAL', 0.1))
+        atexit.register(facade.close_storage)
+    
     # Import and initialize API
     from app.api.v1 import api as api_v1
     api_v1.init_app(app)
@@ -25,6 +25,35 @@ place_output_model = api.model('Place', {
     'updated_at': fields.String(description='Last update timestamp')
 })
 
+place_nearby_model = api.inherit('PlaceNearby', place_output_model, {
+    'distance_km': fields.Float(description='Distance from the searched point in km')
+})
+
+RANGE_FILTERS = ('price_min', 'price_max', 'lat_min', 'lat_max', 'lon_min', 'lon_max')
+
+
+def number_arg(name, required=True):
+    """Float query parameter name; aborts with 400 when missing or invalid"""
+    value = request.args.get(name)
+    if value is None:
+        if required:
+            api.abort(400, f'{name} is required')
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        api.abort(400, f'{name} must be a number')
+
+
+def limit_arg():
+    """Optional positive integer ?limit= query parameter"""
+    limit = request.args.get('limit')
+    if limit is None:
+        return None
+    if not limit.isdigit() or int(limit) < 1:
+        api.abort(400, 'limit must be a positive integer')
+    return int(limit)
+
 @api.route('/')
 class PlaceList(Resource):
     @api.expect(place_input_model)
@@ -43,11 +72,68 @@ class PlaceList(Resource):
         
         return result, status_code
     
+    @api.doc(params={
+        'price_min': 'Minimum price per night',
+        'price_max': 'Maximum price per night',
+        'lat_min': 'Minimum latitude',
+        'lat_max': 'Maximum latitude',
+        'lon_min': 'Minimum longitude',
+        'lon_max': 'Maximum longitude',
+    })
     @api.marshal_list_with(place_output_model)
+    @api.response(400, 'Invalid range filter')
     def get(self):
-        """Get all places"""
+        """Get all places, optionally filtered by price/latitude/longitude ranges"""
         facade = current_app.config['facade']
-        result, status_code = facade.get_all_places()
+        filters = {}
+        for name in RANGE_FILTERS:
+            value = number_arg(name, required=False)
+            if value is not None:
+                filters[name] = value
+        
+        if filters:
+            result, status_code = facade.filter_places(**filters)
+        else:
+            result, status_code = facade.get_all_places()
+        return result, status_code
+
+@api.route('/nearby')
+class PlaceNearby(Resource):
+    @api.doc(params={
+        'lat': 'Latitude of the point',
+        'lon': 'Longitude of the point',
+        'radius_km': 'Search radius in km',
+        'limit': 'Maximum number of places',
+    })
+    @api.marshal_list_with(place_nearby_model)
+    @api.response(400, 'Invalid location')
+    def get(self):
+        """Get the places around a point, nearest first"""
+        facade = current_app.config['facade']
+        result, status_code = facade.get_places_nearby(
+            number_arg('lat'), number_arg('lon'), number_arg('radius_km'), limit_arg())
+        if status_code != 200:
+            api.abort(status_code, result['error'])
+        return result, status_code
+
+@api.route('/within')
+class PlaceWithin(Resource):
+    @api.doc(params={
+        'bbox': 'Bounding box "west,south,east,north" in degrees',
+        'limit': 'Maximum number of places',
+    })
+    @api.marshal_list_with(place_output_model)
+    @api.response(400, 'Invalid bounding box')
+    def get(self):
+        """Get the places inside a bounding box (map viewport)"""
+        facade = current_app.config['facade']
+        try:
+            west, south, east, north = (float(v) for v in request.args.get('bbox', '').split(','))
+        except ValueError:
+            api.abort(400, 'bbox must be "west,south,east,north"')
+        result, status_code = facade.get_places_within(south, west, north, east, limit_arg())
+        if status_code != 200:
+            api.abort(status_code, result['error'])
         return result, status_code
 
 @api.route('/<string:place_id>')
@@ -1,3 +1,4 @@
 from app.persistence.repository import InMemoryRepository
+from app.persistence import oplog, snapshot
 
-__all__ = ['InMemoryRepository']
+__all__ = ['InMemoryRepository', 'oplog', 'snapshot']
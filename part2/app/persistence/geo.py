@@ -0,0 +1,66 @@
+"""
+Geographic helpers for the spatial index of the repositories.
+Coordinates are in degrees, distances in kilometres.
+
+A bounding box is a (south, west, north, east) tuple. west > east means
+the box crosses the antimeridian (longitude 180).
+"""
+import math
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Great-circle distance between two points"""
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = (math.sin((lat2 - lat1) / 2) ** 2
+         + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def bounding_box(lat, lon, radius_km):
+    """Smallest bounding box holding every point within radius_km of (lat, lon)"""
+    angle = radius_km / EARTH_RADIUS_KM
+    delta_lat = math.degrees(angle)
+    south, north = lat - delta_lat, lat + delta_lat
+    if south <= -90 or north >= 90:
+        # The circle holds a pole: every longitude
+        return max(south, -90.0), -180.0, min(north, 90.0), 180.0
+
+    ratio = math.sin(angle) / math.cos(math.radians(lat))
+    if angle >= math.pi / 2 or ratio >= 1:
+        return south, -180.0, north, 180.0
+    delta_lon = math.degrees(math.asin(ratio))
+    west, east = lon - delta_lon, lon + delta_lon
+    if west < -180:
+        west += 360
+    if east > 180:
+        east -= 360
+    return south, west, north, east
+
+
+def split_antimeridian(bbox):
+    """The bounding box as one or two boxes that do not cross the antimeridian"""
+    south, west, north, east = bbox
+    if west <= east:
+        return [bbox]
+    return [(south, west, north, 180.0), (south, -180.0, north, east)]
+
+
+def check_bbox(bbox):
+    """Raise ValueError unless bbox is a valid (south, west, north, east) box"""
+    south, west, north, east = bbox
+    if not (-90 <= south <= north <= 90):
+        raise ValueError("bbox latitudes must be between -90 and 90, south <= north")
+    if not (-180 <= west <= 180 and -180 <= east <= 180):
+        raise ValueError("bbox longitudes must be between -180 and 180")
+
+
+def in_bbox(lat, lon, bbox):
+    """Whether (lat, lon) lies in bbox"""
+    south, west, north, east = bbox
+    if not south <= lat <= north:
+        return False
+    if west <= east:
+        return west <= lon <= east
+    return lon >= west or lon <= east
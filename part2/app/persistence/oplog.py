@@ -0,0 +1,137 @@
+"""
+Append-only operation log for the in-memory repositories.
+
+Every write made through a repository is appended as one record:
+    ('put', repository name, class name, object state)
+    ('delete', repository name, object id)
+
+A 'put' carries the full state of the object after the write, so replay
+restores it exactly (timestamps included) without running validation.
+
+Records are framed as I payload length, I crc32, pickled payload (little
+endian). A torn record at the end of the file, left by a crash in the
+middle of a write, ends the replay.
+
+Appends go to a buffered file. With a sync interval > 0 a background
+thread flushes and fsyncs the file every `sync_interval` seconds, so one
+fsync covers every write of that window (group commit) and at most that
+window of writes can be lost. With a sync interval of 0 every append is
+fsynced before it returns.
+"""
+import os
+import pickle
+import struct
+import threading
+import zlib
+
+_FRAME = struct.Struct("<II")
+
+
+class OperationLog:
+    """Append-only, group-committed log of repository writes"""
+
+    def __init__(self, path, sync_interval=0.1):
+        self.path = path
+        self.sync_interval = sync_interval
+        self._file = open(path, "ab")
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._closed = threading.Event()
+        self._flusher = None
+        if sync_interval > 0:
+            self._flusher = threading.Thread(target=self._flush_periodically,
+                                             name="oplog-flusher", daemon=True)
+            self._flusher.start()
+
+    def log_put(self, repo_name, obj):
+        self._append(("put", repo_name, type(obj).__name__, vars(obj)))
+
+    def log_delete(self, repo_name, obj_id):
+        self._append(("delete", repo_name, obj_id))
+
+    def sync(self):
+        """Flush buffered records and fsync them to disk"""
+        with self._lock:
+            if not self._dirty:
+                return
+            self._file.flush()
+            self._dirty = False
+            fileno = self._file.fileno()
+        os.fsync(fileno)
+
+    def truncate(self):
+        """Drop every record, e.g. after they were compacted into a snapshot"""
+        with self._lock:
+            self._file.flush()
+            self._file.truncate(0)
+            self._dirty = False
+            os.fsync(self._file.fileno())
+
+    def close(self):
+        if self._closed.is_set():
+            return
+        self._closed.set()
+        if self._flusher:
+            self._flusher.join()
+        self.sync()
+        self._file.close()
+
+    def _append(self, record):
+        payload = pickle.dumps(record, protocol=pickle.HIGHEST_PROTOCOL)
+        frame = _FRAME.pack(len(payload), zlib.crc32(payload))
+        with self._lock:
+            self._file.write(frame)
+            self._file.write(payload)
+            self._dirty = True
+        if not self._flusher:
+            self.sync()
+
+    def _flush_periodically(self):
+        while not self._closed.wait(self.sync_interval):
+            self.sync()
+
+
+def replay(path, repositories, classes):
+    """
+    Apply the records of the log at path to the `repositories` mapping
+    (name -> repository) and return how many were applied.
+
+    A torn or corrupt tail is cut off so that new records are appended
+    right after the last valid one.
+    """
+    if not os.path.exists(path):
+        return 0
+
+    applied = 0
+    valid_end = 0
+    with open(path, "rb") as f:
+        while True:
+            header = f.read(_FRAME.size)
+            if len(header) < _FRAME.size:
+                break
+            length, checksum = _FRAME.unpack(header)
+            payload = f.read(length)
+            if len(payload) < length or zlib.crc32(payload) != checksum:
+                break
+            _apply(pickle.loads(payload), repositories, classes)
+            applied += 1
+            valid_end = f.tell()
+
+    if valid_end < os.path.getsize(path):
+        with open(path, "r+b") as f:
+            f.truncate(valid_end)
+    return applied
+
+
+def _apply(record, repositories, classes):
+    op, repo_name = record[0], record[1]
+    repo = repositories[repo_name]
+    if op == "put":
+        cls = classes[record[2]]
+        obj = cls.__new__(cls)
+        obj.__dict__.update(record[3])
+        repo.add(obj)
+    elif op == "delete":
+        repo.delete(record[2])
+    else:
+        raise ValueError(f"Unknown operation log record {op!r}")
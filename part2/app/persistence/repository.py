@@ -1,4 +1,18 @@
+import copy
+import heapq
+import math
+import threading
 from abc import ABC, abstractmethod
+from bisect import bisect_left, bisect_right, insort
+from contextlib import ExitStack, nullcontext
+from operator import itemgetter
+from types import MappingProxyType
+
+from app.persistence.geo import bounding_box, haversine_km, in_bbox, split_antimeridian
+from app.persistence.locks import RWLock
+
+# Side of the cells of the spatial grid index, in degrees (about 11 km)
+GEO_CELL_DEGREES = 0.1
 
 class Repository(ABC):
     @abstractmethod
@@ -26,33 +40,503 @@ class Repository(ABC):
         pass
 
 class InMemoryRepository(Repository):
-    def __init__(self):
+    """
+    Dictionary-backed repository.
+
+    Attributes listed in `unique_indexes` or `indexes` get a secondary hash
+    index (value -> id, or value -> ids) kept in sync on add/update/delete,
+    so lookups on them do not scan the whole storage.
+
+    Attributes listed in `range_indexes` get an ordered index (a sorted list
+    of (value, id) pairs) answering range queries in O(log N + k).
+
+    `geo_index`, a (latitude attribute, longitude attribute) pair, gets a
+    spatial grid index: (row, column) cell of GEO_CELL_DEGREES -> ids,
+    answering bounding box and radius queries by visiting only the cells
+    they overlap.
+    """
+
+    def __init__(self, unique_indexes=(), indexes=(), range_indexes=(), geo_index=None):
         self._storage = {}
+        self._unique_indexes = {attr: {} for attr in unique_indexes}
+        # value -> dict of ids (used as an insertion-ordered set)
+        self._indexes = {attr: {} for attr in indexes}
+        self._range_indexes = {attr: [] for attr in range_indexes}
+        self._geo_index = geo_index
+        self._geo_cells = {}
+        self._log = None
+        self._log_name = None
     
+    def attach_log(self, log, name):
+        """Record every following write in an OperationLog under name"""
+        self._log = log
+        self._log_name = name
+
     def add(self, obj):
+        self._check_unique(obj.id, {attr: getattr(obj, attr, None)
+                                    for attr in self._unique_indexes})
+        if obj.id in self._storage:
+            self._unindex(self._storage[obj.id])
         self._storage[obj.id] = obj
+        self._index(obj)
+        if self._log:
+            self._log.log_put(self._log_name, obj)
+    
+    def read_locked(self, *obj_ids):
+        """
+        Context manager holding the objects with these ids for reading, so
+        that no write changes them meanwhile.
+        A no-op here; see ConcurrentInMemoryRepository.
+        """
+        return nullcontext()
+    
+    def write_locked(self, *obj_ids):
+        """
+        Context manager holding the objects with these ids for writing.
+        A no-op here; see ConcurrentInMemoryRepository.
+        """
+        return nullcontext()
     
+    def save(self, obj):
+        """
+        Record in-place changes made to a stored object outside update(),
+        such as its relation lists. Indexed attributes must not be changed
+        this way.
+        """
+        if self._log:
+            self._log.log_put(self._log_name, obj)
+
     def get(self, obj_id):
         return self._storage.get(obj_id)
-    
+
     def get_all(self):
         return list(self._storage.values())
-    
+
     def update(self, obj_id, data):
         obj = self.get(obj_id)
         if obj:
-            obj.update(data)
+            self._check_unique(obj_id, {attr: data[attr] for attr in self._unique_indexes
+                                        if attr in data})
+            self._unindex(obj)
+            obj = self._writable(obj)
+            try:
+                obj.update(data)
+            finally:
+                self._index(obj)
+                if self._log:
+                    self._log.log_put(self._log_name, obj)
             return obj
         return None
-    
+
     def delete(self, obj_id):
         if obj_id in self._storage:
+            self._unindex(self._storage[obj_id])
             del self._storage[obj_id]
+            if self._log:
+                self._log.log_delete(self._log_name, obj_id)
             return True
         return False
-    
+
     def get_by_attribute(self, attr_name, attr_value):
+        if attr_name in self._unique_indexes:
+            obj_id = self._unique_indexes[attr_name].get(attr_value)
+            return self._storage.get(obj_id) if obj_id is not None else None
+        if attr_name in self._indexes:
+            for obj_id in self._indexes[attr_name].get(attr_value, ()):
+                return self._storage[obj_id]
+            return None
         for obj in self._storage.values():
             if hasattr(obj, attr_name) and getattr(obj, attr_name) == attr_value:
                 return obj
         return None
+
+    def get_all_by_attribute(self, attr_name, attr_value):
+        """Return every object whose attribute equals attr_value"""
+        if attr_name in self._unique_indexes:
+            obj_id = self._unique_indexes[attr_name].get(attr_value)
+            return [self._storage[obj_id]] if obj_id is not None else []
+        if attr_name in self._indexes:
+            return [self._storage[obj_id]
+                    for obj_id in self._indexes[attr_name].get(attr_value, ())]
+        return [obj for obj in self._storage.values()
+                if hasattr(obj, attr_name) and getattr(obj, attr_name) == attr_value]
+
+    def get_range(self, attr_name, low=None, high=None):
+        """
+        Return every object whose attribute lies in [low, high], in
+        ascending order of that attribute. Either bound may be None.
+        Objects whose attribute is None are never returned.
+        """
+        return [self._storage[obj_id] for obj_id in self.get_range_ids(attr_name, low, high)]
+
+    def get_range_ids(self, attr_name, low=None, high=None):
+        """Same as get_range but returns ids only"""
+        if attr_name not in self._range_indexes:
+            raise KeyError(f"No range index on {attr_name}")
+        entries = self._range_indexes[attr_name]
+        start = 0 if low is None else bisect_left(entries, low, key=itemgetter(0))
+        end = len(entries) if high is None else bisect_right(entries, high, key=itemgetter(0))
+        return [obj_id for _, obj_id in entries[start:end]]
+
+    def range_index_entries(self):
+        """Sorted (value, id) entries of every range index, by attribute"""
+        return {attr: list(entries) for attr, entries in self._range_indexes.items()}
+
+    def get_within(self, bbox, limit=None):
+        """
+        Return the objects located in bbox, a (south, west, north, east)
+        box in degrees (west > east crosses the antimeridian), at most
+        limit of them, in no particular order. Needs the geo index.
+        """
+        lat_attr, lon_attr = self._geo_attrs()
+        found = []
+        for ids in self._geo_cells_in(bbox):
+            for obj_id in ids:
+                obj = self._storage[obj_id]
+                if in_bbox(getattr(obj, lat_attr), getattr(obj, lon_attr), bbox):
+                    found.append(obj)
+                    if limit is not None and len(found) >= limit:
+                        return found
+        return found
+
+    def get_nearby(self, lat, lon, radius_km, limit=None):
+        """
+        Return (distance in km, object) pairs for the objects within
+        radius_km of (lat, lon), nearest first, at most limit of them.
+        Needs the geo index.
+        """
+        lat_attr, lon_attr = self._geo_attrs()
+        found = []
+        for obj in self.get_within(bounding_box(lat, lon, radius_km)):
+            distance = haversine_km(lat, lon, getattr(obj, lat_attr), getattr(obj, lon_attr))
+            if distance <= radius_km:
+                found.append((distance, obj))
+        if limit is None:
+            found.sort(key=itemgetter(0))
+            return found
+        return heapq.nsmallest(limit, found, key=itemgetter(0))
+    
+    def load(self, objects, range_index_entries=None):
+        """
+        Replace the whole content of the repository with objects.
+        Indexes are rebuilt in bulk, which is much cheaper than add() per
+        object for large stores. Range indexes found in range_index_entries
+        (as returned by range_index_entries()) are reused instead of sorted.
+        """
+        range_index_entries = range_index_entries or {}
+        self._storage = {obj.id: obj for obj in objects}
+        ids = list(self._storage)
+        objects = list(self._storage.values())
+        
+        for attr in self._unique_indexes:
+            self._unique_indexes[attr] = dict(zip(self._column(objects, attr), ids))
+        for attr in self._indexes:
+            index = self._indexes[attr] = {}
+            for value, obj_id in zip(self._column(objects, attr), ids):
+                index.setdefault(value, {})[obj_id] = None
+        for attr in self._range_indexes:
+            if attr in range_index_entries:
+                self._range_indexes[attr] = range_index_entries[attr]
+                continue
+            entries = [entry for entry in zip(self._column(objects, attr), ids) if entry[0] is not None]
+            entries.sort()
+            self._range_indexes[attr] = entries
+        self._geo_cells = {}
+        if self._geo_index:
+            for obj in objects:
+                self._index_geo(obj)
+    
+    def _writable(self, obj):
+        """Return the stored object that update() may modify in place"""
+        return obj
+    
+    def _geo_attrs(self):
+        if self._geo_index is None:
+            raise KeyError("No geo index")
+        return self._geo_index
+
+    def _geo_cell(self, obj):
+        """(row, column) of the grid cell of obj, None without coordinates"""
+        lat_attr, lon_attr = self._geo_index
+        lat, lon = getattr(obj, lat_attr, None), getattr(obj, lon_attr, None)
+        if lat is None or lon is None:
+            return None
+        return math.floor(lat / GEO_CELL_DEGREES), math.floor(lon / GEO_CELL_DEGREES)
+
+    def _geo_cells_in(self, bbox):
+        """Id sets of the non-empty grid cells overlapping bbox"""
+        cells = self._geo_cells
+        for south, west, north, east in split_antimeridian(bbox):
+            rows = range(math.floor(south / GEO_CELL_DEGREES), math.floor(north / GEO_CELL_DEGREES) + 1)
+            cols = range(math.floor(west / GEO_CELL_DEGREES), math.floor(east / GEO_CELL_DEGREES) + 1)
+            if len(rows) * len(cols) <= len(cells):
+                for row in rows:
+                    for col in cols:
+                        ids = cells.get((row, col))
+                        if ids:
+                            yield ids
+            else:
+                # Fewer non-empty cells than cells in the box
+                for (row, col), ids in cells.items():
+                    if row in rows and col in cols:
+                        yield ids
+
+    @staticmethod
+    def _column(objects, attr):
+        """Values of attr for every object (None when missing)"""
+        return [getattr(obj, attr, None) for obj in objects]
+
+    # Index maintenance
+
+    def _check_unique(self, obj_id, values):
+        """Raise ValueError if another object already holds one of the values"""
+        for attr, value in values.items():
+            owner_id = self._unique_indexes[attr].get(value)
+            if owner_id is not None and owner_id != obj_id:
+                raise ValueError(f"{attr} already exists")
+
+    def _index(self, obj):
+        self._index_hash(obj)
+        for attr, entries in self._range_indexes.items():
+            value = getattr(obj, attr, None)
+            if value is not None:
+                insort(entries, (value, obj.id))
+        if self._geo_index:
+            self._index_geo(obj)
+
+    def _index_geo(self, obj):
+        cell = self._geo_cell(obj)
+        if cell is not None:
+            self._geo_cells.setdefault(cell, {})[obj.id] = None
+
+    def _index_hash(self, obj):
+        for attr, index in self._unique_indexes.items():
+            if hasattr(obj, attr):
+                index[getattr(obj, attr)] = obj.id
+        for attr, index in self._indexes.items():
+            if hasattr(obj, attr):
+                index.setdefault(getattr(obj, attr), {})[obj.id] = None
+
+    def _unindex(self, obj):
+        for attr, index in self._unique_indexes.items():
+            value = getattr(obj, attr, None)
+            if index.get(value) == obj.id:
+                del index[value]
+        for attr, index in self._indexes.items():
+            value = getattr(obj, attr, None)
+            ids = index.get(value)
+            if ids is not None:
+                ids.pop(obj.id, None)
+                if not ids:
+                    del index[value]
+        for attr, entries in self._range_indexes.items():
+            value = getattr(obj, attr, None)
+            if value is not None:
+                pos = bisect_left(entries, (value, obj.id))
+                if pos < len(entries) and entries[pos] == (value, obj.id):
+                    del entries[pos]
+        if self._geo_index:
+            cell = self._geo_cell(obj)
+            ids = self._geo_cells.get(cell)
+            if ids is not None:
+                ids.pop(obj.id, None)
+                if not ids:
+                    del self._geo_cells[cell]
+
+
+class ConcurrentInMemoryRepository(InMemoryRepository):
+    """
+    Thread-safe InMemoryRepository for multi-threaded servers.
+    
+    Objects are spread over `stripes` reader/writer locks by id. Every write
+    holds the stripe of its object, and read_locked()/write_locked() let
+    callers hold several objects at once (the facade uses them to make
+    multi-entity operations atomic).
+    
+    The storage dict and the indexes are shared by all objects. Writes to
+    them are serialized by one structure lock and bump a version number
+    before and after (odd while a write is in progress). Reads run without
+    any lock and are retried if the version moved meanwhile (a seqlock),
+    falling back to the structure lock after a few conflicts, so readers
+    never wait for each other and rarely for writers.
+    
+    Locks are always taken stripe first, then structure, in ascending
+    stripe order.
+    """
+    
+    OPTIMISTIC_READS = 3
+    
+    def __init__(self, unique_indexes=(), indexes=(), range_indexes=(), geo_index=None, stripes=16):
+        super().__init__(unique_indexes, indexes, range_indexes, geo_index)
+        self._stripes = [RWLock() for _ in range(stripes)]
+        self._structure_lock = threading.RLock()
+        self._version = 0
+    
+    def _stripe(self, obj_id):
+        return self._stripes[hash(obj_id) % len(self._stripes)]
+    
+    def read_locked(self, *obj_ids):
+        """Hold the stripes of every id for reading (deadlock-free ordering)"""
+        return self._locked(obj_ids, RWLock.read_locked)
+    
+    def write_locked(self, *obj_ids):
+        """Hold the stripes of every id for writing (deadlock-free ordering)"""
+        return self._locked(obj_ids, RWLock.write_locked)
+    
+    def _locked(self, obj_ids, mode):
+        stack = ExitStack()
+        indexes = sorted({hash(obj_id) % len(self._stripes) for obj_id in obj_ids})
+        try:
+            for index in indexes:
+                stack.enter_context(mode(self._stripes[index]))
+        except BaseException:
+            stack.close()
+            raise
+        return stack
+    
+    def _write(self, method, *args):
+        with self._structure_lock:
+            self._version += 1
+            try:
+                return method(self, *args)
+            finally:
+                self._version += 1
+    
+    def _read(self, method, *args):
+        for _ in range(self.OPTIMISTIC_READS):
+            version = self._version
+            if version & 1:
+                continue
+            try:
+                result = method(self, *args)
+            except Exception:
+                # Most likely a write changed the structure under us; a
+                # genuine error is raised again by the locked read below
+                continue
+            if self._version == version:
+                return result
+        with self._structure_lock:
+            return method(self, *args)
+    
+    def add(self, obj):
+        with self._stripe(obj.id).write_locked():
+            self._write(InMemoryRepository.add, obj)
+    
+    def get(self, obj_id):
+        # A single dict lookup is atomic, and a lock would not cover the
+        # caller's use of the object anyway; see read_locked()
+        return self._storage.get(obj_id)
+    
+    def get_all(self):
+        return self._read(InMemoryRepository.get_all)
+    
+    def update(self, obj_id, data):
+        with self._stripe(obj_id).write_locked():
+            return self._write(InMemoryRepository.update, obj_id, data)
+    
+    def delete(self, obj_id):
+        with self._stripe(obj_id).write_locked():
+            return self._write(InMemoryRepository.delete, obj_id)
+    
+    def save(self, obj):
+        with self._stripe(obj.id).write_locked():
+            super().save(obj)
+    
+    def get_by_attribute(self, attr_name, attr_value):
+        return self._read(InMemoryRepository.get_by_attribute, attr_name, attr_value)
+    
+    def get_all_by_attribute(self, attr_name, attr_value):
+        return self._read(InMemoryRepository.get_all_by_attribute, attr_name, attr_value)
+    
+    def get_range(self, attr_name, low=None, high=None):
+        return self._read(InMemoryRepository.get_range, attr_name, low, high)
+    
+    def get_range_ids(self, attr_name, low=None, high=None):
+        return self._read(InMemoryRepository.get_range_ids, attr_name, low, high)
+    
+    def range_index_entries(self):
+        return self._read(InMemoryRepository.range_index_entries)
+    
+    def get_within(self, bbox, limit=None):
+        return self._read(InMemoryRepository.get_within, bbox, limit)
+    
+    def get_nearby(self, lat, lon, radius_km, limit=None):
+        return self._read(InMemoryRepository.get_nearby, lat, lon, radius_km, limit)
+    
+    def load(self, objects, range_index_entries=None):
+        self._write(InMemoryRepository.load, objects, range_index_entries)
+
+
+class StorageVersion:
+    """
+    One published, immutable state of a VersionedInMemoryRepository.
+    `objects` maps ids to objects; `values` is built once per version.
+    """
+    __slots__ = ('number', 'objects', 'taken', '_values')
+    
+    def __init__(self, number, objects):
+        self.number = number
+        self.objects = MappingProxyType(objects)
+        # Set once a reader may hold this version; writers then stop
+        # modifying its dict in place
+        self.taken = False
+        self._values = None
+    
+    @property
+    def values(self):
+        if self._values is None:
+            self._values = tuple(self.objects.values())
+        return self._values
+
+
+class VersionedInMemoryRepository(ConcurrentInMemoryRepository):
+    """
+    ConcurrentInMemoryRepository whose storage is copy-on-write (MVCC).
+    
+    Every write publishes a new StorageVersion. current() hands out the
+    latest one without copying or locking, and it never changes afterwards:
+    the next write copies the storage dict before modifying it (only if a
+    reader took the version, so bulk writes with no readers in between copy
+    nothing), and update() modifies a copy of the object. get_all() returns
+    the tuple of the current version, shared by every reader until the
+    next write.
+    
+    Writes cost O(N) once a version was read, which suits read-mostly
+    stores. Relation lists changed in place and then save()d (places,
+    reviews, amenities) are shared by the versions holding the object.
+    """
+    
+    def __init__(self, unique_indexes=(), indexes=(), range_indexes=(), geo_index=None, stripes=16):
+        super().__init__(unique_indexes, indexes, range_indexes, geo_index, stripes)
+        self._current = StorageVersion(self._version, self._storage)
+    
+    def current(self):
+        """Return the latest published StorageVersion"""
+        version = self._current
+        version.taken = True
+        if self._version == version.number:
+            return version
+        # A write started meanwhile and may not have seen `taken`
+        with self._structure_lock:
+            version = self._current
+            version.taken = True
+            return version
+    
+    def get_all(self):
+        return self.current().values
+    
+    def _write(self, method, *args):
+        with self._structure_lock:
+            self._version += 1
+            if self._current.taken:
+                self._storage = dict(self._storage)
+            try:
+                return method(self, *args)
+            finally:
+                self._version += 1
+                self._current = StorageVersion(self._version, self._storage)
+    
+    def _writable(self, obj):
+        obj = copy.copy(obj)
+        self._storage[obj.id] = obj
+        return obj
@@ -0,0 +1,133 @@
+"""
+Binary snapshots of the in-memory repositories.
+
+File layout (little endian):
+    header   8s magic, H format version, H number of sections
+    section  H name length, name (utf-8), Q payload length, payload
+
+Each section holds one repository. Its payload is a pickled pair:
+a list of (class name, attribute names, rows) groups, where every row is
+the tuple of attribute values of one object, and the sorted entries of
+the repository's range indexes so they need not be sorted again.
+
+Loading memory-maps the file and rebuilds objects with __new__, filling
+their __dict__ directly: the validating property setters are skipped, so
+only load snapshots written by this application.
+
+The cyclic garbage collector is paused while saving and loading. It would
+otherwise run over the whole, growing heap many times for millions of
+freshly allocated objects that contain no cycles.
+"""
+import gc
+import mmap
+import os
+import pickle
+import struct
+
+MAGIC = b"HBNBSNAP"
+VERSION = 1
+
+_HEADER = struct.Struct("<8sHH")
+_NAME_LENGTH = struct.Struct("<H")
+_PAYLOAD_LENGTH = struct.Struct("<Q")
+
+
+def save(path, repositories):
+    """
+    Write every repository of the `repositories` mapping (name -> repository)
+    to path. The file is replaced atomically.
+    """
+    tmp_path = f"{path}.tmp"
+    with _gc_paused(), open(tmp_path, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, VERSION, len(repositories)))
+        for name, repo in repositories.items():
+            encoded_name = name.encode("utf-8")
+            payload = pickle.dumps((_encode(repo.get_all()), repo.range_index_entries()),
+                                   protocol=pickle.HIGHEST_PROTOCOL)
+            f.write(_NAME_LENGTH.pack(len(encoded_name)))
+            f.write(encoded_name)
+            f.write(_PAYLOAD_LENGTH.pack(len(payload)))
+            f.write(payload)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def load(path, repositories, classes):
+    """
+    Load the snapshot at path into the `repositories` mapping.
+
+    `classes` maps class names to model classes. Sections without a
+    matching repository are ignored.
+
+    Raises:
+        ValueError: If path is not a snapshot of a supported version
+    """
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size < _HEADER.size:
+            raise ValueError(f"{path} is not an HBnB snapshot")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            view = memoryview(mm)
+            try:
+                with _gc_paused():
+                    _load_sections(view, repositories, classes, path)
+            finally:
+                view.release()
+
+
+class _gc_paused:
+    """Context manager disabling the cyclic garbage collector"""
+
+    def __enter__(self):
+        self._was_enabled = gc.isenabled()
+        gc.disable()
+
+    def __exit__(self, *exc_info):
+        if self._was_enabled:
+            gc.enable()
+
+
+def _load_sections(view, repositories, classes, path):
+    magic, version, count = _HEADER.unpack_from(view, 0)
+    if magic != MAGIC:
+        raise ValueError(f"{path} is not an HBnB snapshot")
+    if version != VERSION:
+        raise ValueError(f"Unsupported snapshot version {version}")
+
+    offset = _HEADER.size
+    for _ in range(count):
+        (name_length,) = _NAME_LENGTH.unpack_from(view, offset)
+        offset += _NAME_LENGTH.size
+        name = bytes(view[offset:offset + name_length]).decode("utf-8")
+        offset += name_length
+        (payload_length,) = _PAYLOAD_LENGTH.unpack_from(view, offset)
+        offset += _PAYLOAD_LENGTH.size
+
+        if name in repositories:
+            with view[offset:offset + payload_length] as payload:
+                groups, range_index_entries = pickle.loads(payload)
+            repositories[name].load(_decode(groups, classes), range_index_entries)
+        offset += payload_length
+
+
+def _encode(objects):
+    """Group objects by (class, attribute names) and flatten them to rows"""
+    groups = {}
+    for obj in objects:
+        state = vars(obj)
+        key = (type(obj).__name__, tuple(state))
+        groups.setdefault(key, []).append(tuple(state.values()))
+    return [(cls_name, keys, rows) for (cls_name, keys), rows in groups.items()]
+
+
+def _decode(groups, classes):
+    """Rebuild objects from the rows produced by _encode, skipping __init__"""
+    objects = []
+    for cls_name, keys, rows in groups:
+        cls = classes[cls_name]
+        new = cls.__new__
+        for row in rows:
+            obj = new(cls)
+            obj.__dict__.update(zip(keys, row))
+            objects.append(obj)
+    return objects
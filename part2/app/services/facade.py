@@ -1,15 +1,85 @@
+import os
+
 from app.models.user import User
 from app.models.place import Place
 from app.models.review import Review
 from app.models.amenity import Amenity
+from app.persistence.geo import check_bbox
 from app.persistence.repository import InMemoryRepository
+from app.persistence import oplog, snapshot
+
+MODEL_CLASSES = {cls.__name__: cls for cls in (User, Place, Review, Amenity)}
+
+MAX_NEARBY_RADIUS_KM = 1000
 
 class HBnBFacade:
-    def __init__(self):
-        self.user_repo = InMemoryRepository()
-        self.place_repo = InMemoryRepository()
-        self.review_repo = InMemoryRepository()
-        self.amenity_repo = InMemoryRepository()
+    def __init__(self, repository_class=InMemoryRepository):
+        """
+        repository_class is InMemoryRepository for single-threaded use, or
+        ConcurrentInMemoryRepository (or its copy-on-write variant
+        VersionedInMemoryRepository) when the facade is shared by threads.
+        Multi-entity operations lock the entities they touch in the fixed
+        order users, places, reviews.
+        """
+        self.user_repo = repository_class(unique_indexes=['email'])
+        self.place_repo = repository_class(indexes=['owner_id'],
+                                           range_indexes=['price', 'latitude', 'longitude'],
+                                           geo_index=('latitude', 'longitude'))
+        self.review_repo = repository_class(indexes=['user_id', 'place_id'])
+        self.amenity_repo = repository_class()
+        self._snapshot_path = None
+        self._oplog = None
+    
+    # Snapshot methods
+    def _repositories(self):
+        return {
+            'users': self.user_repo,
+            'places': self.place_repo,
+            'reviews': self.review_repo,
+            'amenities': self.amenity_repo,
+        }
+    
+    def save_snapshot(self, path):
+        """Write all repositories to a binary snapshot file"""
+        snapshot.save(path, self._repositories())
+    
+    def load_snapshot(self, path):
+        """Replace all repositories with the content of a trusted snapshot file"""
+        snapshot.load(path, self._repositories(), MODEL_CLASSES)
+    
+    def open_storage(self, snapshot_path=None, oplog_path=None, sync_interval=0.1):
+        """
+        Restore data on startup: load the snapshot, replay the operation log
+        on top of it and compact both into a fresh snapshot. Every following
+        write is then appended to the operation log.
+        """
+        repositories = self._repositories()
+        self._snapshot_path = snapshot_path
+        if snapshot_path and os.path.exists(snapshot_path):
+            self.load_snapshot(snapshot_path)
+        
+        if oplog_path:
+            replayed = oplog.replay(oplog_path, repositories, MODEL_CLASSES)
+            self._oplog = oplog.OperationLog(oplog_path, sync_interval)
+            if replayed and snapshot_path:
+                self.compact_storage()
+            for name, repo in repositories.items():
+                repo.attach_log(self._oplog, name)
+    
+    def compact_storage(self):
+        """Fold the operation log into a new snapshot and empty the log"""
+        if not self._snapshot_path:
+            return
+        self.save_snapshot(self._snapshot_path)
+        if self._oplog:
+            self._oplog.truncate()
+    
+    def close_storage(self):
+        """Compact and close the storage opened by open_storage()"""
+        self.compact_storage()
+        if self._oplog:
+            self._oplog.close()
+            self._oplog = None
     
     # User methods
     def create_user(self, user_data):
@@ -51,7 +121,7 @@ class HBnBFacade:
                 if existing_user:
                     return {'error': 'Email already exists'}, 400
             
-            user.update(user_data)
+            user = self.user_repo.update(user_id, user_data)
             return user.to_dict(), 200
         except ValueError as e:
             return {'error': str(e)}, 400
@@ -74,34 +144,37 @@ class HBnBFacade:
                 print(f"    Email: {u.email}")
                 print(f"    Has places attr: {hasattr(u, 'places')}")
             
-            # Verify owner exists
-            owner = self.user_repo.get(owner_id)
-            print(f"Owner found: {owner is not None}")
+            # Hold the owner so that its places list is updated atomically
+            with self.user_repo.write_locked(owner_id):
+                # Verify owner exists
+                owner = self.user_repo.get(owner_id)
+                print(f"Owner found: {owner is not None}")
             
-            if not owner:
-                print(f"Owner NOT found with ID: {owner_id}")
-                return {'error': f'Owner not found with ID: {owner_id}'}, 400
+                if not owner:
+                    print(f"Owner NOT found with ID: {owner_id}")
+                    return {'error': f'Owner not found with ID: {owner_id}'}, 400
             
-            print(f"Owner found: {owner.first_name} {owner.last_name}")
-            print(f"Owner places before: {owner.places if hasattr(owner, 'places') else 'No places attr'}")
+                print(f"Owner found: {owner.first_name} {owner.last_name}")
+                print(f"Owner places before: {owner.places if hasattr(owner, 'places') else 'No places attr'}")
             
-            place = Place(**place_data)
-            print(f"Place created with ID: {place.id}")
+                place = Place(**place_data)
+                print(f"Place created with ID: {place.id}")
             
-            self.place_repo.add(place)
-            print(f"Place added to repository")
+                self.place_repo.add(place)
+                print(f"Place added to repository")
             
-            # Add place to owner's places list
-            if hasattr(owner, 'places'):
-                owner.places.append(place.id)
-                print(f"Added place to owner's places list")
-                print(f"Owner places after: {owner.places}")
-            else:
-                print(f"WARNING: Owner has no 'places' attribute!")
+                # Add place to owner's places list
+                if hasattr(owner, 'places'):
+                    owner.places.append(place.id)
+                    self.user_repo.save(owner)
+                    print(f"Added place to owner's places list")
+                    print(f"Owner places after: {owner.places}")
+                else:
+                    print(f"WARNING: Owner has no 'places' attribute!")
             
-            print("=== END DEBUG ===\n")
+                print("=== END DEBUG ===\n")
             
-            return place.to_dict(), 201
+                return place.to_dict(), 201
         except ValueError as e:
             print(f"ValueError in create_place: {str(e)}")
             return {'error': str(e)}, 400
@@ -155,6 +228,65 @@ class HBnBFacade:
             places.append(place_dict)
         return places, 200
     
+    def get_places_by_owner(self, owner_id):
+        """Get all places owned by a user"""
+        if not self.user_repo.get(owner_id):
+            return {'error': 'User not found'}, 404
+        places = [place.to_dict() for place in self.place_repo.get_all_by_attribute('owner_id', owner_id)]
+        return places, 200
+    
+    def filter_places(self, price_min=None, price_max=None, lat_min=None, lat_max=None,
+                      lon_min=None, lon_max=None):
+        """Get places whose price, latitude and longitude fall in the given ranges"""
+        ranges = [
+            ('price', price_min, price_max),
+            ('latitude', lat_min, lat_max),
+            ('longitude', lon_min, lon_max),
+        ]
+        ranges = [r for r in ranges if r[1] is not None or r[2] is not None]
+        if not ranges:
+            return [place.to_dict() for place in self.place_repo.get_all()], 200
+        
+        # Walk the narrowest range in order and intersect with the others
+        id_lists = [self.place_repo.get_range_ids(*r) for r in ranges]
+        id_lists.sort(key=len)
+        others = [set(ids) for ids in id_lists[1:]]
+        places = []
+        for place_id in id_lists[0]:
+            place = self.place_repo.get(place_id)
+            # place may have been deleted since the ranges were read
+            if place and all(place_id in ids for ids in others):
+                places.append(place.to_dict())
+        return places, 200
+    
+    def get_places_nearby(self, lat, lon, radius_km, limit=None):
+        """
+        Get the places within radius_km of (lat, lon), nearest first, each
+        with its distance_km
+        """
+        if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+            return {'error': 'lat must be between -90 and 90, lon between -180 and 180'}, 400
+        if not 0 < radius_km <= MAX_NEARBY_RADIUS_KM:
+            return {'error': f'radius_km must be between 0 and {MAX_NEARBY_RADIUS_KM}'}, 400
+        places = []
+        for distance, place in self.place_repo.get_nearby(lat, lon, radius_km, limit):
+            place_dict = place.to_dict()
+            place_dict['distance_km'] = round(distance, 3)
+            places.append(place_dict)
+        return places, 200
+    
+    def get_places_within(self, south, west, north, east, limit=None):
+        """
+        Get the places inside a bounding box, e.g. a map viewport; west >
+        east for a box crossing the antimeridian
+        """
+        try:
+            check_bbox((south, west, north, east))
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        places = self.place_repo.get_within((south, west, north, east), limit)
+        return [place.to_dict() for place in places], 200
+    
     def update_place(self, place_id, place_data):
         """Update place"""
         place = self.place_repo.get(place_id)
@@ -166,7 +298,7 @@ class HBnBFacade:
             del place_data['owner_id']
         
         try:
-            place.update(place_data)
+            place = self.place_repo.update(place_id, place_data)
             return place.to_dict(), 200
         except ValueError as e:
             return {'error': str(e)}, 400
@@ -175,24 +307,29 @@ class HBnBFacade:
     def create_review(self, review_data):
         """Create a new review with validation"""
         try:
-            # Verify user exists
-            user = self.user_repo.get(review_data.get('user_id'))
-            if not user:
-                return {'error': 'User not found'}, 400
+            # Hold the user and the place so that both reviews lists are updated atomically
+            with self.user_repo.write_locked(review_data.get('user_id')), \
+                    self.place_repo.write_locked(review_data.get('place_id')):
+                # Verify user exists
+                user = self.user_repo.get(review_data.get('user_id'))
+                if not user:
+                    return {'error': 'User not found'}, 400
             
-            # Verify place exists
-            place = self.place_repo.get(review_data.get('place_id'))
-            if not place:
-                return {'error': 'Place not found'}, 400
+                # Verify place exists
+                place = self.place_repo.get(review_data.get('place_id'))
+                if not place:
+                    return {'error': 'Place not found'}, 400
             
-            review = Review(**review_data)
-            self.review_repo.add(review)
+                review = Review(**review_data)
+                self.review_repo.add(review)
             
-            # Add review to user and place
-            user.reviews.append(review.id)
-            place.reviews.append(review.id)
+                # Add review to user and place
+                user.reviews.append(review.id)
+                place.reviews.append(review.id)
+                self.user_repo.save(user)
+                self.place_repo.save(place)
             
-            return review.to_dict(), 201
+                return review.to_dict(), 201
         except ValueError as e:
             return {'error': str(e)}, 400
     
@@ -244,7 +381,7 @@ class HBnBFacade:
             del review_data['place_id']
         
         try:
-            review.update(review_data)
+            review = self.review_repo.update(review_id, review_data)
             return review.to_dict(), 200
         except ValueError as e:
             return {'error': str(e)}, 400
@@ -255,18 +392,28 @@ class HBnBFacade:
         if not review:
             return {'error': 'Review not found'}, 404
         
-        # Remove review from user and place
-        user = self.user_repo.get(review.user_id)
-        if user and review.id in user.reviews:
-            user.reviews.remove(review.id)
-        
-        place = self.place_repo.get(review.place_id)
-        if place and review.id in place.reviews:
-            place.reviews.remove(review.id)
-        
-        if self.review_repo.delete(review_id):
-            return {'message': 'Review deleted successfully'}, 200
-        return {'error': 'Failed to delete review'}, 500
+        # Hold the user, the place and the review so that the three changes are atomic
+        with self.user_repo.write_locked(review.user_id), \
+                self.place_repo.write_locked(review.place_id), \
+                self.review_repo.write_locked(review_id):
+            # Another thread may have deleted it meanwhile
+            if not self.review_repo.get(review_id):
+                return {'error': 'Review not found'}, 404
+            
+            # Remove review from user and place
+            user = self.user_repo.get(review.user_id)
+            if user and review.id in user.reviews:
+                user.reviews.remove(review.id)
+                self.user_repo.save(user)
+            
+            place = self.place_repo.get(review.place_id)
+            if place and review.id in place.reviews:
+                place.reviews.remove(review.id)
+                self.place_repo.save(place)
+            
+            if self.review_repo.delete(review_id):
+                return {'message': 'Review deleted successfully'}, 200
+            return {'error': 'Failed to delete review'}, 500
     
     # Amenity methods
     def create_amenity(self, amenity_data):
@@ -297,7 +444,7 @@ class HBnBFacade:
             return {'error': 'Amenity not found'}, 404
         
         try:
-            amenity.update(amenity_data)
+            amenity = self.amenity_repo.update(amenity_id, amenity_data)
             return amenity.to_dict(), 200
         except ValueError as e:
             return {'error': str(e)}, 400
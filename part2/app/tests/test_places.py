@@ -101,3 +101,40 @@ class TestPlaceEndpoints(unittest.TestCase):
         """Test getting a non-existent place"""
         response = self.client.get('/api/v1/places/non-existent-id')
         self.assertEqual(response.status_code, 404)
+
+class TestPlaceSearchEndpoints(unittest.TestCase):
+    
+    @classmethod
+    def setUpClass(cls):
+        app = create_app()
+        app.testing = True
+        cls.client = app.test_client()
+        user = cls.client.post('/api/v1/users/', json={
+            "first_name": "Geo", "last_name": "Owner", "email": "geo-owner@example.com"
+        })
+        owner_id = json.loads(user.data)['id']
+        for title, lat, lon in (("Eiffel", 48.8584, 2.2945), ("Louvre", 48.8606, 2.3376),
+                                ("Lyon", 45.7640, 4.8357)):
+            cls.client.post('/api/v1/places/', json={
+                "title": title, "price": 100, "latitude": lat, "longitude": lon, "owner_id": owner_id
+            })
+    
+    def test_1_nearby(self):
+        """Test places around a point, nearest first with their distance"""
+        response = self.client.get('/api/v1/places/nearby?lat=48.8606&lon=2.3376&radius_km=10')
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.data)
+        self.assertEqual([p['title'] for p in data], ["Louvre", "Eiffel"])
+        self.assertEqual(data[0]['distance_km'], 0)
+    
+    def test_2_within(self):
+        """Test places inside a bounding box"""
+        response = self.client.get('/api/v1/places/within?bbox=4,45,5,46')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([p['title'] for p in json.loads(response.data)], ["Lyon"])
+    
+    def test_3_invalid_search(self):
+        """Test invalid locations are rejected"""
+        self.assertEqual(self.client.get('/api/v1/places/nearby?lat=91&lon=0&radius_km=5').status_code, 400)
+        self.assertEqual(self.client.get('/api/v1/places/nearby?lat=1&lon=0').status_code, 400)
+        self.assertEqual(self.client.get('/api/v1/places/within?bbox=1,2,3').status_code, 400)
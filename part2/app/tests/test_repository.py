@@ -0,0 +1,307 @@
+import os
+import tempfile
+import threading
+import unittest
+from app.models.user import User
+from app.models.place import Place
+from app.persistence.locks import RWLock
+from app.persistence.repository import (
+    InMemoryRepository, ConcurrentInMemoryRepository, VersionedInMemoryRepository
+)
+from app.services.facade import HBnBFacade
+
+class TestInMemoryRepositoryIndexes(unittest.TestCase):
+    
+    def setUp(self):
+        self.users = InMemoryRepository(unique_indexes=['email'])
+        self.places = InMemoryRepository(indexes=['owner_id'])
+        self.user = User("John", "Doe", "john@example.com")
+        self.users.add(self.user)
+    
+    def test_1_unique_index_lookup(self):
+        """Test lookup through a unique index"""
+        self.assertIs(self.users.get_by_attribute('email', "john@example.com"), self.user)
+        self.assertIsNone(self.users.get_by_attribute('email', "nobody@example.com"))
+    
+    def test_2_unique_index_rejects_duplicates(self):
+        """Test that a unique index refuses a second object with the same value"""
+        with self.assertRaises(ValueError):
+            self.users.add(User("Jane", "Doe", "john@example.com"))
+    
+    def test_3_unique_index_follows_update(self):
+        """Test that the unique index is kept in sync on update"""
+        self.users.update(self.user.id, {'email': "new@example.com"})
+        self.assertIsNone(self.users.get_by_attribute('email', "john@example.com"))
+        self.assertIs(self.users.get_by_attribute('email', "new@example.com"), self.user)
+    
+    def test_4_unique_index_follows_delete(self):
+        """Test that the unique index is kept in sync on delete"""
+        self.users.delete(self.user.id)
+        self.assertIsNone(self.users.get_by_attribute('email', "john@example.com"))
+        self.users.add(User("Jane", "Doe", "john@example.com"))
+    
+    def test_5_non_unique_index(self):
+        """Test lookup of every object sharing an indexed value"""
+        first = Place("First", 10, self.user.id)
+        second = Place("Second", 20, self.user.id)
+        other = Place("Other", 30, "someone-else")
+        for place in (first, second, other):
+            self.places.add(place)
+        
+        self.assertEqual(self.places.get_all_by_attribute('owner_id', self.user.id), [first, second])
+        self.places.delete(first.id)
+        self.assertEqual(self.places.get_all_by_attribute('owner_id', self.user.id), [second])
+        self.assertEqual(self.places.get_all_by_attribute('owner_id', "missing"), [])
+
+class TestInMemoryRepositoryRangeIndex(unittest.TestCase):
+    
+    def setUp(self):
+        self.places = InMemoryRepository(range_indexes=['price', 'latitude'])
+        self.cheap = Place("Cheap", 20, "owner", latitude=10)
+        self.mid = Place("Mid", 80, "owner", latitude=20)
+        self.pricey = Place("Pricey", 300, "owner")
+        for place in (self.pricey, self.cheap, self.mid):
+            self.places.add(place)
+    
+    def test_1_range_query(self):
+        """Test inclusive range queries returned in value order"""
+        self.assertEqual(self.places.get_range('price', 20, 80), [self.cheap, self.mid])
+        self.assertEqual(self.places.get_range('price', low=50), [self.mid, self.pricey])
+        self.assertEqual(self.places.get_range('price', high=19), [])
+    
+    def test_2_none_values_are_not_indexed(self):
+        """Test that places without a latitude never match a latitude range"""
+        self.assertEqual(self.places.get_range('latitude'), [self.cheap, self.mid])
+    
+    def test_3_range_index_follows_writes(self):
+        """Test that the range index is kept in sync on update and delete"""
+        self.places.update(self.cheap.id, {'price': 500})
+        self.assertEqual(self.places.get_range('price', 0, 100), [self.mid])
+        self.places.delete(self.pricey.id)
+        self.assertEqual(self.places.get_range('price', 100), [self.cheap])
+
+class TestInMemoryRepositoryGeoIndex(unittest.TestCase):
+    
+    def setUp(self):
+        self.places = InMemoryRepository(geo_index=('latitude', 'longitude'))
+        self.paris = Place("Paris", 100, "owner", latitude=48.8566, longitude=2.3522)
+        self.versailles = Place("Versailles", 100, "owner", latitude=48.8049, longitude=2.1204)
+        self.london = Place("London", 100, "owner", latitude=51.5074, longitude=-0.1278)
+        self.fiji = Place("Fiji", 100, "owner", latitude=-17.7134, longitude=179.9)
+        self.nowhere = Place("Nowhere", 100, "owner")
+        for place in (self.paris, self.versailles, self.london, self.fiji, self.nowhere):
+            self.places.add(place)
+    
+    def test_1_nearby_sorted_by_distance(self):
+        """Test radius search returns the places in range, nearest first"""
+        found = self.places.get_nearby(48.85, 2.35, 30)
+        self.assertEqual([place for _, place in found], [self.paris, self.versailles])
+        self.assertLess(found[0][0], 1)
+        self.assertAlmostEqual(found[1][0], 17.5, delta=0.5)
+        self.assertEqual(len(self.places.get_nearby(48.85, 2.35, 400)), 3)
+        self.assertEqual([p for _, p in self.places.get_nearby(48.85, 2.35, 400, limit=1)], [self.paris])
+    
+    def test_2_within_bounding_box(self):
+        """Test bounding box search, including across the antimeridian"""
+        self.assertCountEqual(self.places.get_within((48, 2, 49, 3)), [self.paris, self.versailles])
+        self.assertEqual(self.places.get_within((-20, 179, -15, -179)), [self.fiji])
+        self.assertEqual(len(self.places.get_within((-90, -180, 90, 180))), 4)
+    
+    def test_3_geo_index_follows_writes(self):
+        """Test that the grid index is kept in sync on update, delete and load"""
+        self.places.update(self.london.id, {'latitude': 48.86, 'longitude': 2.34})
+        self.places.delete(self.versailles.id)
+        self.assertCountEqual(self.places.get_within((48, 2, 49, 3)), [self.paris, self.london])
+        
+        self.places.load([self.paris, self.fiji])
+        self.assertEqual(self.places.get_within((48, 2, 49, 3)), [self.paris])
+
+class TestSnapshot(unittest.TestCase):
+    
+    def setUp(self):
+        self.path = os.path.join(tempfile.mkdtemp(), 'hbnb.snapshot')
+        self.facade = HBnBFacade()
+        user, _ = self.facade.create_user({
+            "first_name": "John", "last_name": "Doe", "email": "snap@example.com"
+        })
+        self.place, _ = self.facade.create_place({
+            "title": "Snapshot House", "price": 120, "latitude": 12.5, "owner_id": user['id']
+        })
+        self.user = user
+    
+    def test_1_round_trip(self):
+        """Test that a snapshot restores every entity and its indexes"""
+        self.facade.save_snapshot(self.path)
+        restored = HBnBFacade()
+        restored.load_snapshot(self.path)
+        
+        user, status = restored.get_user(self.user['id'])
+        self.assertEqual(status, 200)
+        self.assertEqual(user, self.user)
+        self.assertEqual(restored.user_repo.get_by_attribute('email', "snap@example.com").id, self.user['id'])
+        places, _ = restored.filter_places(price_min=100, price_max=200)
+        self.assertEqual([p['id'] for p in places], [self.place['id']])
+        self.assertEqual(restored.user_repo.get(self.user['id']).places, [self.place['id']])
+    
+    def test_2_rejects_other_files(self):
+        """Test that loading a file that is not a snapshot fails"""
+        with open(self.path, 'wb') as f:
+            f.write(b'not a snapshot at all')
+        with self.assertRaises(ValueError):
+            HBnBFacade().load_snapshot(self.path)
+
+class TestOperationLog(unittest.TestCase):
+    
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.snapshot_path = os.path.join(directory, 'hbnb.snapshot')
+        self.oplog_path = os.path.join(directory, 'hbnb.oplog')
+        self.facade = HBnBFacade()
+        self.facade.open_storage(self.snapshot_path, self.oplog_path, sync_interval=0)
+    
+    def tearDown(self):
+        if self.facade._oplog:
+            self.facade._oplog.close()
+    
+    def write_some_data(self):
+        user, _ = self.facade.create_user({
+            "first_name": "John", "last_name": "Doe", "email": "log@example.com"
+        })
+        place, _ = self.facade.create_place({
+            "title": "Logged House", "price": 80, "owner_id": user['id']
+        })
+        self.facade.update_user(user['id'], {"first_name": "Johnny"})
+        return user, place
+    
+    def test_1_replay_after_crash(self):
+        """Test that writes not yet in a snapshot survive a restart"""
+        user, place = self.write_some_data()
+        
+        restored = HBnBFacade()
+        restored.open_storage(self.snapshot_path, self.oplog_path, sync_interval=0)
+        restored_user = restored.user_repo.get(user['id'])
+        self.assertEqual(restored_user.first_name, "Johnny")
+        self.assertEqual(restored_user.places, [place['id']])
+        self.assertEqual(restored.user_repo.get_by_attribute('email', "log@example.com"), restored_user)
+        # Replayed records were compacted into the snapshot
+        self.assertTrue(os.path.exists(self.snapshot_path))
+        self.assertEqual(os.path.getsize(self.oplog_path), 0)
+        restored.close_storage()
+    
+    def test_2_torn_tail_is_ignored(self):
+        """Test that a partially written last record is dropped on replay"""
+        user, _ = self.write_some_data()
+        with open(self.oplog_path, 'ab') as f:
+            f.write(b'\x40\x00\x00\x00garbage')
+        
+        restored = HBnBFacade()
+        restored.open_storage(None, self.oplog_path, sync_interval=0)
+        self.assertIsNotNone(restored.user_repo.get(user['id']))
+        restored.close_storage()
+    
+    def test_3_group_commit(self):
+        """Test that buffered records reach the file on close"""
+        self.facade.close_storage()
+        facade = HBnBFacade()
+        facade.open_storage(None, self.oplog_path, sync_interval=60)
+        user, _ = facade.create_user({
+            "first_name": "Jane", "last_name": "Doe", "email": "group@example.com"
+        })
+        facade.close_storage()
+        
+        restored = HBnBFacade()
+        restored.open_storage(None, self.oplog_path, sync_interval=0)
+        self.assertIsNotNone(restored.user_repo.get(user['id']))
+        restored.close_storage()
+
+class TestConcurrentRepository(unittest.TestCase):
+    
+    def setUp(self):
+        self.facade = HBnBFacade(repository_class=ConcurrentInMemoryRepository)
+        self.users = [self.facade.create_user({
+            "first_name": "John", "last_name": "Doe", "email": f"user{i}@example.com"
+        })[0]['id'] for i in range(4)]
+        self.places = [self.facade.create_place({
+            "title": f"House {i}", "price": 50, "owner_id": owner_id
+        })[0]['id'] for i, owner_id in enumerate(self.users)]
+    
+    def test_1_write_lock_excludes_readers(self):
+        """Test that a reader waits for the writer holding the lock"""
+        lock = RWLock()
+        seen = []
+        
+        def read():
+            with lock.read_locked():
+                seen.append(True)
+        
+        lock.acquire_write()
+        reader = threading.Thread(target=read)
+        reader.start()
+        reader.join(0.1)
+        self.assertEqual(seen, [])
+        lock.release_write()
+        reader.join(1)
+        self.assertEqual(seen, [True])
+    
+    def test_2_concurrent_reviews_stay_consistent(self):
+        """Test that concurrent review writes keep the user and place lists in sync"""
+        def work(seed):
+            for i in range(50):
+                review, _ = self.facade.create_review({
+                    "text": "Nice", "rating": 4,
+                    "user_id": self.users[(seed + i) % 4],
+                    "place_id": self.places[i % 4]
+                })
+                if i % 2:
+                    self.facade.delete_review(review['id'])
+        
+        threads = [threading.Thread(target=work, args=(seed,)) for seed in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        reviews = self.facade.review_repo.get_all()
+        self.assertEqual(len(reviews), 8 * 25)
+        self.assertEqual(sum(len(self.facade.place_repo.get(p).reviews) for p in self.places), len(reviews))
+        self.assertEqual(sum(len(self.facade.user_repo.get(u).reviews) for u in self.users), len(reviews))
+
+class TestVersionedRepository(unittest.TestCase):
+    
+    def setUp(self):
+        self.places = VersionedInMemoryRepository(indexes=['owner_id'], range_indexes=['price'])
+        self.first = Place("First", 10, "owner")
+        self.second = Place("Second", 20, "owner")
+        self.places.add(self.first)
+        self.places.add(self.second)
+    
+    def test_1_versions_are_immutable(self):
+        """Test that a version taken by a reader does not see later writes"""
+        version = self.places.current()
+        self.places.add(Place("Third", 30, "owner"))
+        self.places.delete(self.first.id)
+        updated = self.places.update(self.second.id, {'price': 99})
+        
+        self.assertEqual(version.values, (self.first, self.second))
+        self.assertEqual(version.objects[self.second.id].price, 20)
+        self.assertEqual(updated.price, 99)
+        self.assertIs(self.places.get(self.second.id), updated)
+        self.assertEqual(self.places.get_range('price', 90), [updated])
+        self.assertEqual(len(self.places.get_all()), 2)
+    
+    def test_2_list_calls_share_one_copy(self):
+        """Test that get_all returns the same tuple until the next write"""
+        self.assertIs(self.places.get_all(), self.places.get_all())
+        before = self.places.get_all()
+        self.places.add(Place("Third", 30, "owner"))
+        self.assertIsNot(self.places.get_all(), before)
+        self.assertEqual(len(before), 2)
+    
+    def test_3_writes_without_readers_do_not_copy(self):
+        """Test that the storage is only copied once a version was read"""
+        storage = self.places._storage
+        self.places.add(Place("Third", 30, "owner"))
+        self.assertIs(self.places._storage, storage)
+        self.places.current()
+        self.places.add(Place("Fourth", 40, "owner"))
+        self.assertIsNot(self.places._storage, storage)
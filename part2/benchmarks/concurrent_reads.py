@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+HBnB - in-memory repository read throughput by thread count
+
+Compares InMemoryRepository (no locking, not safe with concurrent writers)
+with ConcurrentInMemoryRepository and its copy-on-write variant
+VersionedInMemoryRepository. Reader threads mix get() by id, lookups on a
+hash index and range queries on a range index (or, with --list, iterate
+get_all()), while an optional writer thread keeps updating prices.
+
+CPython runs one thread at a time, so total throughput does not grow with
+the number of threads; the numbers show what the locking costs and that
+readers keep making progress while a writer is active.
+
+Usage:
+    python benchmarks/concurrent_reads.py [--objects 10000] [--seconds 2] [--writer] [--list]
+"""
+
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.models.place import Place
+from app.persistence.repository import (
+    InMemoryRepository, ConcurrentInMemoryRepository, VersionedInMemoryRepository
+)
+
+THREAD_COUNTS = (1, 2, 4, 8, 16, 32)
+REPOSITORIES = (InMemoryRepository, ConcurrentInMemoryRepository, VersionedInMemoryRepository)
+
+
+def make_repo(repo_class, objects):
+    repo = repo_class(indexes=['owner_id'], range_indexes=['price'])
+    ids = []
+    for i in range(objects):
+        place = Place(f"Place {i}", float(i % 500 + 1), f"owner-{i % 100}")
+        repo.add(place)
+        ids.append(place.id)
+    return repo, ids
+
+
+def run(repo_class, objects, threads, seconds, writer, list_all=False):
+    """Return (reads/sec, writes/sec)"""
+    repo, ids = make_repo(repo_class, objects)
+    stop = threading.Event()
+    reads = [0] * threads
+    writes = [0]
+
+    def read(slot):
+        rnd = random.Random(slot)
+        count = 0
+        while not stop.is_set():
+            if list_all:
+                for _ in repo.get_all():
+                    pass
+                count += 1
+                continue
+            for _ in range(100):
+                repo.get(rnd.choice(ids))
+                repo.get_all_by_attribute('owner_id', f"owner-{rnd.randrange(100)}")
+                price = float(rnd.randint(1, 500))
+                repo.get_range('price', price, price)
+            count += 300
+        reads[slot] = count
+
+    def write():
+        rnd = random.Random(-1)
+        while not stop.is_set():
+            repo.update(rnd.choice(ids), {'price': float(rnd.randint(1, 500))})
+            writes[0] += 1
+
+    workers = [threading.Thread(target=read, args=(i,)) for i in range(threads)]
+    if writer:
+        workers.append(threading.Thread(target=write))
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    time.sleep(seconds)
+    stop.set()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - start
+    return sum(reads) / elapsed, writes[0] / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--objects", type=int, default=10000)
+    parser.add_argument("--seconds", type=float, default=2)
+    parser.add_argument("--writer", action="store_true",
+                        help="run one thread updating prices during the reads")
+    parser.add_argument("--list", action="store_true",
+                        help="each read iterates over get_all() instead")
+    args = parser.parse_args()
+
+    print(f"{'threads':>8} {'repository':>30} {'reads/s':>12} {'writes/s':>10}")
+    for threads in THREAD_COUNTS:
+        for repo_class in REPOSITORIES:
+            if repo_class is InMemoryRepository and args.writer:
+                # Unsafe: a reader could see the indexes mid-update
+                continue
+            reads, writes = run(repo_class, args.objects, threads, args.seconds,
+                                args.writer, args.list)
+            print(f"{threads:>8} {repo_class.__name__:>30} {reads:>12,.0f} {writes:>10,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,12 @@ class Config:
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'dev-key-change-in-production'
     DEBUG = False
     TESTING = False
+    # When set, data is loaded from this snapshot on startup and saved on exit
+    SNAPSHOT_PATH = os.environ.get('HBNB_SNAPSHOT_PATH')
+    # When set, every write is appended to this log and replayed on startup
+    OPLOG_PATH = os.environ.get('HBNB_OPLOG_PATH')
+    # Seconds between group-committed fsyncs of the log (0 = fsync every write)
+    OPLOG_SYNC_INTERVAL = float(os.environ.get('HBNB_OPLOG_SYNC_INTERVAL', 0.1))
 
 class DevelopmentConfig(Config):
     DEBUG = True
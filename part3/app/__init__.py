@@ -2,16 +2,28 @@ from flask import Flask
 from flask_cors import CORS
 from app.extensions import db, jwt, bcrypt
 from app.api.v1 import bp_v1
+from app.persistence.engine import add_sqlite_functions, set_sqlite_pragmas
+from app.services.cache import init_response_cache
 from config import config_dict
 
 def create_app(config_name="development"):
     app = Flask(__name__)
-    app.config.from_object(config_dict[config_name])
+    # Accept a config name from config_dict or a config class
+    config = config_dict[config_name] if isinstance(config_name, str) else config_name
+    app.config.from_object(config)
+    if not app.config.get("JWT_SECRET_KEY"):
+        # No fallback: a key published in the code would let anyone forge tokens
+        raise ValueError("JWT_SECRET_KEY is not set")
     
     # Enable CORS for all routes
     CORS(app)
     
     db.init_app(app)
+    with app.app_context():
+        for engine in db.engines.values():
+            set_sqlite_pragmas(engine, app.config.get("SQLITE_PRAGMAS"))
+            add_sqlite_functions(engine)
+    init_response_cache(app)
     jwt.init_app(app)
     bcrypt.init_app(app)
     
@@ -2,10 +2,16 @@
 from flask_restx import Namespace, Resource, fields
 from flask_jwt_extended import jwt_required, get_jwt
 from app.services.facade import HBnBFacade
+from app.services.async_facade import AsyncHBnBFacade
+from app.api.v1.caching import CachedResource
+from app.api.v1.conditional import ConditionalResource
+from app.api.v1.pagination import get_pagination_args, paginated, pagination_params
+from app.api.v1.serializers import register
 
 api = Namespace('amenities', description='Amenity operations')
 
 facade = HBnBFacade()
+async_facade = AsyncHBnBFacade()
 
 
 def is_admin():
@@ -14,15 +20,13 @@ def is_admin():
     return claims.get('is_admin', False)
 
 
-def amenity_to_dict(amenity):
-    """Convert amenity object to dictionary"""
-    return {
-        'id': amenity.id,
-        'name': amenity.name,
-        'description': getattr(amenity, 'description', ''),
-        'created_at': amenity.created_at.isoformat() if amenity.created_at else None,
-        'updated_at': amenity.updated_at.isoformat() if amenity.updated_at else None
-    }
+amenity_to_dict = register('amenity', {
+    'id': 'obj.id',
+    'name': 'obj.name',
+    'description': 'obj.description',
+    'created_at': 'obj.created_at',
+    'updated_at': 'obj.updated_at',
+})
 
 
 # Define the amenity model for input validation
@@ -42,16 +46,39 @@ amenity_response_model = api.model('AmenityResponse', {
 
 
 @api.route('/')
-class AmenityList(Resource):
+class AmenityList(CachedResource):
     """Handles operations on the amenity collection"""
 
-    @api.doc('list_amenities')
-    @api.response(200, 'List of amenities retrieved successfully')
-    @api.marshal_list_with(amenity_response_model)
+    cached_entities = ("amenity",)
+
+    def version(self):
+        return facade.get_amenities_version()
+
+    @api.doc('list_amenities', params=pagination_params)
+    @api.response(200, 'List of amenities retrieved successfully', [amenity_response_model])
+    @api.response(400, 'Invalid pagination parameters')
     def get(self):
         """Get list of all amenities - PUBLIC"""
-        amenities = facade.get_all_amenities()
-        return [amenity_to_dict(a) for a in amenities], 200
+        try:
+            limit, cursor = get_pagination_args()
+            if limit is None and cursor is None:
+                amenities = facade.get_all_amenities()
+                return amenity_to_dict.many(amenities), 200
+            amenities, next_cursor = facade.get_all_amenities(limit, cursor)
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        return paginated(amenity_to_dict.many(amenities), next_cursor), 200
+
+    async def async_get(self):
+        try:
+            limit, cursor = get_pagination_args()
+            if limit is None and cursor is None:
+                amenities = await async_facade.get_all_amenities()
+                return amenity_to_dict.many(amenities), 200
+            amenities, next_cursor = await async_facade.get_all_amenities(limit, cursor)
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        return paginated(amenity_to_dict.many(amenities), next_cursor), 200
 
     @api.doc('create_amenity')
     @api.expect(amenity_model, validate=True)
@@ -82,13 +109,15 @@ class AmenityList(Resource):
 
 @api.route('/<string:amenity_id>')
 @api.param('amenity_id', 'The amenity identifier')
-class AmenityResource(Resource):
+class AmenityResource(ConditionalResource):
     """Handles operations on a single amenity"""
 
+    def version(self, amenity_id):
+        return facade.get_amenity_version(amenity_id)
+
     @api.doc('get_amenity')
-    @api.response(200, 'Amenity details retrieved successfully')
+    @api.response(200, 'Amenity details retrieved successfully', amenity_response_model)
     @api.response(404, 'Amenity not found')
-    @api.marshal_with(amenity_response_model)
     def get(self, amenity_id):
         """Get amenity details by ID - PUBLIC"""
         amenity = facade.get_amenity(amenity_id)
@@ -96,6 +125,12 @@ class AmenityResource(Resource):
             api.abort(404, 'Amenity not found')
         return amenity_to_dict(amenity), 200
 
+    async def async_get(self, amenity_id):
+        amenity = await async_facade.get_amenity(amenity_id)
+        if not amenity:
+            api.abort(404, 'Amenity not found')
+        return amenity_to_dict(amenity), 200
+
     @api.doc('update_amenity')
     @api.expect(amenity_model)
     @api.response(200, 'Amenity updated successfully')
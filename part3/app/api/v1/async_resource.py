@@ -0,0 +1,30 @@
+"""Resource base class for endpoints with an asyncio implementation"""
+from flask import current_app, request
+from flask_restx import Resource
+
+
+class AsyncResource(Resource):
+    """
+    Resource whose handlers may have an `async_<method>` variant, e.g.
+    async_get next to get. When the ASYNC_READS setting is on, the async
+    variant serves the request instead (Flask runs it in an event loop;
+    this needs the `flask[async]` extra).
+
+    The async variant replaces the sync handler, so it applies its own
+    decorators (jwt_required, marshalling); the Swagger documentation of
+    the sync handler still describes the route. Requests with any of the
+    query parameters of sync_params are served by the sync handler.
+    """
+
+    sync_params = ()
+
+    def dispatch_request(self, *args, **kwargs):
+        method = request.method.lower()
+        if method == "head":
+            method = "get"
+        handler = getattr(self, f"async_{method}", None)
+        if (handler is not None and current_app.config.get("ASYNC_READS")
+                and not any(param in request.args for param in self.sync_params)):
+            # A new instance serves every request, so this does not leak
+            setattr(self, method, current_app.ensure_sync(handler))
+        return super().dispatch_request(*args, **kwargs)
@@ -4,11 +4,13 @@ from flask import Blueprint
 from flask_restx import Api, Resource, fields
 from flask_jwt_extended import create_access_token
 from app.services.facade import HBnBFacade
+from app.api.v1.serializers import output_json
 
 facade = HBnBFacade()
 
 auth_bp = Blueprint('auth', __name__, url_prefix='/api/v1/auth')
 api = Api(auth_bp)
+api.representations['application/json'] = output_json
 
 login_model = api.model('Login', {
     'email': fields.String(required=True, description='User email'),
@@ -0,0 +1,120 @@
+"""Response caching of the public read endpoints (see app/services/cache.py)"""
+from urllib.parse import urlencode
+
+from flask import Response, request
+from flask_jwt_extended import jwt_required, get_jwt
+from flask_restx import Namespace, Resource
+from flask_restx.utils import unpack
+from werkzeug.http import http_date, parse_date
+
+from app.api.v1.conditional import ConditionalResource
+from app.services.cache import response_cache
+
+api = Namespace('cache', description='Response cache')
+
+
+def cache_key(cache, entities, mimetype="application/json"):
+    """Key of the current request: path, sorted query string, media type and the versions of entities"""
+    query = urlencode(sorted(request.args.items(multi=True)))
+    versions = ",".join(map(str, cache.versions(entities)))
+    return f"{request.path}?{query};{mimetype}#{versions}"
+
+
+def _entry(response, body):
+    """Cache entry of a 200 response: its ETag, Last-Modified and media type lines, then the body"""
+    etag, _ = response.get_etag()
+    last_modified = http_date(response.last_modified) if response.last_modified else ""
+    return f"{etag or ''}\n{last_modified}\n{response.mimetype}\n".encode("ascii") + body
+
+
+class _StoreWhenSent:
+    """
+    Body of a streamed response that stores it in cache under key once
+    all of it is sent. Buffering stops as soon as the body outgrows the
+    largest value the cache stores; a stream that fails or that the
+    client abandons is not stored either. close() closes the wrapped
+    body, which keeps the request context of stream_with_context.
+    """
+
+    def __init__(self, cache, key, response):
+        self.cache, self.key = cache, key
+        # Not the response itself: it holds this body, and the cycle would
+        # leave the body's request context to the garbage collector
+        self.headers = _entry(response, b"")
+        self.body = response.response
+        # The chunks sent so far; None once they outgrow the cache
+        self.chunks = []
+
+    def __iter__(self):
+        self.chunks, size = [], 0
+        for chunk in self.body:
+            if self.chunks is not None:
+                size += len(chunk)
+                if size <= self.cache.max_value_bytes:
+                    self.chunks.append(chunk)
+                else:
+                    self.chunks = None
+            yield chunk
+        if self.chunks is not None:
+            self.cache.set(self.key, self.headers + b"".join(self.chunks))
+
+    def close(self):
+        if hasattr(self.body, "close"):
+            self.body.close()
+
+
+class CachedResource(ConditionalResource):
+    """
+    ConditionalResource whose GET responses are served from the response
+    cache when RESPONSE_CACHE is set. cached_entities names the entities the
+    response shows; a write to any of them changes the key, and without
+    any the responses are not cached. Only 200 responses are stored, and
+    the X-Cache header tells HIT or MISS. Entries keep the validators of
+    the response, so that a hit answers conditional GETs without a query.
+    A streamed response is stored once it is all sent, if it fits in the
+    cache (see _StoreWhenSent).
+    """
+
+    cached_entities = ()
+
+    def dispatch_request(self, *args, **kwargs):
+        cache = response_cache()
+        if cache is None or request.method not in ("GET", "HEAD") or not self.cached_entities:
+            return super().dispatch_request(*args, **kwargs)
+
+        key = cache_key(cache, self.cached_entities, self.mimetype())
+        entry = cache.get(key)
+        if entry is not None:
+            etag, last_modified, mimetype, body = entry.split(b"\n", 3)
+            response = Response(body, 200, {"X-Cache": "HIT"}, mimetype=mimetype.decode("ascii"))
+            if not etag:
+                return response
+            return self.validated(response, etag.decode("ascii"), parse_date(last_modified.decode("ascii")))
+
+        response = super().dispatch_request(*args, **kwargs)
+        if not isinstance(response, Response):
+            data, code, headers = unpack(response)
+            response = self.api.make_response(data, code, headers=headers)
+        if response.status_code == 200:
+            if response.is_streamed:
+                response.response = _StoreWhenSent(cache, key, response)
+            else:
+                cache.set(key, _entry(response, response.get_data()))
+            response.headers["X-Cache"] = "MISS"
+        return response
+
+
+@api.route('/stats')
+class CacheStats(Resource):
+    """Hit/miss statistics of the response cache"""
+
+    @api.doc('get_cache_stats')
+    @api.response(200, 'Statistics of the response cache, null when it is disabled')
+    @api.response(403, 'Admin privileges required')
+    @jwt_required()
+    def get(self):
+        """Get the response cache statistics (requires admin privileges)"""
+        if not get_jwt().get('is_admin', False):
+            return {'error': 'Admin privileges required'}, 403
+        cache = response_cache()
+        return (cache.stats() if cache is not None else None), 200
@@ -0,0 +1,99 @@
+"""Conditional GETs of the public read endpoints: ETag, Last-Modified and 304s"""
+import hashlib
+from datetime import datetime, timezone
+from urllib.parse import urlencode
+
+from flask import Response, request
+from flask_restx.utils import unpack
+
+from app.api.v1.async_resource import AsyncResource
+
+
+def validators(version, mimetype="application/json"):
+    """
+    (etag, last_modified) of the current request for a version row of
+    app/persistence/versions.py: the ETag hashes the path, the query
+    string, the media type of the response and the version; Last-Modified
+    is its latest updated_at.
+    """
+    query = urlencode(sorted(request.args.items(multi=True)))
+    raw = f"{request.path}?{query};{mimetype}#{tuple(version)!r}"
+    etag = hashlib.blake2b(raw.encode("utf-8"), digest_size=16).hexdigest()
+    times = [value for value in version if isinstance(value, datetime)]
+    last_modified = max(times).replace(tzinfo=timezone.utc, microsecond=0) if times else None
+    return etag, last_modified
+
+
+def not_modified(etag, last_modified):
+    """Whether the request's If-None-Match / If-Modified-Since match (RFC 9110)"""
+    if request.if_none_match:
+        # If-Modified-Since is ignored along with If-None-Match
+        return request.if_none_match.contains_weak(etag)
+    if request.if_modified_since and last_modified is not None:
+        return last_modified <= request.if_modified_since
+    return False
+
+
+def with_validators(response, etag, last_modified):
+    """Set the validators of response, and turn it into a 304 when the request's match"""
+    response.set_etag(etag)
+    response.last_modified = last_modified
+    response.cache_control.no_cache = True
+    if not_modified(etag, last_modified):
+        response.status_code = 304
+        response.set_data(b"")
+    return response
+
+
+class ConditionalResource(AsyncResource):
+    """
+    AsyncResource whose GET responses carry an ETag and a Last-Modified
+    header, and answer 304 Not Modified to a matching If-None-Match or
+    If-Modified-Since before anything is loaded or serialized: the check
+    costs the one aggregate query of version(). Cache-Control: no-cache
+    makes browsers revalidate rather than guess how long they may reuse
+    a response.
+
+    version(*args) receives the arguments of the route and returns the
+    version row of the response (see HBnBFacade.get_places_version), or
+    None when there is nothing to validate, e.g. a missing resource. It
+    runs on the sync facade, also when the async handlers serve reads.
+
+    media_types lists the representations the resource picks from by the
+    Accept header, JSON first (see app/api/v1/streaming.py). With more
+    than one, the chosen one is part of the ETag, and the responses,
+    304s included, carry Vary: Accept.
+    """
+
+    media_types = ("application/json",)
+
+    def version(self, *args, **kwargs):
+        return None
+
+    def mimetype(self):
+        """Media type of media_types the current request gets"""
+        return request.accept_mimetypes.best_match(self.media_types) or self.media_types[0]
+
+    def validated(self, response, etag, last_modified):
+        """with_validators(), and Vary: Accept when the representation depends on it"""
+        if len(self.media_types) > 1:
+            response.vary.add("Accept")
+        return with_validators(response, etag, last_modified)
+
+    def dispatch_request(self, *args, **kwargs):
+        if request.method not in ("GET", "HEAD"):
+            return super().dispatch_request(*args, **kwargs)
+        version = self.version(*args, **kwargs)
+        if version is None:
+            return super().dispatch_request(*args, **kwargs)
+
+        etag, last_modified = validators(version, self.mimetype())
+        if not_modified(etag, last_modified):
+            return self.validated(Response(), etag, last_modified)
+        response = super().dispatch_request(*args, **kwargs)
+        if not isinstance(response, Response):
+            data, code, headers = unpack(response)
+            response = self.api.make_response(data, code, headers=headers)
+        if response.status_code != 200:
+            return response
+        return self.validated(response, etag, last_modified)
@@ -0,0 +1,37 @@
+"""?fields= and ?include= of the place and review endpoints (see app/persistence/fieldsets.py)"""
+from flask import request
+
+from app.persistence.fieldsets import FIELDS, INCLUDES, Fieldset
+
+# Query parameters of a Fieldset
+FIELDSET_PARAMS = ("fields", "include")
+
+
+def fieldset_params(model):
+    """Swagger documentation of the fieldset query parameters of model"""
+    return {
+        "fields": f"Comma-separated fields of the payload ({', '.join(FIELDS[model])}); all by default",
+        "include": f"Comma-separated related data to embed ({', '.join(INCLUDES[model])})",
+    }
+
+
+def _names(param):
+    return [name for name in request.args.get(param, "").split(",") if name]
+
+
+def get_fieldset(model):
+    """
+    Fieldset of model read from ?fields=&include=, or None when the
+    request has neither.
+
+    Raises:
+        ValueError: If a field or an include is unknown
+    """
+    if not any(request.args.get(param) for param in FIELDSET_PARAMS):
+        return None
+    return Fieldset(model, _names("fields") or None, _names("include"))
+
+
+def includes(name):
+    """Whether ?include= names the relationship name"""
+    return name in _names("include")
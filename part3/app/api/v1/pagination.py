@@ -0,0 +1,39 @@
+"""Keyset pagination helpers shared by the list endpoints"""
+from flask import request
+from app.services.facade import MAX_PAGE_SIZE
+
+# Swagger documentation for the pagination query parameters
+pagination_params = {
+    'limit': f'Page size (1-{MAX_PAGE_SIZE}); enables pagination',
+    'cursor': 'Opaque cursor returned as next_cursor by the previous page',
+}
+
+
+def get_pagination_args():
+    """
+    Read ?limit=&cursor= from the query string.
+
+    Returns (limit, cursor). Both are None when the client did not ask
+    for a paginated response.
+
+    Raises:
+        ValueError: If limit is not a positive integer
+    """
+    limit = request.args.get('limit')
+    cursor = request.args.get('cursor') or None
+
+    if limit is not None:
+        try:
+            limit = int(limit)
+        except ValueError:
+            raise ValueError("limit must be an integer")
+        if limit < 1:
+            raise ValueError("limit must be at least 1")
+        limit = min(limit, MAX_PAGE_SIZE)
+
+    return limit, cursor
+
+
+def paginated(items, next_cursor):
+    """Wrap one page of serialized items in the paginated response envelope"""
+    return {'items': items, 'next_cursor': next_cursor}
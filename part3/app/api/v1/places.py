@@ -1,9 +1,21 @@
 #!/usr/bin/python3
 
+from flask import request
 from flask_restx import Namespace, Resource, fields
 from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
-from app.services.facade import HBnBFacade
+from app.services.facade import PLACE_FIELDS, HBnBFacade
+from app.services.async_facade import AsyncHBnBFacade
+from app.api.v1.async_resource import AsyncResource
+from app.api.v1.caching import CachedResource
+from app.api.v1.fieldsets import FIELDSET_PARAMS, fieldset_params, get_fieldset, includes
+from app.api.v1.pagination import get_pagination_args, paginated, pagination_params
+from app.api.v1.reviews import review_to_dict, user_summary
+from app.api.v1.serializers import register
+from app.api.v1.streaming import MEDIA_TYPES, stream_collection
+from app.models.geo import parse_bbox
+from app.models.place import Place
 facade = HBnBFacade()
+async_facade = AsyncHBnBFacade()
 
 api = Namespace("places", description="Place operations")
 
@@ -23,31 +35,155 @@ place_update_model = api.model("PlaceUpdate", {
     "longitude":   fields.Float(description="Longitude"),
 })
 
-def place_to_dict(place):
-    owner_name = None
-    if hasattr(place, 'owner') and place.owner:
-        owner_name = place.owner.get_full_name()
+place_batch_result_model = api.model("PlaceBatchResult", {
+    "created": fields.List(fields.Raw, description="Created items as {index, id}"),
+    "errors":  fields.List(fields.Raw, description="Rejected items as {index, error}"),
+})
+
+MAX_BATCH_SIZE = 10000
+
+# Fields of the place payload and the relationships that can be included
+# (see app/persistence/fieldsets.py)
+place_to_dict = register("place", {
+    "id":          "obj.id",
+    "title":       "obj.title",
+    "description": "obj.description",
+    "price":       "obj.price",
+    "latitude":    "obj.latitude",
+    "longitude":   "obj.longitude",
+    "owner_id":    "obj.owner_id",
+    "owner_name":  "obj.owner.get_full_name() if obj.owner is not None else None",
+    "review_count":     "obj.review_count or 0",
+    "average_rating":   "obj.get_average_rating()",
+    "rating_histogram": "obj.get_rating_histogram()",
+    "amenities":   "[{'id': a.id, 'name': a.name} for a in obj.amenities]",
+}, includes={
+    "owner":     "user_summary(obj.owner) if obj.owner is not None else None",
+    "amenities": "[{'id': a.id, 'name': a.name} for a in obj.amenities]",
+    "reviews":   "review_to_dict.many(obj.reviews)",
+}, env={"user_summary": user_summary, "review_to_dict": review_to_dict})
+
+
+def float_arg(name):
+    """Required float query parameter; raises ValueError when missing or invalid"""
+    try:
+        return float(request.args[name])
+    except (KeyError, ValueError):
+        raise ValueError(f"{name} must be a number")
 
+
+def optional_float_arg(name):
+    """Optional float query parameter: None when missing, ValueError when invalid"""
+    return float_arg(name) if request.args.get(name) else None
+
+
+def listing_args():
+    """
+    Filters and sort order of a place listing (see HBnBFacade.list_places),
+    or None when the request has none of them.
+    """
+    if not any(name in request.args for name in listing_params):
+        return None
+    amenities = request.args.get("amenities", "")
     return {
-        "id":          place.id,
-        "title":       place.title,
-        "description": place.description,
-        "price":       place.price,
-        "latitude":    place.latitude,
-        "longitude":   place.longitude,
-        "owner_id":    getattr(place, 'owner_id', None),
-        "owner_name":  owner_name,
-        "amenities":   [{"id": a.id, "name": a.name} for a in getattr(place, 'amenities', [])]
+        "price_min": optional_float_arg("price_min"),
+        "price_max": optional_float_arg("price_max"),
+        "amenities": [amenity_id for amenity_id in amenities.split(",") if amenity_id],
+        "min_rating": optional_float_arg("min_rating"),
+        "sort": request.args.get("sort") or None,
     }
 
 
+def listing_result(places, next_cursor, facets, fieldset=None):
+    return {**paginated(place_to_dict.many(places, fieldset), next_cursor), "facets": facets}
+
+
+def nearby_args():
+    """(lat, lon, radius_km, limit) of a nearby search"""
+    limit, _ = get_pagination_args()
+    return float_arg("lat"), float_arg("lon"), float_arg("radius_km"), limit
+
+
+def nearby_to_dict(distance, place, fieldset=None):
+    return {**place_to_dict(place, fieldset), "distance_km": round(distance, 3)}
+
+
+def search_result(hits, next_cursor, fieldset=None):
+    return paginated([{**place_to_dict(place, fieldset), "snippet": snippet} for snippet, place in hits],
+                     next_cursor)
+
+
+listing_params = {
+    "price_min": "Lowest price per night",
+    "price_max": "Highest price per night",
+    "amenities": "Comma-separated ids of amenities the places must all have",
+    "min_rating": "Lowest average rating (0-5)",
+    "sort": "recent (default), price or rating",
+}
+
+nearby_params = {
+    "lat": "Latitude of the center",
+    "lon": "Longitude of the center",
+    "radius_km": "Search radius in kilometres",
+    "limit": pagination_params["limit"],
+}
+
+search_params = {
+    "q": "Words to find in the title, description or reviews of the places",
+    **pagination_params,
+}
+
+within_params = {
+    "bbox": "Bounding box as west,south,east,north (west > east crosses the antimeridian)",
+    "limit": pagination_params["limit"],
+}
+
+
 @api.route("/")
-class PlaceList(Resource):
+class PlaceList(CachedResource):
+    # Owner names, ratings and amenity names are part of a place
+    cached_entities = ("place", "user", "review", "amenity")
+    sync_params = FIELDSET_PARAMS
+    # The unpaginated list is streamed as JSON or NDJSON
+    media_types = MEDIA_TYPES
+
+    def version(self):
+        return facade.get_places_version(reviews=includes("reviews"))
 
-    @api.response(200, "List of places retrieved successfully")
+    @api.doc(params={**pagination_params, **listing_params, **fieldset_params(Place)})
+    @api.response(200, "List of places retrieved successfully, streamed (NDJSON with "
+                       "Accept: application/x-ndjson); with filters or sort, "
+                       "one page {items, next_cursor, facets}")
+    @api.response(400, "Invalid pagination, filter or fieldset parameters")
     def get(self):
-        """Retrieve all places - PUBLIC"""
-        return [place_to_dict(p) for p in facade.get_all_places()], 200
+        """Retrieve all places, optionally filtered and sorted - PUBLIC"""
+        try:
+            limit, cursor = get_pagination_args()
+            filters = listing_args()
+            fieldset = get_fieldset(Place)
+            profile = fieldset or "card"
+            if filters is not None:
+                return listing_result(*facade.list_places(filters, limit, cursor, profile=profile), fieldset), 200
+            if limit is None and cursor is None:
+                return stream_collection(facade.iter_places(profile=profile), lambda p: place_to_dict(p, fieldset))
+            places, next_cursor = facade.get_all_places(limit, cursor, profile=profile)
+        except ValueError as e:
+            return {"error": str(e)}, 400
+        return paginated(place_to_dict.many(places, fieldset), next_cursor), 200
+
+    async def async_get(self):
+        try:
+            limit, cursor = get_pagination_args()
+            filters = listing_args()
+            if filters is not None:
+                return listing_result(*await async_facade.list_places(filters, limit, cursor)), 200
+            if limit is None and cursor is None:
+                # Streamed from the sync session: the response outlives the event loop
+                return stream_collection(facade.iter_places(profile="card"), place_to_dict)
+            places, next_cursor = await async_facade.get_all_places(limit, cursor)
+        except ValueError as e:
+            return {"error": str(e)}, 400
+        return paginated(place_to_dict.many(places), next_cursor), 200
 
     @api.expect(place_model, validate=True)
     @api.response(201, "Place created successfully")
@@ -64,14 +200,144 @@ class PlaceList(Resource):
         return place_to_dict(new_place), 201
 
 
+@api.route("/nearby")
+class PlaceNearby(AsyncResource):
+
+    sync_params = FIELDSET_PARAMS
+
+    @api.doc(params={**nearby_params, **fieldset_params(Place)})
+    @api.response(200, "Places within radius_km, nearest first, with their distance_km")
+    @api.response(400, "Invalid search or fieldset parameters")
+    def get(self):
+        """Places near a location, sorted by distance - PUBLIC"""
+        try:
+            lat, lon, radius_km, limit = nearby_args()
+            fieldset = get_fieldset(Place)
+            found = facade.get_places_nearby(lat, lon, radius_km, limit, profile=fieldset or "card")
+        except ValueError as e:
+            return {"error": str(e)}, 400
+        return [nearby_to_dict(distance, place, fieldset) for distance, place in found], 200
+
+    async def async_get(self):
+        try:
+            lat, lon, radius_km, limit = nearby_args()
+            found = await async_facade.get_places_nearby(lat, lon, radius_km, limit)
+        except ValueError as e:
+            return {"error": str(e)}, 400
+        return [nearby_to_dict(distance, place) for distance, place in found], 200
+
+
+@api.route("/search")
+class PlaceSearch(AsyncResource):
+
+    sync_params = FIELDSET_PARAMS
+
+    @api.doc(params={**search_params, **fieldset_params(Place)})
+    @api.response(200, "One page of matching places, best first, each with an HTML snippet")
+    @api.response(400, "Invalid search or fieldset parameters")
+    def get(self):
+        """Full-text search of the places - PUBLIC"""
+        try:
+            limit, cursor = get_pagination_args()
+            fieldset = get_fieldset(Place)
+            hits, next_cursor = facade.search_places(request.args.get("q"), limit, cursor,
+                                                     profile=fieldset or "card")
+        except ValueError as e:
+            return {"error": str(e)}, 400
+        return search_result(hits, next_cursor, fieldset), 200
+
+    async def async_get(self):
+        try:
+            limit, cursor = get_pagination_args()
+            hits, next_cursor = await async_facade.search_places(request.args.get("q"), limit, cursor)
+        except ValueError as e:
+            return {"error": str(e)}, 400
+        return search_result(hits, next_cursor), 200
+
+
+@api.route("/within")
+class PlaceWithin(AsyncResource):
+
+    sync_params = FIELDSET_PARAMS
+
+    @api.doc(params={**within_params, **fieldset_params(Place)})
+    @api.response(200, "Places inside the bounding box")
+    @api.response(400, "Invalid search or fieldset parameters")
+    def get(self):
+        """Places inside a map viewport - PUBLIC"""
+        try:
+            limit, _ = get_pagination_args()
+            fieldset = get_fieldset(Place)
+            places = facade.get_places_within(parse_bbox(request.args.get("bbox")), limit,
+                                              profile=fieldset or "card")
+        except ValueError as e:
+            return {"error": str(e)}, 400
+        return place_to_dict.many(places, fieldset), 200
+
+    async def async_get(self):
+        try:
+            limit, _ = get_pagination_args()
+            places = await async_facade.get_places_within(parse_bbox(request.args.get("bbox")), limit)
+        except ValueError as e:
+            return {"error": str(e)}, 400
+        return place_to_dict.many(places), 200
+
+
+@api.route("/batch")
+class PlaceBatch(Resource):
+
+    # Documentation only: validating the payload against place_model would
+    # reject the whole batch for one bad item. Each item is checked on its
+    # own instead (build_places in app/services/facade.py), and reported
+    # in errors.
+    @api.expect([place_model])
+    @api.response(201, "Places created; rejected items are listed in errors", place_batch_result_model)
+    @api.response(400, "Invalid input data")
+    @jwt_required()
+    def post(self):
+        """Create many places in one request - AUTHENTICATED"""
+        places_data = api.payload
+        if not isinstance(places_data, list) or not places_data:
+            return {"error": "Expected a non-empty list of places"}, 400
+        if len(places_data) > MAX_BATCH_SIZE:
+            return {"error": f"At most {MAX_BATCH_SIZE} places per batch"}, 400
+
+        owner_id = get_jwt_identity()
+        items = [
+            {**{k: v for k, v in p.items() if k in PLACE_FIELDS}, "owner_id": owner_id}
+            if isinstance(p, dict) else p
+            for p in places_data
+        ]
+        created, errors = facade.create_places_bulk(items)
+        status = 201 if created else 400
+        return {"created": created, "errors": errors}, status
+
+
 @api.route("/<string:place_id>")
-class PlaceResource(Resource):
+class PlaceResource(CachedResource):
+    cached_entities = PlaceList.cached_entities
+    sync_params = FIELDSET_PARAMS
+
+    def version(self, place_id):
+        return facade.get_place_version(place_id, reviews=includes("reviews"))
 
-    @api.response(200, "Place details retrieved successfully")
+    @api.doc(params=fieldset_params(Place))
+    @api.response(200, "Place details retrieved successfully; ?include=reviews embeds its reviews")
+    @api.response(400, "Invalid fieldset parameters")
     @api.response(404, "Place not found")
     def get(self, place_id):
         """Get place by ID - PUBLIC"""
-        place = facade.get_place(place_id)
+        try:
+            fieldset = get_fieldset(Place)
+        except ValueError as e:
+            return {"error": str(e)}, 400
+        place = facade.get_place(place_id, profile=fieldset or "detail")
+        if not place:
+            return {"error": "Place not found"}, 404
+        return place_to_dict(place, fieldset), 200
+
+    async def async_get(self, place_id):
+        place = await async_facade.get_place(place_id)
         if not place:
             return {"error": "Place not found"}, 404
         return place_to_dict(place), 200
@@ -2,10 +2,20 @@
 from flask_restx import Namespace, Resource, fields
 from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
 from app.services.facade import HBnBFacade
+from app.services.async_facade import AsyncHBnBFacade
+from app.api.v1.async_resource import AsyncResource
+from app.api.v1.caching import CachedResource
+from app.api.v1.conditional import ConditionalResource
+from app.api.v1.fieldsets import FIELDSET_PARAMS, fieldset_params, get_fieldset, includes
+from app.api.v1.pagination import get_pagination_args, paginated, pagination_params
+from app.api.v1.serializers import register
+from app.api.v1.streaming import stream_collection
+from app.models.review import DuplicateReviewError, Review
 
 api = Namespace('reviews', description='Review operations')
 
 facade = HBnBFacade()
+async_facade = AsyncHBnBFacade()
 
 
 def is_admin():
@@ -14,22 +24,28 @@ def is_admin():
     return claims.get('is_admin', False)
 
 
-def review_to_dict(review):
-    """Convert review object to dictionary"""
-    user_name = None
-    if hasattr(review, 'user') and review.user:
-        user_name = review.user.get_full_name()
+# Included user: the owner of a place or the author of a review
+user_summary = register('user_summary', {
+    'id': 'obj.id',
+    'first_name': 'obj.first_name',
+    'last_name': 'obj.last_name',
+})
 
-    return {
-        'id': review.id,
-        'text': review.text,
-        'rating': review.rating,
-        'user_id': review.user_id,
-        'user_name': user_name,
-        'place_id': review.place_id,
-        'created_at': review.created_at.isoformat() if review.created_at else None,
-        'updated_at': review.updated_at.isoformat() if review.updated_at else None
-    }
+# Fields of the review payload and the relationships that can be included
+# (see app/persistence/fieldsets.py)
+review_to_dict = register('review', {
+    'id': 'obj.id',
+    'text': 'obj.text',
+    'rating': 'obj.rating',
+    'user_id': 'obj.user_id',
+    'user_name': 'obj.user.get_full_name() if obj.user is not None else None',
+    'place_id': 'obj.place_id',
+    'created_at': 'obj.created_at',
+    'updated_at': 'obj.updated_at',
+}, includes={
+    'user': 'user_summary(obj.user) if obj.user is not None else None',
+    'place': "{'id': obj.place.id, 'title': obj.place.title} if obj.place is not None else None",
+}, env={'user_summary': user_summary})
 
 
 # Define the review model for input validation
@@ -53,16 +69,38 @@ review_response_model = api.model('ReviewResponse', {
 
 
 @api.route('/')
-class ReviewList(Resource):
+class ReviewList(AsyncResource):
     """Handles operations on the review collection"""
 
-    @api.doc('list_reviews')
-    @api.response(200, 'List of reviews retrieved successfully')
-    @api.marshal_list_with(review_response_model)
+    sync_params = FIELDSET_PARAMS
+
+    @api.doc('list_reviews', params={**pagination_params, **fieldset_params(Review)})
+    @api.response(200, 'List of reviews retrieved successfully, streamed without pagination '
+                       '(NDJSON with Accept: application/x-ndjson)', [review_response_model])
+    @api.response(400, 'Invalid pagination or fieldset parameters')
     def get(self):
         """Get list of all reviews - PUBLIC"""
-        reviews = facade.get_all_reviews()
-        return [review_to_dict(r) for r in reviews], 200
+        try:
+            limit, cursor = get_pagination_args()
+            fieldset = get_fieldset(Review)
+            if limit is None and cursor is None:
+                reviews = facade.iter_reviews(profile=fieldset or "card")
+                return stream_collection(reviews, lambda r: review_to_dict(r, fieldset))
+            reviews, next_cursor = facade.get_all_reviews(limit, cursor, profile=fieldset or "card")
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        return paginated(review_to_dict.many(reviews, fieldset), next_cursor), 200
+
+    async def async_get(self):
+        try:
+            limit, cursor = get_pagination_args()
+            if limit is None and cursor is None:
+                # Streamed from the sync session: the response outlives the event loop
+                return stream_collection(facade.iter_reviews(profile="card"), review_to_dict)
+            reviews, next_cursor = await async_facade.get_all_reviews(limit, cursor)
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        return paginated(review_to_dict.many(reviews), next_cursor), 200
 
     @api.doc('create_review')
     @api.expect(review_model, validate=True)
@@ -96,31 +134,47 @@ class ReviewList(Resource):
         if place.owner_id == current_user_id:
             return {'error': 'You cannot review your own place'}, 403
         
-        # Prevent duplicate reviews - check if user already reviewed this place
-        existing_reviews = facade.get_reviews_by_place(review_data['place_id'])
-        for review in existing_reviews:
-            if review.user_id == current_user_id:
-                return {'error': 'You have already reviewed this place'}, 403
+        # Prevent duplicate reviews; the unique (user_id, place_id) index
+        # catches concurrent requests that both pass this check
+        if facade.has_reviewed(current_user_id, review_data['place_id']):
+            return {'error': 'You have already reviewed this place'}, 403
 
         try:
             new_review = facade.create_review(review_data)
             return review_to_dict(new_review), 201
+        except DuplicateReviewError as e:
+            return {'error': str(e)}, 403
         except ValueError as e:
             return {'error': str(e)}, 400
 
 
 @api.route('/<string:review_id>')
 @api.param('review_id', 'The review identifier')
-class ReviewResource(Resource):
+class ReviewResource(ConditionalResource):
     """Handles operations on a single review"""
 
-    @api.doc('get_review')
-    @api.response(200, 'Review details retrieved successfully')
+    sync_params = FIELDSET_PARAMS
+
+    def version(self, review_id):
+        return facade.get_review_version(review_id, place=includes("place"))
+
+    @api.doc('get_review', params=fieldset_params(Review))
+    @api.response(200, 'Review details retrieved successfully', review_response_model)
+    @api.response(400, 'Invalid fieldset parameters')
     @api.response(404, 'Review not found')
-    @api.marshal_with(review_response_model)
     def get(self, review_id):
         """Get review details by ID - PUBLIC"""
-        review = facade.get_review(review_id)
+        try:
+            fieldset = get_fieldset(Review)
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        review = facade.get_review(review_id, profile=fieldset or "detail")
+        if not review:
+            api.abort(404, 'Review not found')
+        return review_to_dict(review, fieldset), 200
+
+    async def async_get(self, review_id):
+        review = await async_facade.get_review(review_id)
         if not review:
             api.abort(404, 'Review not found')
         return review_to_dict(review), 200
@@ -129,7 +183,7 @@ class ReviewResource(Resource):
     @api.expect(review_model)
     @api.response(200, 'Review updated successfully')
     @api.response(400, 'Invalid input data')
-    @api.response(403, 'Unauthorized to modify this review')
+    @api.response(403, 'Unauthorized to modify this review or duplicate review')
     @api.response(404, 'Review not found')
     @jwt_required()
     def put(self, review_id):
@@ -151,6 +205,8 @@ class ReviewResource(Resource):
         try:
             updated_review = facade.update_review(review_id, review_data)
             return review_to_dict(updated_review), 200
+        except DuplicateReviewError as e:
+            return {'error': str(e)}, 403
         except ValueError as e:
             return {'error': str(e)}, 400
 
@@ -178,18 +234,36 @@ class ReviewResource(Resource):
 
 @api.route('/places/<string:place_id>/reviews')
 @api.param('place_id', 'The place identifier')
-class PlaceReviewList(Resource):
+class PlaceReviewList(CachedResource):
     """Handles operations for reviews of a specific place"""
 
-    @api.doc('get_place_reviews')
-    @api.response(200, 'List of reviews for the place retrieved successfully')
+    cached_entities = ("review", "place", "user")
+    sync_params = FIELDSET_PARAMS
+
+    def version(self, place_id):
+        return facade.get_place_reviews_version(place_id, place=includes("place"))
+
+    @api.doc('get_place_reviews', params=fieldset_params(Review))
+    @api.response(200, 'List of reviews for the place retrieved successfully', [review_response_model])
+    @api.response(400, 'Invalid fieldset parameters')
     @api.response(404, 'Place not found')
-    @api.marshal_list_with(review_response_model)
     def get(self, place_id):
         """Get all reviews for a specific place - PUBLIC"""
+        try:
+            fieldset = get_fieldset(Review)
+        except ValueError as e:
+            return {'error': str(e)}, 400
         place = facade.get_place(place_id)
         if not place:
             api.abort(404, 'Place not found')
 
-        reviews = facade.get_reviews_by_place(place_id)
-        return [review_to_dict(r) for r in reviews], 200
+        reviews = facade.get_reviews_by_place(place_id, profile=fieldset or "card")
+        return review_to_dict.many(reviews, fieldset), 200
+
+    async def async_get(self, place_id):
+        place = await async_facade.get_place(place_id)
+        if not place:
+            api.abort(404, 'Place not found')
+
+        reviews = await async_facade.get_reviews_by_place(place_id)
+        return review_to_dict.many(reviews), 200
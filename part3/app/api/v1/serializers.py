@@ -0,0 +1,118 @@
+"""
+Serializers of the API payloads, compiled once per model and fieldset.
+
+A Serializer is registered with the extractors of its fields, as Python
+expressions over `obj` ("obj.title"), and of the relationships that can
+be included. It compiles a selection of them into one function that
+builds the payload in a single dict display: no call per field, and no
+second pass through flask_restx marshalling. The payload of every field
+is compiled at registration, on import; other fieldsets (app/persistence/
+fieldsets.py) are compiled on first use, and the MAX_COMPILED last used
+are kept.
+
+Timestamps stay datetime objects: dumps() encodes them as ISO 8601, with
+the rest of the response, using orjson when it is installed and the json
+module otherwise. output_json() is the JSON representation of the APIs.
+"""
+import json
+import threading
+from collections import OrderedDict
+from datetime import date, datetime
+
+from flask import make_response
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+
+def _default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(data):
+    """data encoded as JSON bytes"""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, default=_default, separators=(",", ":")).encode("utf-8")
+
+
+def output_json(data, code, headers=None):
+    """JSON representation of the flask_restx APIs, encoded by dumps()"""
+    response = make_response(dumps(data), code)
+    response.headers.extend(headers or {})
+    return response
+
+
+# Compiled fieldsets kept per serializer; the least recently used go first
+MAX_COMPILED = 256
+
+
+class Serializer:
+    """
+    Compiled serializer of one payload.
+
+    Args:
+        fields (dict): Extractor expression of each field, in payload order
+        includes (dict): Extractor expression of each relationship that can
+            be included
+        env (dict): Names the expressions use besides obj, e.g. the
+            serializers of included objects
+
+    Calling it with an object, and optionally a Fieldset, returns the
+    payload dict.
+    """
+
+    def __init__(self, fields, includes=None, env=None):
+        self.fields = fields
+        self.includes = includes or {}
+        self.env = env or {}
+        # (fields, include) -> function, least recently used first
+        self._compiled = OrderedDict()
+        self._lock = threading.Lock()
+        self._all = self._build(tuple(fields), ())
+
+    def _build(self, fields, include):
+        items = [f"{name!r}: {self.fields[name]}" for name in fields]
+        items += [f"{name!r}: {self.includes[name]}" for name in include]
+        namespace = dict(self.env)
+        exec(f"def serialize(obj):\n    return {{{', '.join(items)}}}\n", namespace)
+        return namespace["serialize"]
+
+    def compile(self, fields, include):
+        """Function building the payload of fields and include, compiled once"""
+        key = (fields, include)
+        with self._lock:
+            function = self._compiled.get(key)
+            if function is not None:
+                self._compiled.move_to_end(key)
+                return function
+        function = self._build(fields, include)
+        with self._lock:
+            self._compiled[key] = function
+            while len(self._compiled) > MAX_COMPILED:
+                self._compiled.popitem(last=False)
+        return function
+
+    def __call__(self, obj, fieldset=None):
+        if fieldset is None:
+            return self._all(obj)
+        return self.compile(fieldset.fields, fieldset.include)(obj)
+
+    def many(self, objs, fieldset=None):
+        """Payloads of objs"""
+        serialize = self._all if fieldset is None else self.compile(fieldset.fields, fieldset.include)
+        return [serialize(obj) for obj in objs]
+
+
+# name -> Serializer
+SERIALIZERS = {}
+
+
+def register(name, fields, includes=None, env=None):
+    """Compile and register the serializer of name; returns it"""
+    serializer = SERIALIZERS[name] = Serializer(fields, includes, env)
+    return serializer
@@ -0,0 +1,49 @@
+"""Streamed responses of the unpaginated collections: a JSON array or NDJSON"""
+from flask import Response, request, stream_with_context
+
+from app.api.v1.serializers import dumps
+
+NDJSON = "application/x-ndjson"
+# Representations of a streamed collection, the default first
+MEDIA_TYPES = ("application/json", NDJSON)
+
+# Serialized items are sent in chunks of about this many bytes
+CHUNK_BYTES = 64 * 1024
+
+
+def _chunks(lines, first, separator, last):
+    """Join lines with separator between first and last, in chunks of CHUNK_BYTES"""
+    buffer, size = [first], len(first)
+    for index, line in enumerate(lines):
+        if index:
+            buffer.append(separator)
+        buffer.append(line)
+        size += len(line) + len(separator)
+        if size >= CHUNK_BYTES:
+            yield b"".join(buffer)
+            buffer, size = [], 0
+    buffer.append(last)
+    yield b"".join(buffer)
+
+
+def stream_collection(items, to_dict):
+    """
+    Response streaming to_dict(item) for each of items as a JSON array,
+    or as one JSON object per line when the client accepts NDJSON
+    better than JSON.
+
+    items is read while the response is sent, within the request's app
+    context: a query run with yield_per (see BaseRepository.iter_all)
+    keeps one batch of rows in memory, whatever the size of the
+    collection. The status is sent before the rows are read, so it is
+    200 even if reading fails. The body depends on the Accept header:
+    Vary: Accept tells caches so.
+    """
+    lines = (dumps(to_dict(item)) for item in items)
+    if request.accept_mimetypes.best_match(MEDIA_TYPES) == NDJSON:
+        body, mimetype = _chunks((line + b"\n" for line in lines), b"", b"", b""), NDJSON
+    else:
+        body, mimetype = _chunks(lines, b"[", b",", b"]"), "application/json"
+    response = Response(stream_with_context(body), 200, mimetype=mimetype)
+    response.vary.add("Accept")
+    return response
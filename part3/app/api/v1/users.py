@@ -3,8 +3,13 @@
 from flask_restx import Namespace, Resource, fields
 from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
 from app.services.facade import HBnBFacade
+from app.services.async_facade import AsyncHBnBFacade
+from app.api.v1.async_resource import AsyncResource
+from app.api.v1.pagination import get_pagination_args, paginated, pagination_params
+from app.api.v1.serializers import register
 
 facade = HBnBFacade()
+async_facade = AsyncHBnBFacade()
 
 api = Namespace("users", description="User operations")
 
@@ -22,28 +27,49 @@ user_update_model = api.model("UserUpdate", {
     "password":   fields.String(description="Password of the user"),
 })
 
-def user_to_dict(user):
-    """Convert user to dictionary WITHOUT password."""
-    return {
-        "id":         user.id,
-        "first_name": user.first_name,
-        "last_name":  user.last_name,
-        "email":      user.email,
-        "is_admin":   user.is_admin,
-    }
+# The password is never part of the payload
+user_to_dict = register("user", {
+    "id":         "obj.id",
+    "first_name": "obj.first_name",
+    "last_name":  "obj.last_name",
+    "email":      "obj.email",
+    "is_admin":   "obj.is_admin",
+})
 
 
 @api.route("/")
-class UserList(Resource):
+class UserList(AsyncResource):
 
+    @api.doc(params=pagination_params)
     @api.response(200, "List of users retrieved successfully")
+    @api.response(400, "Invalid pagination parameters")
     @api.response(403, "Admin access required")
     @jwt_required()
     def get(self):
         """Retrieve a list of users - ADMIN ONLY"""
         if not get_jwt().get('is_admin', False):
             return {'error': 'Admin access required'}, 403
-        return [user_to_dict(u) for u in facade.get_all_users()], 200
+        try:
+            limit, cursor = get_pagination_args()
+            if limit is None and cursor is None:
+                return user_to_dict.many(facade.get_all_users()), 200
+            users, next_cursor = facade.get_all_users(limit, cursor)
+        except ValueError as e:
+            return {"error": str(e)}, 400
+        return paginated(user_to_dict.many(users), next_cursor), 200
+
+    @jwt_required()
+    async def async_get(self):
+        if not get_jwt().get('is_admin', False):
+            return {'error': 'Admin access required'}, 403
+        try:
+            limit, cursor = get_pagination_args()
+            if limit is None and cursor is None:
+                return user_to_dict.many(await async_facade.get_all_users()), 200
+            users, next_cursor = await async_facade.get_all_users(limit, cursor)
+        except ValueError as e:
+            return {"error": str(e)}, 400
+        return paginated(user_to_dict.many(users), next_cursor), 200
 
     @api.expect(user_model, validate=True)
     @api.response(201, "User successfully created")
@@ -62,7 +88,7 @@ class UserList(Resource):
 
 
 @api.route("/<string:user_id>")
-class UserResource(Resource):
+class UserResource(AsyncResource):
 
     @api.response(200, "User details retrieved successfully")
     @api.response(404, "User not found")
@@ -73,6 +99,12 @@ class UserResource(Resource):
             return {"error": "User not found"}, 404
         return user_to_dict(user), 200
 
+    async def async_get(self, user_id):
+        user = await async_facade.get_user(user_id)
+        if not user:
+            return {"error": "User not found"}, 404
+        return user_to_dict(user), 200
+
     @api.expect(user_update_model, validate=False)
     @api.response(200, "User updated successfully")
     @api.response(400, "Invalid input data")
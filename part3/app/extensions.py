@@ -1,7 +1,43 @@
 from flask_sqlalchemy import SQLAlchemy
+from flask_sqlalchemy.session import Session
 from flask_jwt_extended import JWTManager
 from flask_bcrypt import Bcrypt
 
-db = SQLAlchemy()
+# Bind key of the optional read replica (see SQLALCHEMY_BINDS in config.py)
+REPLICA_BIND_KEY = "replica"
+
+
+class RoutingSession(Session):
+    """
+    Session that sends SELECT statements to the read replica when one is
+    configured, and everything else to the primary database.
+
+    Once the session has written (flush or DML statement) it sticks to the
+    primary for the rest of its life. The session is scoped to the app
+    context, so a request always reads its own writes.
+
+    The session is also the identity map of the request: get() by primary
+    key returns the object already loaded, keyed by (model, id), without
+    a query. Commits do not expire the loaded objects, so they stay usable
+    for the rest of the request; the session and its identity map are
+    removed when the app context is torn down.
+    """
+
+    def stick_to_primary(self):
+        """Route every following statement of this session to the primary."""
+        self.info["use_primary"] = True
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self.info.get("use_primary"):
+            if self._flushing or getattr(clause, "is_dml", False):
+                self.stick_to_primary()
+            elif getattr(clause, "is_select", False):
+                replica = self._db.engines.get(REPLICA_BIND_KEY)
+                if replica is not None:
+                    return replica
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+db = SQLAlchemy(session_options={"class_": RoutingSession, "expire_on_commit": False})
 jwt = JWTManager()
 bcrypt = Bcrypt()
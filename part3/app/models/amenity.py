@@ -7,6 +7,14 @@ from typing import Any
 from app.extensions import db
 from .base_model import BaseModel
 
+# Compressed bitmap (app/models/bitmap.py) of the ordinals of the places
+# of each amenity, see app/persistence/bitmaps.py
+amenity_bitmaps = db.Table(
+    'amenity_bitmaps',
+    db.Column('amenity_id', db.String(36), db.ForeignKey('amenities.id'), primary_key=True),
+    db.Column('bitmap', db.LargeBinary, nullable=False),
+)
+
 
 class Amenity(BaseModel):
     """
@@ -18,6 +26,7 @@ class Amenity(BaseModel):
     """
     
     __tablename__ = 'amenities'
+    __indexes__ = (('name',),)
 
     # ==================== TASK 7: SQLAlchemy Columns ====================
     name = db.Column(db.String(50), nullable=False)
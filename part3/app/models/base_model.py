@@ -3,6 +3,8 @@
 from datetime import datetime
 import uuid
 
+from sqlalchemy.orm import declared_attr
+
 from app.extensions import db
 
 
@@ -15,6 +17,24 @@ class BaseModel(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    # Extra indexes of the table, as tuples of column names; each becomes
+    # ix_<table>_<columns>, or the unique index uq_<table>_<columns> for
+    # __unique__. Keep them in sync with sql/migrations.
+    __indexes__ = ()
+    __unique__ = ()
+
+    @declared_attr
+    def __table_args__(cls):
+        """Index backing keyset pagination on (created_at, id), then __indexes__ and __unique__."""
+        table = cls.__tablename__
+        return tuple(
+            db.Index(f'ix_{table}_{"_".join(columns)}', *columns)
+            for columns in (('created_at', 'id'),) + tuple(cls.__indexes__)
+        ) + tuple(
+            db.Index(f'uq_{table}_{"_".join(columns)}', *columns, unique=True)
+            for columns in cls.__unique__
+        )
+
     def __init__(self, **kwargs):
         """Initialize base model with optional kwargs."""
         if kwargs:
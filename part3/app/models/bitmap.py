@@ -0,0 +1,225 @@
+"""
+Compressed bitmaps of non-negative integers (roaring layout).
+
+The values are split by their high 16 bits into containers of at most
+65536 low values. A container of up to ARRAY_MAX values is a sorted
+array('H'), 2 bytes per value; a fuller one is a 65536-bit int, so the
+AND and the count of two dense containers run in C (int &, bit_count).
+Each container switches form as it crosses ARRAY_MAX.
+"""
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+
+ARRAY_MAX = 4096
+_BITSET_BYTES = 1 << 13
+_HEADER = struct.Struct("<HBI")
+_VERSION = b"\x01"
+_KIND_ARRAY, _KIND_BITSET = 0, 1
+# Positions of the set bits of every byte value
+_BYTE_BITS = [tuple(bit for bit in range(8) if byte >> bit & 1) for byte in range(256)]
+
+
+class Bitmap:
+    """Set of non-negative integers below 2**32, stored compressed"""
+
+    __slots__ = ("_containers",)
+
+    def __init__(self, values=()):
+        # high 16 bits -> array('H') of the low 16 bits, or int bitset
+        self._containers = {}
+        self.update(values)
+
+    def update(self, values):
+        """Add every value of values; cheaper than add() one by one"""
+        values = sorted(set(values))
+        if not values:
+            return
+        _check(values[0])
+        _check(values[-1])
+        # Sorted, the values of a container are a slice
+        start = 0
+        while start < len(values):
+            high = values[start] >> 16
+            end = bisect_left(values, (high + 1) << 16, start)
+            base = high << 16
+            lows = [value - base for value in values[start:end]]
+            container = self._containers.get(high)
+            if container is None:
+                self._containers[high] = _bitset(lows) if len(lows) > ARRAY_MAX else array("H", lows)
+            else:
+                self._containers[high] = _container(lows + _lows(container))
+            start = end
+
+    def add(self, value):
+        _check(value)
+        high, low = value >> 16, value & 0xFFFF
+        container = self._containers.get(high)
+        if container is None:
+            self._containers[high] = array("H", (low,))
+        elif isinstance(container, int):
+            self._containers[high] = container | (1 << low)
+        else:
+            index = bisect_left(container, low)
+            if index == len(container) or container[index] != low:
+                container.insert(index, low)
+                if len(container) > ARRAY_MAX:
+                    self._containers[high] = _bitset(container)
+
+    def discard(self, value):
+        high, low = value >> 16, value & 0xFFFF
+        container = self._containers.get(high)
+        if container is None:
+            return
+        if isinstance(container, int):
+            container &= ~(1 << low)
+            self._containers[high] = _normalize(container)
+        else:
+            index = bisect_left(container, low)
+            if index < len(container) and container[index] == low:
+                del container[index]
+        if not _size(self._containers[high]):
+            del self._containers[high]
+
+    def __contains__(self, value):
+        container = self._containers.get(value >> 16)
+        if container is None:
+            return False
+        low = value & 0xFFFF
+        if isinstance(container, int):
+            return bool(container >> low & 1)
+        index = bisect_left(container, low)
+        return index < len(container) and container[index] == low
+
+    def __len__(self):
+        return sum(_size(container) for container in self._containers.values())
+
+    def __iter__(self):
+        """The values in increasing order"""
+        for high in sorted(self._containers):
+            base = high << 16
+            for low in _lows(self._containers[high]):
+                yield base | low
+
+    def __eq__(self, other):
+        if not isinstance(other, Bitmap):
+            return NotImplemented
+        return self._containers == other._containers
+
+    def __and__(self, other):
+        result = Bitmap()
+        for high in self._containers.keys() & other._containers.keys():
+            container = _and(self._containers[high], other._containers[high])
+            if _size(container):
+                result._containers[high] = container
+        return result
+
+    def intersection_count(self, other):
+        """len(self & other), without building the intersection"""
+        count = 0
+        for high in self._containers.keys() & other._containers.keys():
+            a, b = self._containers[high], other._containers[high]
+            if isinstance(a, int) and isinstance(b, int):
+                count += (a & b).bit_count()
+            else:
+                count += _size(_and(a, b))
+        return count
+
+    def __repr__(self):
+        return f"<Bitmap of {len(self)} values>"
+
+    # ============= Serialization =============
+
+    def to_bytes(self):
+        parts = [_VERSION]
+        for high in sorted(self._containers):
+            container = self._containers[high]
+            if isinstance(container, int):
+                parts.append(_HEADER.pack(high, _KIND_BITSET, container.bit_count()))
+                parts.append(container.to_bytes(_BITSET_BYTES, "little"))
+            else:
+                parts.append(_HEADER.pack(high, _KIND_ARRAY, len(container)))
+                parts.append(_little_endian(container).tobytes())
+        return b"".join(parts)
+
+    @classmethod
+    def from_bytes(cls, data):
+        """Bitmap serialized by to_bytes(); raises ValueError when data is not one"""
+        if not data or data[:1] != _VERSION:
+            raise ValueError("Not a serialized bitmap")
+        bitmap = cls()
+        offset = 1
+        try:
+            while offset < len(data):
+                high, kind, size = _HEADER.unpack_from(data, offset)
+                offset += _HEADER.size
+                if kind == _KIND_BITSET:
+                    end = offset + _BITSET_BYTES
+                    container = int.from_bytes(data[offset:end], "little")
+                else:
+                    end = offset + 2 * size
+                    container = array("H")
+                    container.frombytes(data[offset:end])
+                    container = _little_endian(container)
+                bitmap._containers[high] = container
+                offset = end
+        except struct.error:
+            raise ValueError("Truncated bitmap")
+        return bitmap
+
+
+def _check(value):
+    if not 0 <= value < 1 << 32:
+        raise ValueError(f"Bitmap values must be in [0, 2**32), got {value}")
+
+
+def _size(container):
+    return container.bit_count() if isinstance(container, int) else len(container)
+
+
+def _lows(container):
+    """Low values of a container, in increasing order"""
+    if not isinstance(container, int):
+        return list(container)
+    data = container.to_bytes(_BITSET_BYTES, "little")
+    return [index << 3 | bit for index, byte in enumerate(data) if byte for bit in _BYTE_BITS[byte]]
+
+
+def _bitset(lows):
+    data = bytearray(_BITSET_BYTES)
+    for low in lows:
+        data[low >> 3] |= 1 << (low & 7)
+    return int.from_bytes(data, "little")
+
+
+def _container(lows):
+    """Container of the low values lows (any order, duplicates allowed)"""
+    lows = sorted(set(lows))
+    return _bitset(lows) if len(lows) > ARRAY_MAX else array("H", lows)
+
+
+def _normalize(bits):
+    """Bitset container, as an array once it holds ARRAY_MAX values or less"""
+    return bits if bits.bit_count() > ARRAY_MAX else array("H", _lows(bits))
+
+
+def _and(a, b):
+    if isinstance(a, int) and isinstance(b, int):
+        return _normalize(a & b)
+    if isinstance(a, int):
+        a, b = b, a
+    if isinstance(b, int):
+        data = b.to_bytes(_BITSET_BYTES, "little")
+        return array("H", (low for low in a if data[low >> 3] >> (low & 7) & 1))
+    if len(a) > len(b):
+        a, b = b, a
+    return array("H", sorted(set(a).intersection(b)))
+
+
+def _little_endian(container):
+    """Serialized arrays are little-endian whatever the platform"""
+    if sys.byteorder == "big":
+        container = array("H", container)
+        container.byteswap()
+    return container
@@ -0,0 +1,169 @@
+"""
+Geographic helpers: geohash encoding, great-circle distance and bounding
+boxes. Coordinates are in degrees, distances in kilometres.
+
+A bounding box is a (south, west, north, east) tuple; west > east means
+the box crosses the antimeridian (longitude 180).
+
+Places store the geohash of their location in an indexed column. Every
+geohash cell is a prefix, and the geohashes of the places inside a cell
+form one contiguous range of the index, so covering_prefixes() turns a
+bounding box into a few index range scans.
+"""
+import heapq
+import math
+
+EARTH_RADIUS_KM = 6371.0088
+GEOHASH_PRECISION = 9
+GEOHASH_ALPHABET = "0123456789bcdefghjkmnpqrstuvwxyz"
+# Sorts after every geohash character: prefix <= geohash < prefix + END
+GEOHASH_END = "{"
+
+# Upper bound on the number of prefixes (index range scans) per box
+MAX_COVERING_CELLS = 16
+
+
+def encode_geohash(lat, lon, precision=GEOHASH_PRECISION):
+    """Geohash of (lat, lon) with precision characters"""
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, bits, value, even = [], 0, 0, True
+    while len(chars) < precision:
+        # Bits alternate between longitude (even) and latitude (odd)
+        interval, coordinate = (lon_range, lon) if even else (lat_range, lat)
+        middle = (interval[0] + interval[1]) / 2
+        value <<= 1
+        if coordinate >= middle:
+            value |= 1
+            interval[0] = middle
+        else:
+            interval[1] = middle
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(GEOHASH_ALPHABET[value])
+            bits, value = 0, 0
+    return "".join(chars)
+
+
+def cell_size(precision):
+    """(height, width) in degrees of the geohash cells of precision characters"""
+    lon_bits = (5 * precision + 1) // 2
+    lat_bits = 5 * precision // 2
+    return 180.0 / 2 ** lat_bits, 360.0 / 2 ** lon_bits
+
+
+def covering_prefixes(bbox, max_cells=MAX_COVERING_CELLS):
+    """
+    Sorted geohash prefixes whose cells cover bbox: the longest precision
+    needing at most max_cells cells (one character, the whole world in 32
+    cells, for very large boxes).
+    """
+    boxes = split_antimeridian(bbox)
+    for precision in range(GEOHASH_PRECISION, 1, -1):
+        height, width = cell_size(precision)
+        count = sum(
+            (math.floor((north + 90) / height) - math.floor((south + 90) / height) + 1)
+            * (math.floor((east + 180) / width) - math.floor((west + 180) / width) + 1)
+            for south, west, north, east in boxes
+        )
+        if count <= max_cells:
+            break
+    else:
+        return sorted(GEOHASH_ALPHABET)
+
+    prefixes = set()
+    for south, west, north, east in boxes:
+        first_row, last_row = (math.floor((v + 90) / height) for v in (south, north))
+        first_col, last_col = (math.floor((v + 180) / width) for v in (west, east))
+        for row in range(first_row, last_row + 1):
+            for col in range(first_col, last_col + 1):
+                # Center of the cell, kept inside the world
+                lat = min(-90 + (row + 0.5) * height, 90.0)
+                lon = min(-180 + (col + 0.5) * width, 180.0)
+                prefixes.add(encode_geohash(lat, lon, precision))
+    return sorted(prefixes)
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Great-circle distance between two points"""
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = (math.sin((lat2 - lat1) / 2) ** 2
+         + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def nearest(points, lat, lon, radius_km, limit=None):
+    """
+    (distance, key) pairs of the (key, lat, lon) points within radius_km
+    of (lat, lon), nearest first, at most limit of them.
+    """
+    distances = (
+        (haversine_km(lat, lon, point_lat, point_lon), key) for key, point_lat, point_lon in points
+    )
+    within = [(distance, key) for distance, key in distances if distance <= radius_km]
+    if limit is None:
+        return sorted(within)
+    return heapq.nsmallest(limit, within)
+
+
+def search_radii(radius_km, limit=None):
+    """
+    Radii of an expanding nearby search: when the `limit` nearest places
+    are found within a smaller circle, the larger ones are not searched.
+    """
+    if limit is None:
+        return [radius_km]
+    return [radius_km / 16, radius_km / 4, radius_km]
+
+
+def bounding_box(lat, lon, radius_km):
+    """Smallest bounding box holding every point within radius_km of (lat, lon)"""
+    angle = radius_km / EARTH_RADIUS_KM
+    delta_lat = math.degrees(angle)
+    south, north = lat - delta_lat, lat + delta_lat
+    if south <= -90 or north >= 90:
+        # The circle holds a pole: every longitude
+        return max(south, -90.0), -180.0, min(north, 90.0), 180.0
+
+    ratio = math.sin(angle) / math.cos(math.radians(lat))
+    if angle >= math.pi / 2 or ratio >= 1:
+        return south, -180.0, north, 180.0
+    delta_lon = math.degrees(math.asin(ratio))
+    west, east = lon - delta_lon, lon + delta_lon
+    if west < -180:
+        west += 360
+    if east > 180:
+        east -= 360
+    return south, west, north, east
+
+
+def split_antimeridian(bbox):
+    """The bounding box as one or two boxes that do not cross the antimeridian"""
+    south, west, north, east = bbox
+    if west <= east:
+        return [bbox]
+    return [(south, west, north, 180.0), (south, -180.0, north, east)]
+
+
+def check_coordinates(lat, lon):
+    """Raise ValueError unless (lat, lon) is a valid location"""
+    if not -90 <= lat <= 90:
+        raise ValueError("Latitude must be between -90 and 90")
+    if not -180 <= lon <= 180:
+        raise ValueError("Longitude must be between -180 and 180")
+
+
+def parse_bbox(value):
+    """
+    Parse a "west,south,east,north" string into a (south, west, north,
+    east) bounding box. Raises ValueError when it is not a valid box.
+    """
+    try:
+        west, south, east, north = (float(v) for v in value.split(","))
+    except (AttributeError, ValueError):
+        raise ValueError('bbox must be "west,south,east,north"')
+    if not (-90 <= south <= north <= 90):
+        raise ValueError("bbox latitudes must be between -90 and 90, south <= north")
+    if not (-180 <= west <= 180 and -180 <= east <= 180):
+        raise ValueError("bbox longitudes must be between -180 and 180")
+    return south, west, north, east
@@ -3,13 +3,17 @@
 from __future__ import annotations
 import re
 from typing import Any
+from sqlalchemy.orm import validates
 from app.extensions import db
 from .base_model import BaseModel
+from .geo import encode_geohash
 
 place_amenity = db.Table(   
     'place_amenity',
     db.Column('place_id',   db.String(36), db.ForeignKey('places.id'),    primary_key=True),
-    db.Column('amenity_id', db.String(36), db.ForeignKey('amenities.id'), primary_key=True)
+    db.Column('amenity_id', db.String(36), db.ForeignKey('amenities.id'), primary_key=True),
+    # The primary key serves place -> amenities; this serves amenity -> places
+    db.Index('ix_place_amenity_amenity_id_place_id', 'amenity_id', 'place_id')
 )
 
 class Place(BaseModel):
@@ -22,20 +26,51 @@ class Place(BaseModel):
         price (float): Price per night (required, positive, max 1,000,000)
         latitude (float): Latitude coordinate (required, between -90 and 90)
         longitude (float): Longitude coordinate (required, between -180 and 180)
+        geohash (str): Geohash of (latitude, longitude), kept in sync with them
+        review_count (int): Number of reviews of the place
+        rating_sum (int): Sum of the ratings of those reviews
+        rating_1 .. rating_5 (int): Number of reviews per rating (histogram)
+        average_rating (float): rating_sum / review_count, 0 without reviews
+        ordinal (int): Dense number of the place, assigned by the database
+            on insert, numbering it in the amenity bitmaps
+
+    The rating aggregates are maintained with the reviews, see
+    app/persistence/ratings.py. The indexed geohash serves the location
+    searches, see app/models/geo.py. The amenity bitmaps are maintained
+    with the links, see app/persistence/bitmaps.py.
     """
 
     __tablename__ = 'places'
+    # (price, id) and (average_rating, id) serve the sorted listings,
+    # updated_at the version of the lists (app/persistence/versions.py)
+    __indexes__ = (('owner_id', 'created_at'), ('geohash',), ('price', 'id'), ('average_rating', 'id'),
+                   ('updated_at',))
+    __unique__ = (('ordinal',),)
 
     title       = db.Column(db.String(100), nullable=False)
     description = db.Column(db.Text,        nullable=True)
     price       = db.Column(db.Float,       nullable=False)
     latitude    = db.Column(db.Float,       nullable=False)
     longitude   = db.Column(db.Float,       nullable=False)
+    geohash     = db.Column(db.String(12),  nullable=True)
+
+    review_count = db.Column(db.Integer, nullable=False, default=0)
+    rating_sum   = db.Column(db.Integer, nullable=False, default=0)
+    rating_1     = db.Column(db.Integer, nullable=False, default=0)
+    rating_2     = db.Column(db.Integer, nullable=False, default=0)
+    rating_3     = db.Column(db.Integer, nullable=False, default=0)
+    rating_4     = db.Column(db.Integer, nullable=False, default=0)
+    rating_5     = db.Column(db.Integer, nullable=False, default=0)
+    average_rating = db.Column(db.Float, nullable=False, default=0.0)
+    # Set by the place_ordinal trigger once the row is inserted; the
+    # session expires it then (see app/persistence/bitmaps.py)
+    ordinal = db.Column(db.Integer, nullable=True, server_default=db.FetchedValue())
 
     owner_id  = db.Column(db.String(36), db.ForeignKey('users.id'), nullable=False)
     reviews   = db.relationship('Review',  backref='place', lazy=True,
                                 cascade='all, delete-orphan')
-    amenities = db.relationship('Amenity', secondary=place_amenity, lazy='subquery',
+    # Loaded per endpoint, see loading_profiles() in app/services/facade.py
+    amenities = db.relationship('Amenity', secondary=place_amenity, lazy=True,
                                 backref=db.backref('places', lazy=True))
 
     def __init__(self, **kwargs):
@@ -75,11 +110,27 @@ class Place(BaseModel):
         if not (-180 <= self.longitude <= 180):
             raise ValueError("Longitude must be between -180 and 180")
 
+    @validates('latitude', 'longitude')
+    def _update_geohash(self, key, value):
+        """Recompute the geohash whenever a coordinate changes"""
+        lat = value if key == 'latitude' else self.latitude
+        lon = value if key == 'longitude' else self.longitude
+        try:
+            valid = -90 <= lat <= 90 and -180 <= lon <= 180
+        except TypeError:
+            valid = False
+        # Out of range coordinates are rejected by __init__
+        self.geohash = encode_geohash(lat, lon) if valid else None
+        return value
 
     def get_average_rating(self) -> float:    
-        if not self.reviews:
+        if not self.review_count:
             return 0.0
-        return sum(r.rating for r in self.reviews) / len(self.reviews)
+        return self.rating_sum / self.review_count
+
+    def get_rating_histogram(self) -> dict:
+        """Number of reviews per rating, as {"1": count, ..., "5": count}"""
+        return {str(stars): getattr(self, f"rating_{stars}") or 0 for stars in range(1, 6)}
 
 
     def to_dict(self) -> dict:    
@@ -91,6 +142,9 @@ class Place(BaseModel):
             "latitude":    self.latitude,
             "longitude":   self.longitude,
             "owner_id":    self.owner_id,
+            "review_count":     self.review_count or 0,
+            "average_rating":   self.get_average_rating(),
+            "rating_histogram": self.get_rating_histogram(),
             "amenities":   [{"id": a.id, "name": a.name} for a in self.amenities],
         })
         return base_dict
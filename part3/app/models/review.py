@@ -8,6 +8,10 @@ from app.extensions import db
 from .base_model import BaseModel
 
 
+class DuplicateReviewError(ValueError):
+    """The user has already reviewed the place"""
+
+
 class Review(BaseModel):
     """
     Review entity with SQLAlchemy mapping.
@@ -18,6 +22,9 @@ class Review(BaseModel):
     """
     
     __tablename__ = 'reviews'
+    __indexes__ = (('place_id', 'created_at'), ('user_id', 'created_at'))
+    # One review per user and place
+    __unique__ = (('user_id', 'place_id'),)
 
     text = db.Column(db.Text, nullable=False)
     rating = db.Column(db.Integer, nullable=False)
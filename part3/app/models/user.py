@@ -22,6 +22,8 @@ class User(BaseModel):
     """
 
     __tablename__ = 'users'
+    # MAX(updated_at) is part of the version of the places, see app/persistence/versions.py
+    __indexes__ = (('updated_at',),)
 
     first_name = db.Column(db.String(50), nullable=False)
     last_name = db.Column(db.String(50), nullable=False)
@@ -0,0 +1,325 @@
+"""
+asyncio repositories over an async SQLAlchemy engine (aiosqlite for SQLite).
+
+The async engine is created on first use from the URL of the app's main
+engine, so it points at the same database, and is kept in app.extensions.
+With a read replica (the "replica" bind, see RoutingSession in
+app/extensions.py) a second async engine serves the SELECT statements of
+the sessions that have not written. It needs the optional `aiosqlite`
+and `greenlet` packages.
+
+Flask runs each async view in a fresh event loop, so connections are not
+pooled across requests (NullPool); opening a SQLite connection is cheap.
+"""
+import threading
+
+from flask import current_app
+from sqlalchemy import exists, select
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy.pool import NullPool
+
+from app.extensions import REPLICA_BIND_KEY, db
+from app.models.user import User
+from app.models.place import Place
+from app.models.review import DuplicateReviewError, Review
+from app.models.amenity import Amenity
+from app.persistence.engine import set_sqlite_pragmas
+from app.persistence.ratings import rating_changes
+from app.models.geo import nearest, search_radii
+from app.persistence.repository import after_cursor, by_ids, encode_cursor, in_bbox, nearby_candidates
+from app.persistence.bitmaps import amenity_counts, bitmaps_query, having_all
+from app.persistence.listing import PlaceListing
+from app.persistence.search import search_page, search_statement
+
+# Sync driver -> asyncio driver
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "mysql": "mysql+aiomysql",
+}
+
+_EXTENSION_KEY = "hbnb_async_session"
+_init_lock = threading.Lock()
+
+
+def async_session():
+    """Return a new AsyncSession bound to the current app's database"""
+    sessionmaker = current_app.extensions.get(_EXTENSION_KEY)
+    if sessionmaker is None:
+        with _init_lock:
+            sessionmaker = current_app.extensions.get(_EXTENSION_KEY)
+            if sessionmaker is None:
+                sessionmaker = current_app.extensions[_EXTENSION_KEY] = _create_sessionmaker()
+    return sessionmaker()
+
+
+class AsyncRoutingSession(Session):
+    """
+    Sync session of the async sessions, routed like RoutingSession: the
+    SELECT statements go to the replica engine of info["replica"], if
+    any, until the session writes; then everything goes to the primary.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        replica = self.info.get("replica")
+        if replica is not None and bind is None and not self.info.get("use_primary"):
+            if self._flushing or getattr(clause, "is_dml", False):
+                self.info["use_primary"] = True
+            elif getattr(clause, "is_select", False):
+                return replica
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def _create_engine(sync_engine):
+    """Async engine over the database of sync_engine"""
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    url = sync_engine.url
+    url = url.set(drivername=ASYNC_DRIVERS.get(url.get_backend_name(), url.drivername))
+    engine = create_async_engine(url, poolclass=NullPool)
+    set_sqlite_pragmas(engine.sync_engine, current_app.config.get("SQLITE_PRAGMAS"))
+    return engine
+
+
+def _create_sessionmaker():
+    # Imported here so that the app runs without the async extras
+    from sqlalchemy.ext.asyncio import async_sessionmaker
+
+    engine = _create_engine(db.engine)
+    replica = db.engines.get(REPLICA_BIND_KEY)
+    info = {"replica": _create_engine(replica).sync_engine} if replica is not None else {}
+    # Objects are read after the session is closed
+    return async_sessionmaker(engine, expire_on_commit=False, sync_session_class=AsyncRoutingSession, info=info)
+
+
+class AsyncBaseRepository:
+    """Generic asyncio repository for CRUD operations, one session per call"""
+    def __init__(self, model):
+        self.model = model
+
+    def _loader_options(self):
+        """
+        Relationships loaded with every object. Lazy loading is not
+        available once the session is closed, so anything the API
+        serializes must be listed here.
+        """
+        return ()
+
+    def _select(self):
+        return select(self.model).options(*self._loader_options())
+
+    async def get_by_id(self, obj_id):
+        async with async_session() as session:
+            return await session.get(self.model, obj_id, options=self._loader_options())
+
+    async def get_all(self):
+        async with async_session() as session:
+            return (await session.scalars(self._select())).all()
+
+    async def get_all_by(self, **filters):
+        async with async_session() as session:
+            return (await session.scalars(self._select().filter_by(**filters))).all()
+
+    async def get_first_by(self, **filters):
+        async with async_session() as session:
+            return (await session.scalars(self._select().filter_by(**filters).limit(1))).first()
+
+    async def get_page(self, limit, cursor=None):
+        """Same as BaseRepository.get_page"""
+        query = self._select().order_by(self.model.created_at, self.model.id)
+        if cursor:
+            query = query.where(after_cursor(self.model, cursor))
+
+        async with async_session() as session:
+            items = (await session.scalars(query.limit(limit + 1))).all()
+        if len(items) > limit:
+            items = items[:limit]
+            return items, encode_cursor(items[-1])
+        return items, None
+
+    async def create(self, obj):
+        async with async_session() as session:
+            session.add(obj)
+            await session.commit()
+        return obj
+
+    async def create_many(self, objs, chunk_size=500):
+        """Same as BaseRepository.create_many"""
+        created, failed = [], []
+        async with async_session() as session:
+            for start in range(0, len(objs), chunk_size):
+                chunk = objs[start:start + chunk_size]
+                session.add_all(chunk)
+                try:
+                    await session.commit()
+                except SQLAlchemyError as e:
+                    await session.rollback()
+                    failed.extend((obj, str(e.orig) if hasattr(e, 'orig') else str(e)) for obj in chunk)
+                else:
+                    created.extend(chunk)
+        return created, failed
+
+    async def update(self, obj_id, data):
+        """Set every attribute of data that the object has, then commit"""
+        async with async_session() as session:
+            obj = await session.get(self.model, obj_id, options=self._loader_options())
+            if obj:
+                for key, value in data.items():
+                    if hasattr(obj, key):
+                        setattr(obj, key, value)
+                await session.commit()
+            return obj
+
+    async def delete(self, obj_id):
+        async with async_session() as session:
+            obj = await session.get(self.model, obj_id)
+            if not obj:
+                return False
+            await session.delete(obj)
+            await session.commit()
+            return True
+
+class AsyncUserRepository(AsyncBaseRepository):
+    def __init__(self):
+        super().__init__(User)
+
+    async def delete(self, obj_id):
+        """Delete the user, its reviews leaving the rating of their places"""
+        async with async_session() as session:
+            user = await session.get(User, obj_id, options=(selectinload(User.reviews),))
+            if not user:
+                return False
+            for review in user.reviews:
+                for statement in rating_changes((review.place_id, review.rating), None):
+                    await session.execute(statement)
+            await session.delete(user)
+            await session.commit()
+            return True
+
+    async def get_by_email(self, email):
+        return await self.get_first_by(email=email)
+
+class AsyncPlaceRepository(AsyncBaseRepository):
+    def __init__(self):
+        super().__init__(Place)
+
+    def _loader_options(self):
+        return (selectinload(Place.owner), selectinload(Place.amenities))
+
+    async def get_within(self, bbox, limit=None):
+        """Same as PlaceRepository.get_within"""
+        query = self._select().where(in_bbox(bbox))
+        if limit is not None:
+            query = query.limit(limit)
+        async with async_session() as session:
+            return (await session.scalars(query)).all()
+
+    async def get_nearby(self, lat, lon, radius_km, limit=None):
+        """Same as PlaceRepository.get_nearby"""
+        async with async_session() as session:
+            for search_radius in search_radii(radius_km, limit):
+                candidates = await session.execute(nearby_candidates(lat, lon, search_radius))
+                found = nearest(candidates, lat, lon, search_radius, limit)
+                if limit is not None and len(found) >= limit:
+                    break
+            if not found:
+                return []
+            ids = [place_id for _, place_id in found]
+            places = by_ids(await session.scalars(self._select().where(Place.id.in_(ids))), ids)
+        distances = {place_id: distance for distance, place_id in found}
+        return [(distances[place.id], place) for place in places]
+
+    async def search(self, q, limit, cursor=None):
+        """Same as PlaceRepository.search"""
+        async with async_session() as session:
+            hits, next_cursor = search_page(await session.execute(search_statement(q, limit, cursor)), limit)
+            if not hits:
+                return [], next_cursor
+            ids = [place_id for place_id, _ in hits]
+            places = by_ids(await session.scalars(self._select().where(Place.id.in_(ids))), ids)
+        snippets = dict(hits)
+        return [(snippets[place.id], place) for place in places], next_cursor
+
+    async def get_listing(self, listing, limit, cursor=None, facets=False):
+        """Same as PlaceRepository.get_listing"""
+        async with async_session() as session:
+            ordinals = None
+            if listing.amenities:
+                ordinals = having_all(await session.execute(bitmaps_query(listing.amenities)), listing.amenities)
+            query = listing.page_query(limit, cursor, ordinals).options(*self._loader_options())
+            places, next_cursor = listing.page((await session.scalars(query)).all(), limit)
+            if not facets:
+                return places, next_cursor, None
+
+            prices = (await session.execute(listing.price_facet_query(ordinals))).all()
+            ordinals = listing.matching(prices, ordinals)
+            counts = amenity_counts(await session.execute(bitmaps_query()), ordinals)
+        return places, next_cursor, PlaceListing.facets(prices, counts)
+
+class AsyncReviewRepository(AsyncBaseRepository):
+    def __init__(self):
+        super().__init__(Review)
+
+    def _loader_options(self):
+        return (selectinload(Review.user),)
+
+    async def has_reviewed(self, user_id, place_id, session=None):
+        """Whether user_id has reviewed place_id: one probe of the unique index"""
+        query = select(exists().where(Review.user_id == user_id, Review.place_id == place_id))
+        if session is not None:
+            return await session.scalar(query)
+        async with async_session() as session:
+            return await session.scalar(query)
+
+    async def _commit(self, session, user_id, place_id):
+        """Commit, raising DuplicateReviewError when the unique index refuses it"""
+        try:
+            await session.commit()
+        except IntegrityError:
+            await session.rollback()
+            if await self.has_reviewed(user_id, place_id, session):
+                raise DuplicateReviewError("You have already reviewed this place")
+            raise
+
+    # Reviews maintain the rating aggregates of their place in the same
+    # transaction (see app/persistence/ratings.py)
+
+    async def _count_rating(self, session, before, after):
+        # Without autoflush: a conflicting review change must fail at commit
+        with session.no_autoflush:
+            for statement in rating_changes(before, after):
+                await session.execute(statement)
+
+    async def create(self, obj):
+        async with async_session() as session:
+            await self._count_rating(session, None, (obj.place_id, obj.rating))
+            session.add(obj)
+            await self._commit(session, obj.user_id, obj.place_id)
+        return obj
+
+    async def update(self, obj_id, data):
+        async with async_session() as session:
+            review = await session.get(Review, obj_id, options=self._loader_options())
+            if review:
+                before = (review.place_id, review.rating)
+                for key, value in data.items():
+                    if hasattr(review, key):
+                        setattr(review, key, value)
+                await self._count_rating(session, before, (review.place_id, review.rating))
+                await self._commit(session, review.user_id, review.place_id)
+            return review
+
+    async def delete(self, obj_id):
+        async with async_session() as session:
+            review = await session.get(Review, obj_id)
+            if not review:
+                return False
+            await self._count_rating(session, (review.place_id, review.rating), None)
+            await session.delete(review)
+            await session.commit()
+            return True
+
+class AsyncAmenityRepository(AsyncBaseRepository):
+    def __init__(self):
+        super().__init__(Amenity)
@@ -0,0 +1,220 @@
+"""
+Bitmap index of the amenities of the places.
+
+Every place has a dense integer ordinal, set on insert by the
+place_ordinal trigger. amenity_bitmaps holds, per amenity, the
+compressed bitmap (app/models/bitmap.py) of the ordinals of its places:
+"has all of these amenities" is the AND of their bitmaps, and the
+amenity counts of a listing are the sizes of ANDs.
+
+The bitmaps change in the same transaction as the place_amenity rows:
+before a flush, the links added and removed through Place.amenities or
+Amenity.places, and those of the deleted places, are collected; after
+it, once the new places have their ordinal, they are applied. The
+ordinals of the deleted places are read from the table, and that of
+the new places is expired, so that the session loads the value the
+trigger set. Links written with raw SQL go unnoticed:
+rebuild_amenity_bitmaps() (python rebuild_bitmaps.py) recomputes every
+bitmap from place_amenity.
+"""
+from sqlalchemy import DDL, delete, event, inspect, insert, select, update
+from sqlalchemy.orm import Session
+
+from app.models.amenity import Amenity, amenity_bitmaps
+from app.models.bitmap import Bitmap
+from app.models.place import Place, place_amenity
+
+_PENDING = "amenity_bitmap_changes"
+_INSERTED = "inserted_places"
+_CHUNK = 500
+
+ORDINAL_DDL = [
+    """
+    CREATE TRIGGER IF NOT EXISTS place_ordinal AFTER INSERT ON places WHEN new.ordinal IS NULL BEGIN
+        UPDATE places SET ordinal = (SELECT COALESCE(MAX(ordinal), 0) + 1 FROM places)
+        WHERE rowid = new.rowid;
+    END
+    """,
+]
+
+for _statement in ORDINAL_DDL:
+    event.listen(Place.__table__, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
+
+
+class LinkChanges:
+    """Links added and removed by a flush, as (place_id, amenity_id) pairs"""
+
+    def __init__(self):
+        self.added = set()
+        self.removed = set()
+        # Ordinals of the deleted places, gone from the table after the flush
+        self.ordinals = {}
+        # Deleted amenities, whose bitmap goes before them
+        self.dropped = set()
+
+    def __bool__(self):
+        return bool(self.added or self.removed)
+
+
+@event.listens_for(Session, "before_flush")
+def _collect_link_changes(session, flush_context, instances):
+    changes = LinkChanges()
+    for obj in session.new | session.dirty:
+        if isinstance(obj, Place):
+            history = inspect(obj).attrs.amenities.history
+            changes.added.update((obj.id, amenity.id) for amenity in history.added)
+            changes.removed.update((obj.id, amenity.id) for amenity in history.deleted)
+        elif isinstance(obj, Amenity):
+            history = inspect(obj).attrs.places.history
+            changes.added.update((place.id, obj.id) for place in history.added)
+            changes.removed.update((place.id, obj.id) for place in history.deleted)
+    for obj in session.deleted:
+        if isinstance(obj, Place):
+            changes.ordinals[obj.id] = None
+            changes.removed.update((obj.id, amenity.id) for amenity in obj.amenities)
+        elif isinstance(obj, Amenity):
+            changes.dropped.add(obj.id)
+    # From the table, not the objects: an ordinal set by the trigger in
+    # this session may not have been loaded yet
+    for chunk in chunks(list(changes.ordinals)):
+        changes.ordinals.update(session.connection().execute(
+            select(Place.id, Place.ordinal).where(Place.id.in_(chunk))
+        ).all())
+    if changes.dropped:
+        session.connection().execute(
+            delete(amenity_bitmaps).where(amenity_bitmaps.c.amenity_id.in_(changes.dropped))
+        )
+    session.info[_PENDING] = changes
+    session.info[_INSERTED] = [obj for obj in session.new if isinstance(obj, Place)]
+
+
+@event.listens_for(Session, "after_flush")
+def _apply_link_changes(session, flush_context):
+    changes = session.info.pop(_PENDING, None)
+    if changes:
+        apply_link_changes(session.connection(), changes)
+
+
+@event.listens_for(Session, "after_flush_postexec")
+def _expire_new_ordinals(session, flush_context):
+    # The trigger sets the ordinal after the INSERT ... RETURNING of the
+    # place, which reads it back as NULL: load it again on next access
+    for place in session.info.pop(_INSERTED, ()):
+        if inspect(place).dict.get("ordinal") is None:
+            session.expire(place, ["ordinal"])
+
+
+def apply_link_changes(connection, changes):
+    """Update the bitmaps touched by changes (a LinkChanges) on connection"""
+    pairs = changes.added | changes.removed
+    ordinals = dict(changes.ordinals)
+    unknown = list({place_id for place_id, _ in pairs} - ordinals.keys())
+    for chunk in chunks(unknown):
+        ordinals.update(connection.execute(select(Place.id, Place.ordinal).where(Place.id.in_(chunk))).all())
+
+    amenity_ids = {amenity_id for _, amenity_id in pairs} - changes.dropped
+    stored = {}
+    for chunk in chunks(list(amenity_ids)):
+        stored.update(connection.execute(
+            select(amenity_bitmaps.c.amenity_id, amenity_bitmaps.c.bitmap)
+            .where(amenity_bitmaps.c.amenity_id.in_(chunk))
+        ).all())
+    bitmaps = {amenity_id: Bitmap.from_bytes(stored[amenity_id]) if amenity_id in stored else Bitmap()
+               for amenity_id in amenity_ids}
+
+    for place_id, amenity_id in changes.removed:
+        if amenity_id in bitmaps and ordinals.get(place_id) is not None:
+            bitmaps[amenity_id].discard(ordinals[place_id])
+    for place_id, amenity_id in changes.added:
+        if amenity_id in bitmaps and ordinals.get(place_id) is not None:
+            bitmaps[amenity_id].add(ordinals[place_id])
+
+    for amenity_id, bitmap in bitmaps.items():
+        save_bitmap(connection, amenity_id, bitmap, amenity_id in stored)
+
+
+def save_bitmap(connection, amenity_id, bitmap, exists):
+    if exists:
+        connection.execute(
+            update(amenity_bitmaps).where(amenity_bitmaps.c.amenity_id == amenity_id)
+            .values(bitmap=bitmap.to_bytes())
+        )
+    else:
+        connection.execute(insert(amenity_bitmaps).values(amenity_id=amenity_id, bitmap=bitmap.to_bytes()))
+
+
+def chunks(items, size=_CHUNK):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def bitmaps_query(amenity_ids=None):
+    """SELECT of the (amenity_id, name, bitmap) of amenity_ids (all when None)"""
+    query = (
+        select(amenity_bitmaps.c.amenity_id, Amenity.name, amenity_bitmaps.c.bitmap)
+        .join(Amenity, Amenity.id == amenity_bitmaps.c.amenity_id)
+    )
+    if amenity_ids is not None:
+        query = query.where(amenity_bitmaps.c.amenity_id.in_(amenity_ids))
+    return query
+
+
+def having_all(rows, amenity_ids):
+    """
+    Bitmap of the places having every amenity of amenity_ids, from the
+    rows of bitmaps_query(amenity_ids). An amenity without a bitmap has
+    no place.
+    """
+    bitmaps = {row.amenity_id: Bitmap.from_bytes(row.bitmap) for row in rows}
+    if set(amenity_ids) - bitmaps.keys():
+        return Bitmap()
+    # Smallest first: every AND is at most as large as it
+    ordered = sorted(bitmaps.values(), key=len)
+    result = ordered[0]
+    for bitmap in ordered[1:]:
+        result = result & bitmap
+    return result
+
+
+def amenity_counts(rows, matching=None):
+    """
+    [{"id", "name", "count"}] of the amenities of the rows of
+    bitmaps_query(): the number of their places in matching (all of
+    them when None), skipping the amenities without any.
+    """
+    counts = []
+    for row in rows:
+        bitmap = Bitmap.from_bytes(row.bitmap)
+        count = len(bitmap) if matching is None else bitmap.intersection_count(matching)
+        if count:
+            counts.append({"id": row.amenity_id, "name": row.name, "count": count})
+    return counts
+
+
+def rebuild_amenity_bitmaps(session):
+    """
+    Recompute the bitmap of every amenity from place_amenity and commit.
+    Returns the number of amenities whose bitmap was wrong.
+    """
+    ordinals = {}
+    links = (
+        select(place_amenity.c.amenity_id, Place.ordinal)
+        .join(Place, Place.id == place_amenity.c.place_id)
+        .execution_options(yield_per=10000)
+    )
+    for amenity_id, ordinal in session.execute(links):
+        ordinals.setdefault(amenity_id, []).append(ordinal)
+    computed = {amenity_id: Bitmap(values) for amenity_id, values in ordinals.items()}
+    stored = dict(session.execute(select(amenity_bitmaps.c.amenity_id, amenity_bitmaps.c.bitmap)).all())
+
+    connection = session.connection()
+    repaired = 0
+    for amenity_id, bitmap in computed.items():
+        if amenity_id not in stored or Bitmap.from_bytes(stored[amenity_id]) != bitmap:
+            save_bitmap(connection, amenity_id, bitmap, amenity_id in stored)
+            repaired += 1
+    unused = list(stored.keys() - computed.keys())
+    for chunk in chunks(unused):
+        connection.execute(delete(amenity_bitmaps).where(amenity_bitmaps.c.amenity_id.in_(chunk)))
+    session.commit()
+    return repaired + len(unused)
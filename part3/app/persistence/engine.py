@@ -0,0 +1,62 @@
+"""SQLAlchemy engine tuning"""
+from sqlalchemy import event
+
+from app.models.bitmap import Bitmap
+from app.models.geo import encode_geohash
+
+
+def set_sqlite_pragmas(engine, pragmas):
+    """
+    Run `PRAGMA name=value` for every item of pragmas on each new
+    connection of engine. Does nothing for non-SQLite engines.
+    """
+    if not pragmas or engine.dialect.name != "sqlite":
+        return
+
+    @event.listens_for(engine, "connect")
+    def _apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+
+def create_sqlite_functions(dbapi_connection):
+    """
+    Register the app's SQL functions on a SQLite DBAPI connection, used
+    by migrations: geohash(latitude, longitude) fills places.geohash (see
+    app/models/geo.py), the aggregate bitmap(value) the amenity bitmaps
+    (see app/models/bitmap.py).
+    """
+    dbapi_connection.create_function("geohash", 2, _sql_geohash, deterministic=True)
+    dbapi_connection.create_aggregate("bitmap", 1, _SqlBitmap)
+
+
+def add_sqlite_functions(engine):
+    """create_sqlite_functions() on each new connection of a SQLite engine"""
+    if engine.dialect.name != "sqlite":
+        return
+
+    @event.listens_for(engine, "connect")
+    def _create_functions(dbapi_connection, connection_record):
+        create_sqlite_functions(dbapi_connection)
+
+
+def _sql_geohash(lat, lon):
+    if lat is None or lon is None:
+        return None
+    return encode_geohash(lat, lon)
+
+
+class _SqlBitmap:
+    """Aggregate of the values of a group into a serialized Bitmap"""
+
+    def __init__(self):
+        self.values = []
+
+    def step(self, value):
+        if value is not None:
+            self.values.append(value)
+
+    def finalize(self):
+        return Bitmap(self.values).to_bytes()
@@ -0,0 +1,127 @@
+"""
+Sparse fieldsets and compound includes of the place and review payloads.
+
+A Fieldset holds the ?fields= and ?include= of a request. Passed as the
+loading profile of a facade read (see loader_options() in
+app/services/facade.py), it loads the columns behind the requested
+fields only (load_only), and every relationship the payload shows with
+one batched SELECT ... WHERE id IN (...) per page of objects
+(selectinload).
+"""
+from sqlalchemy.orm import configure_mappers, load_only, selectinload
+
+from app.models.amenity import Amenity
+from app.models.place import Place
+from app.models.review import Review
+from app.models.user import User
+
+# Columns read by the fields of the payloads (place_to_dict and
+# review_to_dict), and the relationship a field shows, if any
+FIELDS = {
+    Place: {
+        "id": (),
+        "title": (Place.title,),
+        "description": (Place.description,),
+        "price": (Place.price,),
+        "latitude": (Place.latitude,),
+        "longitude": (Place.longitude,),
+        "owner_id": (Place.owner_id,),
+        "owner_name": (Place.owner_id,),
+        "review_count": (Place.review_count,),
+        "average_rating": (Place.review_count, Place.rating_sum),
+        "rating_histogram": (Place.rating_1, Place.rating_2, Place.rating_3, Place.rating_4, Place.rating_5),
+        "amenities": (),
+    },
+    Review: {
+        "id": (),
+        "text": (Review.text,),
+        "rating": (Review.rating,),
+        "user_id": (Review.user_id,),
+        "user_name": (Review.user_id,),
+        "place_id": (Review.place_id,),
+        "created_at": (Review.created_at,),
+        "updated_at": (Review.updated_at,),
+    },
+}
+FIELD_RELATIONSHIPS = {
+    Place: {"owner_name": "owner", "amenities": "amenities"},
+    Review: {"user_name": "user"},
+}
+
+# Columns loaded whatever the fields: the keys of the pages and cursors
+KEYS = {
+    Place: (Place.id, Place.created_at, Place.price, Place.average_rating),
+    Review: (Review.id, Review.created_at),
+}
+
+
+def _author_name(relationship):
+    return selectinload(relationship).load_only(User.first_name, User.last_name)
+
+
+# Loader options of the relationships that can be included, and the
+# foreign key column they need
+INCLUDES = {
+    Place: {
+        "owner": (lambda: _author_name(Place.owner), Place.owner_id),
+        "amenities": (lambda: selectinload(Place.amenities).load_only(Amenity.name), None),
+        "reviews": (lambda: selectinload(Place.reviews).options(_author_name(Review.user)), None),
+    },
+    Review: {
+        "user": (lambda: _author_name(Review.user), Review.user_id),
+        "place": (lambda: selectinload(Review.place).load_only(Place.title), Review.place_id),
+    },
+}
+
+
+class Fieldset:
+    """
+    Fields and included relationships of the payloads of model.
+
+    Args:
+        model: Place or Review
+        fields (list): Names of FIELDS[model], None for all of them; the
+            id is always part of the payload
+        include (list): Names of INCLUDES[model], embedded in the payload
+
+    Raises:
+        ValueError: If a field or an include is unknown
+    """
+
+    def __init__(self, model, fields=None, include=()):
+        known = FIELDS[model]
+        if fields is None:
+            fields = list(known)
+        unknown = [name for name in fields if name not in known]
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}; expected some of {', '.join(known)}")
+        unknown = [name for name in include if name not in INCLUDES[model]]
+        if unknown:
+            raise ValueError(f"Unknown include: {', '.join(unknown)}; expected some of {', '.join(INCLUDES[model])}")
+
+        # In the order of FIELDS and INCLUDES, whatever the order of the
+        # request: equal selections make equal fieldsets
+        self.model = model
+        selected = {"id", *fields}
+        self.fields = tuple(name for name in known if name in selected)
+        self.include = tuple(name for name in INCLUDES[model] if name in include)
+
+    def relationships(self):
+        """Names of the relationships the payloads show"""
+        shown = [FIELD_RELATIONSHIPS[self.model][name] for name in self.fields
+                 if name in FIELD_RELATIONSHIPS[self.model]]
+        return tuple(dict.fromkeys(shown + list(self.include)))
+
+    def options(self):
+        """Loader options: load_only of the columns the payloads read, selectinload of the relationships"""
+        # The backrefs (Place.owner, Review.user) exist once the mappers are configured
+        configure_mappers()
+        columns = list(KEYS[self.model])
+        columns += [column for name in self.fields for column in FIELDS[self.model][name]]
+        options = []
+        for name in self.relationships():
+            loader, foreign_key = INCLUDES[self.model][name]
+            options.append(loader())
+            if foreign_key is not None:
+                columns.append(foreign_key)
+        return (load_only(*dict.fromkeys(columns)), *options)
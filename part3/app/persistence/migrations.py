@@ -0,0 +1,106 @@
+"""
+Versioned schema migrations.
+
+Migrations are the SQL files of sql/migrations named NNNN_description.sql,
+applied in version order. Applied versions are recorded in the
+schema_version table, so each runs once per database.
+
+SQLite's Python driver commits DDL statements as they run, so a failed
+migration may be partly applied: write migrations that can run again
+(CREATE ... IF NOT EXISTS) and fix the failure before re-running.
+Migrations may call the SQL functions of app/persistence/engine.py.
+"""
+import os
+import re
+from datetime import datetime
+
+from sqlalchemy import text
+
+from app.persistence.engine import create_sqlite_functions
+
+MIGRATIONS_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "sql", "migrations"
+)
+
+_FILENAME = re.compile(r"^(\d+)_(\w+)\.sql$")
+_TRIGGER = re.compile(r"\s*CREATE\s+(TEMP\w*\s+)?TRIGGER\b", re.IGNORECASE)
+_TRIGGER_END = re.compile(r"\bEND\s*$", re.IGNORECASE)
+
+_CREATE_VERSION_TABLE = """
+CREATE TABLE IF NOT EXISTS schema_version (
+    version INTEGER NOT NULL PRIMARY KEY,
+    name VARCHAR(255) NOT NULL,
+    applied_at DATETIME NOT NULL
+)
+"""
+
+
+def available_migrations(directory=MIGRATIONS_DIR):
+    """Return the (version, name, path) of every migration file, by version"""
+    migrations = {}
+    for filename in os.listdir(directory):
+        match = _FILENAME.match(filename)
+        if not match:
+            continue
+        version = int(match.group(1))
+        if version in migrations:
+            raise ValueError(f"Duplicate migration version {version}: {filename}")
+        migrations[version] = (version, match.group(2), os.path.join(directory, filename))
+    return [migrations[version] for version in sorted(migrations)]
+
+
+def applied_versions(connection):
+    """Versions already applied to the database of connection"""
+    connection.execute(text(_CREATE_VERSION_TABLE))
+    return {row[0] for row in connection.execute(text("SELECT version FROM schema_version"))}
+
+
+def current_version(engine):
+    """Highest applied version, 0 for a database without migrations"""
+    with engine.begin() as connection:
+        return max(applied_versions(connection), default=0)
+
+
+def migrate(engine, directory=MIGRATIONS_DIR, target=None):
+    """
+    Apply every pending migration up to target (all when None).
+    Returns the (version, name) of the migrations applied.
+    """
+    with engine.begin() as connection:
+        done = applied_versions(connection)
+
+    applied = []
+    for version, name, path in available_migrations(directory):
+        if version in done or (target is not None and version > target):
+            continue
+        with open(path, encoding="utf-8") as f:
+            statements = split_statements(f.read())
+        with engine.begin() as connection:
+            if engine.dialect.name == "sqlite":
+                create_sqlite_functions(connection.connection.driver_connection)
+            for statement in statements:
+                connection.exec_driver_sql(statement)
+            connection.execute(
+                text("INSERT INTO schema_version (version, name, applied_at) VALUES (:v, :n, :t)"),
+                {"v": version, "n": name, "t": datetime.utcnow()},
+            )
+        applied.append((version, name))
+    return applied
+
+
+def split_statements(sql):
+    """
+    Split a migration script into statements, dropping -- comments. The
+    body of a CREATE TRIGGER, up to its END, stays one statement.
+    """
+    lines = [line.split("--", 1)[0] for line in sql.splitlines()]
+    statements, pending = [], ""
+    for part in "\n".join(lines).split(";"):
+        pending += part
+        if _TRIGGER.match(pending) and not _TRIGGER_END.search(pending):
+            pending += ";"
+            continue
+        if pending.strip():
+            statements.append(pending.strip())
+        pending = ""
+    return statements
@@ -0,0 +1,72 @@
+"""
+EXPLAIN QUERY PLAN check of the hot query paths (SQLite).
+
+Each hot query below mirrors a query of the facade or the repositories.
+full_scans() reports the ones whose plan scans a whole table instead of
+searching an index, e.g. after an index was dropped or a query changed.
+"""
+from datetime import datetime
+from types import SimpleNamespace
+
+from sqlalchemy import select
+from sqlalchemy.dialects import sqlite
+
+from app.models.user import User
+from app.models.place import Place, place_amenity
+from app.models.review import Review
+from app.models.amenity import Amenity
+from app.models.bitmap import Bitmap
+from app.persistence import versions
+from app.persistence.listing import SORTS, PlaceListing
+from app.persistence.repository import after_cursor, encode_cursor, in_bbox
+
+PAGE_SIZE = 20
+
+
+def hot_queries():
+    """Name -> SELECT statement of every query that must use an index"""
+    cursor = encode_cursor(SimpleNamespace(created_at=datetime(2024, 1, 1), id="cursor-id"))
+    queries = {
+        "get_user_by_email": select(User).filter_by(email="user@example.com").limit(1),
+        "get_reviews_by_place": select(Review).filter_by(place_id="place-id"),
+        "get_reviews_by_user": select(Review).filter_by(user_id="user-id"),
+        "has_reviewed": select(Review.id).filter_by(user_id="user-id", place_id="place-id").limit(1),
+        "get_places_by_owner": select(Place).filter_by(owner_id="owner-id"),
+        "get_amenity_by_name": select(Amenity).filter_by(name="WiFi").limit(1),
+        "place_amenities": select(place_amenity).filter_by(place_id="place-id"),
+        "amenity_places": select(place_amenity).filter_by(amenity_id="amenity-id"),
+        "places_within": select(Place).where(in_bbox((48.80, 2.25, 48.90, 2.42))).limit(PAGE_SIZE),
+    }
+    for model in (User, Place, Review, Amenity):
+        queries[f"{model.__tablename__}_page"] = (
+            select(model)
+            .where(after_cursor(model, cursor))
+            .order_by(model.created_at, model.id)
+            .limit(PAGE_SIZE + 1)
+        )
+    position = SimpleNamespace(created_at=datetime(2024, 1, 1), price=100.0, average_rating=4.5, id="cursor-id")
+    for sort in SORTS:
+        listing = PlaceListing(price_max=200, amenities=["amenity-id"], min_rating=3, sort=sort)
+        queries[f"places_by_{sort}"] = listing.page_query(PAGE_SIZE, listing.encode_cursor(position))
+    queries["places_having_amenities"] = listing.page_query(PAGE_SIZE, ordinals=Bitmap(range(1, 100)))
+    # Conditional GETs; the version of the lists counts the rows, a scan of the smallest index
+    queries["place_version"] = versions.place_version("place-id")
+    queries["place_reviews_version"] = versions.place_reviews_version("place-id")
+    queries["review_version"] = versions.review_version("review-id")
+    return queries
+
+
+def explain(connection, statement):
+    """Return the detail lines of the SQLite query plan of statement"""
+    sql = str(statement.compile(dialect=sqlite.dialect(), compile_kwargs={"literal_binds": True}))
+    return [row[-1] for row in connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}")]
+
+
+def full_scans(connection):
+    """Return {query name: plan} for every hot query that scans a table"""
+    problems = {}
+    for name, statement in hot_queries().items():
+        plan = explain(connection, statement)
+        if any(detail.startswith("SCAN ") and detail != "SCAN CONSTANT ROW" for detail in plan):
+            problems[name] = plan
+    return problems
@@ -0,0 +1,94 @@
+"""
+Rating aggregates of the places.
+
+Every place keeps review_count, rating_sum, the histogram rating_1 ..
+rating_5 and the average_rating of its reviews, so its average rating is
+O(1) and can be sorted and filtered through an index. The facades add
+the count_rating() statements to the transaction that creates, updates
+or deletes a review.
+recompute_ratings() rebuilds every aggregate from the reviews table.
+"""
+from sqlalchemy import Float, case, cast, func, select, update
+
+from app.models.place import Place
+from app.models.review import Review
+
+RATINGS = range(1, 6)
+
+
+def count_rating(place_id, rating, step):
+    """UPDATE adding step (1 or -1) reviews of the given rating to a place"""
+    try:
+        rating = int(rating)
+    except (TypeError, ValueError):
+        rating = None
+    if rating not in RATINGS:
+        raise ValueError("rating must be an integer between 1 and 5")
+    column = f"rating_{rating}"
+    return (
+        update(Place)
+        .where(Place.id == place_id)
+        .values({
+            "review_count": Place.review_count + step,
+            "rating_sum": Place.rating_sum + step * rating,
+            column: getattr(Place, column) + step,
+            # Every SET expression reads the values from before the update
+            "average_rating": average_rating(Place.rating_sum + step * rating, Place.review_count + step),
+        })
+    )
+
+
+def average_rating(rating_sum, review_count):
+    """SQL average of a rating sum over a review count, 0 without reviews"""
+    return case((review_count > 0, cast(rating_sum, Float) / review_count), else_=0.0)
+
+
+def rating_changes(before, after):
+    """
+    count_rating() statements moving a review from before to after, both
+    (place_id, rating) pairs or None for a created or deleted review.
+    """
+    if before == after:
+        return []
+    statements = []
+    if before is not None:
+        statements.append(count_rating(before[0], before[1], -1))
+    if after is not None:
+        statements.append(count_rating(after[0], after[1], 1))
+    return statements
+
+
+def aggregates_query():
+    """One GROUP BY computing the aggregates of every reviewed place"""
+    return (
+        select(
+            Review.place_id,
+            func.count().label("review_count"),
+            func.sum(Review.rating).label("rating_sum"),
+            average_rating(func.sum(Review.rating), func.count()).label("average_rating"),
+            *(func.sum(case((Review.rating == stars, 1), else_=0)).label(f"rating_{stars}")
+              for stars in RATINGS)
+        )
+        .group_by(Review.place_id)
+    )
+
+
+def recompute_ratings(session):
+    """
+    Rebuild the rating aggregates of every place from its reviews and
+    commit. Returns the number of places whose aggregates were wrong.
+    """
+    columns = ["review_count", "rating_sum", "average_rating"] + [f"rating_{stars}" for stars in RATINGS]
+    empty = dict.fromkeys(columns, 0)
+    computed = {row.place_id: dict(row._mapping) for row in session.execute(aggregates_query())}
+
+    changes = []
+    for row in session.execute(select(Place.id, *(getattr(Place, c) for c in columns))):
+        expected = computed.get(row.id, empty)
+        if any(getattr(row, c) != expected[c] for c in columns):
+            changes.append({"id": row.id, **{c: expected[c] for c in columns}})
+
+    if changes:
+        session.execute(update(Place), changes)
+    session.commit()
+    return len(changes)
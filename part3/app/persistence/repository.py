@@ -1,26 +1,143 @@
 # app/persistence/repository.py
+import base64
+from datetime import datetime
+
+from sqlalchemy.exc import SQLAlchemyError
+
 from app.extensions import db
 from app.models.user import User
 from app.models.place import Place
 from app.models.review import Review
 from app.models.amenity import Amenity
+from app.persistence.bitmaps import amenity_counts, bitmaps_query, having_all
+from app.persistence.listing import PlaceListing
+from app.persistence.search import search_page, search_statement
+from app.models.geo import (
+    GEOHASH_END, bounding_box, covering_prefixes, nearest, search_radii, split_antimeridian
+)
+
+
+def encode_cursor(obj):
+    """Encode the (created_at, id) keyset position of obj as an opaque cursor"""
+    raw = f"{obj.created_at.isoformat()}|{obj.id}"
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor):
+    """Decode a cursor produced by encode_cursor back into (created_at, id)"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8')
+        created_at, obj_id = raw.split('|', 1)
+        return datetime.fromisoformat(created_at), obj_id
+    except (ValueError, UnicodeError):
+        raise ValueError("Invalid cursor")
+
+
+def after_cursor(model, cursor):
+    """Filter clause selecting the rows of model that come after cursor"""
+    created_at, obj_id = decode_cursor(cursor)
+    return db.or_(
+        model.created_at > created_at,
+        db.and_(model.created_at == created_at, model.id > obj_id)
+    )
+
+
+def in_bbox(bbox):
+    """
+    Filter clause selecting the places inside bbox: range scans of
+    ix_places_geohash over the cells covering bbox, then the exact box.
+    """
+    cells = [
+        db.and_(Place.geohash >= prefix, Place.geohash < prefix + GEOHASH_END)
+        for prefix in covering_prefixes(bbox)
+    ]
+    boxes = [
+        db.and_(Place.latitude.between(south, north), Place.longitude.between(west, east))
+        for south, west, north, east in split_antimeridian(bbox)
+    ]
+    return db.and_(db.or_(*cells), db.or_(*boxes))
+
+
+def nearby_candidates(lat, lon, radius_km):
+    """SELECT of the (id, latitude, longitude) of the places around a circle"""
+    return (
+        db.select(Place.id, Place.latitude, Place.longitude)
+        .where(in_bbox(bounding_box(lat, lon, radius_km)))
+    )
+
+
+def by_ids(objs, ids):
+    """objs in the order of ids, skipping the ids without an object"""
+    objs = {obj.id: obj for obj in objs}
+    return [objs[obj_id] for obj_id in ids if obj_id in objs]
+
 
 class BaseRepository:
     """Generic repository for CRUD operations"""
     def __init__(self, model):
         self.model = model
 
-    def get_by_id(self, obj_id):
-        return self.model.query.get(obj_id)
+    def get_by_id(self, obj_id, options=()):
+        """
+        Object with id obj_id; served from the session identity map when
+        loaded. options are loader options (see loading_profiles() in the facade).
+        """
+        return db.session.get(self.model, obj_id, options=options)
+
+    def get_all(self, options=()):
+        return self.model.query.options(*options).all()
 
-    def get_all(self):
-        return self.model.query.all()
+    def iter_all(self, options=(), batch_size=500):
+        """
+        Iterate over all objects ordered by (created_at, id), fetching
+        batch_size rows at a time (yield_per): the loader options run once
+        per batch, and only the current batch is held in memory.
+        """
+        query = db.select(self.model).options(*options).order_by(self.model.created_at, self.model.id)
+        return db.session.scalars(query.execution_options(yield_per=batch_size))
+
+    def get_page(self, limit, cursor=None, options=()):
+        """
+        Return up to `limit` objects ordered by (created_at, id), starting
+        right after `cursor`, together with the cursor of the next page
+        (None when there are no more rows).
+        """
+        query = self.model.query.options(*options).order_by(self.model.created_at, self.model.id)
+        if cursor:
+            query = query.filter(after_cursor(self.model, cursor))
+
+        items = query.limit(limit + 1).all()
+        if len(items) > limit:
+            items = items[:limit]
+            return items, encode_cursor(items[-1])
+        return items, None
 
     def create(self, obj):
         db.session.add(obj)
         db.session.commit()
         return obj
 
+    def create_many(self, objs, chunk_size=500):
+        """
+        Insert objs in chunks of chunk_size, committing once per chunk.
+
+        A chunk whose commit fails is rolled back without affecting the
+        chunks already committed. Returns (created, failed) where failed
+        is a list of (obj, error message) pairs.
+        """
+        created, failed = [], []
+        for start in range(0, len(objs), chunk_size):
+            chunk = objs[start:start + chunk_size]
+            db.session.add_all(chunk)
+            try:
+                db.session.commit()
+            except SQLAlchemyError as e:
+                db.session.rollback()
+                failed.extend((obj, str(e.orig) if hasattr(e, 'orig') else str(e)) for obj in chunk)
+            else:
+                created.extend(chunk)
+        return created, failed
+
 class UserRepository(BaseRepository):
     def __init__(self):
         super().__init__(User)
@@ -32,6 +149,63 @@ class PlaceRepository(BaseRepository):
     def __init__(self):
         super().__init__(Place)
 
+    def get_within(self, bbox, limit=None, options=()):
+        """Places inside the (south, west, north, east) bounding box"""
+        query = self.model.query.options(*options).filter(in_bbox(bbox))
+        if limit is not None:
+            query = query.limit(limit)
+        return query.all()
+
+    def get_nearby(self, lat, lon, radius_km, limit=None, options=()):
+        """
+        (distance in km, place) pairs of the places within radius_km of
+        (lat, lon), nearest first. Distances are computed from the
+        coordinates of the candidates alone, over expanding circles (see
+        search_radii()); only the nearest `limit` places are loaded.
+        """
+        for search_radius in search_radii(radius_km, limit):
+            candidates = db.session.execute(nearby_candidates(lat, lon, search_radius))
+            found = nearest(candidates, lat, lon, search_radius, limit)
+            if limit is not None and len(found) >= limit:
+                break
+        if not found:
+            return []
+        ids = [place_id for _, place_id in found]
+        places = by_ids(self.model.query.options(*options).filter(Place.id.in_(ids)), ids)
+        distances = {place_id: distance for distance, place_id in found}
+        return [(distances[place.id], place) for place in places]
+
+    def search(self, q, limit, cursor=None, options=()):
+        """
+        One page of the places matching the words of q, best first:
+        ([(snippet, place)], next_cursor). See app/persistence/search.py.
+        """
+        hits, next_cursor = search_page(db.session.execute(search_statement(q, limit, cursor)), limit)
+        if not hits:
+            return [], next_cursor
+        ids = [place_id for place_id, _ in hits]
+        places = by_ids(self.model.query.options(*options).filter(Place.id.in_(ids)), ids)
+        snippets = dict(hits)
+        return [(snippets[place.id], place) for place in places], next_cursor
+
+    def get_listing(self, listing, limit, cursor=None, facets=False, options=()):
+        """
+        One page of the places of a PlaceListing in its sort order:
+        (places, next_cursor, facets), facets being None unless asked for.
+        """
+        ordinals = None
+        if listing.amenities:
+            ordinals = having_all(db.session.execute(bitmaps_query(listing.amenities)), listing.amenities)
+        query = listing.page_query(limit, cursor, ordinals).options(*options)
+        places, next_cursor = listing.page(db.session.scalars(query).all(), limit)
+        if not facets:
+            return places, next_cursor, None
+
+        prices = db.session.execute(listing.price_facet_query(ordinals)).all()
+        ordinals = listing.matching(prices, ordinals)
+        counts = amenity_counts(db.session.execute(bitmaps_query()), ordinals)
+        return places, next_cursor, PlaceListing.facets(prices, counts)
+
 class ReviewRepository(BaseRepository):
     def __init__(self):
         super().__init__(Review)
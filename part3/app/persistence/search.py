@@ -0,0 +1,186 @@
+"""
+Full-text search of the places (SQLite FTS5).
+
+place_search is an FTS5 table with one document per place (title and
+description) and one per review (text), each tagged with its place_id.
+place_search_docs gives every place and review a stable integer rowid
+in place_search. Triggers on places and reviews keep both in sync on
+every write, whichever code path makes it; sql/migrations holds the
+same DDL.
+
+A search ranks the documents with bm25, keeps the best document of each
+place and pages through the places by (score, place_id). The last word
+of a query is a prefix, served by the prefix indexes of the table.
+"""
+import base64
+import html
+import re
+
+from sqlalchemy import DDL, event, text
+
+from app.extensions import db
+
+# bm25 weights of the columns: place_id, title, description, review
+WEIGHTS = (0.0, 10.0, 4.0, 1.0)
+SNIPPET_TOKENS = 12
+MAX_TERMS = 16
+# Only the best documents are grouped by place and paged through, which
+# bounds the GROUP BY of common words; nobody pages that far
+MAX_RANKED_DOCUMENTS = 10000
+# Marks of the snippet matches, replaced once the snippet is HTML-escaped
+_OPEN, _CLOSE = "\x02", "\x03"
+_TERM = re.compile(r"\w+", re.UNICODE)
+
+SEARCH_DDL = [
+    """
+    CREATE TABLE IF NOT EXISTS place_search_docs (
+        id INTEGER PRIMARY KEY,
+        kind VARCHAR(6) NOT NULL,
+        entity_id VARCHAR(36) NOT NULL,
+        UNIQUE (kind, entity_id)
+    )
+    """,
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS place_search USING fts5(
+        place_id UNINDEXED, title, description, review,
+        tokenize = 'porter unicode61 remove_diacritics 2', prefix = '2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS place_search_place_insert AFTER INSERT ON places BEGIN
+        INSERT INTO place_search_docs (kind, entity_id) VALUES ('place', new.id);
+        INSERT INTO place_search (rowid, place_id, title, description)
+        VALUES (last_insert_rowid(), new.id, new.title, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS place_search_place_update AFTER UPDATE OF title, description ON places BEGIN
+        UPDATE place_search SET title = new.title, description = new.description
+        WHERE rowid = (SELECT id FROM place_search_docs WHERE kind = 'place' AND entity_id = new.id);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS place_search_place_delete AFTER DELETE ON places BEGIN
+        DELETE FROM place_search
+        WHERE rowid = (SELECT id FROM place_search_docs WHERE kind = 'place' AND entity_id = old.id);
+        DELETE FROM place_search_docs WHERE kind = 'place' AND entity_id = old.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS place_search_review_insert AFTER INSERT ON reviews BEGIN
+        INSERT INTO place_search_docs (kind, entity_id) VALUES ('review', new.id);
+        INSERT INTO place_search (rowid, place_id, review)
+        VALUES (last_insert_rowid(), new.place_id, new.text);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS place_search_review_update AFTER UPDATE OF text, place_id ON reviews BEGIN
+        UPDATE place_search SET place_id = new.place_id, review = new.text
+        WHERE rowid = (SELECT id FROM place_search_docs WHERE kind = 'review' AND entity_id = new.id);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS place_search_review_delete AFTER DELETE ON reviews BEGIN
+        DELETE FROM place_search
+        WHERE rowid = (SELECT id FROM place_search_docs WHERE kind = 'review' AND entity_id = old.id);
+        DELETE FROM place_search_docs WHERE kind = 'review' AND entity_id = old.id;
+    END
+    """,
+]
+
+# The triggers are dropped with their tables
+DROP_DDL = [
+    "DROP TABLE IF EXISTS place_search",
+    "DROP TABLE IF EXISTS place_search_docs",
+]
+
+for _statement in SEARCH_DDL:
+    event.listen(db.metadata, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
+for _statement in DROP_DDL:
+    event.listen(db.metadata, "after_drop", DDL(_statement).execute_if(dialect="sqlite"))
+
+
+def match_query(q):
+    """
+    FTS5 query matching every word of the user's text q, the last one as
+    a prefix (search as you type). Raises ValueError without any word.
+    """
+    terms = _TERM.findall(q or "")[:MAX_TERMS]
+    if not terms:
+        raise ValueError("q must contain at least one word")
+    quoted = [f'"{term}"' for term in terms]
+    quoted[-1] += "*"
+    return " ".join(quoted)
+
+
+def encode_search_cursor(score, place_id):
+    """Opaque cursor of the (score, place_id) position of a search result"""
+    raw = f"{score!r}|{place_id}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def decode_search_cursor(cursor):
+    """Decode a cursor produced by encode_search_cursor back into (score, place_id)"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+        score, place_id = raw.split("|", 1)
+        return float(score), place_id
+    except (ValueError, UnicodeError):
+        raise ValueError("Invalid cursor")
+
+
+def search_statement(q, limit, cursor=None):
+    """
+    SELECT of one page of matching places: (place_id, score, snippet)
+    rows, best first, plus one row telling whether a next page exists.
+    """
+    after = ""
+    params = {"query": match_query(q), "limit": limit + 1, "ranked": MAX_RANKED_DOCUMENTS}
+    if cursor:
+        params["score"], params["place_id"] = decode_search_cursor(cursor)
+        after = "HAVING (score, place_id) > (:score, :place_id)"
+    weights = ", ".join(str(weight) for weight in WEIGHTS)
+    # FTS5 functions are not allowed in an aggregate query: rank the
+    # documents first. With MIN(), the bare doc is the best document of
+    # the place, and only those of the page get a snippet.
+    return text(f"""
+        WITH hits AS (
+            SELECT rowid AS doc, place_id, bm25(place_search, {weights}) AS score
+            FROM place_search
+            WHERE place_search MATCH :query
+            ORDER BY score
+            LIMIT :ranked
+        ),
+        page AS MATERIALIZED (
+            SELECT place_id, MIN(score) AS score, doc
+            FROM hits
+            GROUP BY place_id
+            {after}
+            ORDER BY score, place_id
+            LIMIT :limit
+        )
+        SELECT page.place_id, page.score,
+               snippet(place_search, -1, '{_OPEN}', '{_CLOSE}', '…', {SNIPPET_TOKENS}) AS snippet
+        FROM page CROSS JOIN place_search ON place_search.rowid = page.doc
+        WHERE place_search MATCH :query
+        ORDER BY page.score, page.place_id
+    """).bindparams(**params)
+
+
+def search_page(rows, limit):
+    """
+    Split the rows of search_statement() into ([(place_id, snippet)],
+    next_cursor). Snippets are HTML-escaped, matches wrapped in <mark>.
+    """
+    rows = list(rows)
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_search_cursor(rows[-1].score, rows[-1].place_id)
+    return [(row.place_id, highlight(row.snippet)) for row in rows], next_cursor
+
+
+def highlight(snippet):
+    """HTML-escape snippet and turn its match marks into <mark> tags"""
+    escaped = html.escape(snippet or "")
+    return escaped.replace(_OPEN, "<mark>").replace(_CLOSE, "</mark>")
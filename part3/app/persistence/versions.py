@@ -0,0 +1,98 @@
+"""
+Versions of the resources served by the public read endpoints, for their
+ETag and Last-Modified validators (see app/api/v1/conditional.py).
+
+A version is one row of one aggregate query: the updated_at of the rows a
+response shows, and the row counts of collections so that deletions
+change it too. Related rows count: a place shows its owner's name and its
+amenities, so their updated_at are part of its version. Linking or
+unlinking an amenity touches the updated_at of the place.
+"""
+from datetime import datetime
+
+from sqlalchemy import event, func, inspect, select
+from sqlalchemy.orm import Session
+
+from app.models.amenity import Amenity
+from app.models.place import Place, place_amenity
+from app.models.review import Review
+from app.models.user import User
+
+
+@event.listens_for(Session, "before_flush")
+def _touch_relinked_places(session, flush_context, instances):
+    now = datetime.utcnow()
+    for obj in session.dirty:
+        if isinstance(obj, Place) and inspect(obj).attrs.amenities.history.has_changes():
+            obj.updated_at = now
+        elif isinstance(obj, Amenity):
+            history = inspect(obj).attrs.places.history
+            for place in list(history.added) + list(history.deleted):
+                if place not in session.deleted:
+                    place.updated_at = now
+
+
+def _max_updated_at(model):
+    return select(func.max(model.updated_at)).scalar_subquery()
+
+
+def _count(model):
+    return select(func.count()).select_from(model).scalar_subquery()
+
+
+def places_version(reviews=False):
+    """Version of every place list: places, their owners and the amenities, and the reviews if included"""
+    columns = [_max_updated_at(Place), _count(Place), _max_updated_at(User), _max_updated_at(Amenity),
+               _count(Amenity)]
+    if reviews:
+        columns += [_max_updated_at(Review), _count(Review)]
+    return select(*columns)
+
+
+def place_version(place_id):
+    """Version of a place, no row when it does not exist"""
+    return (
+        select(Place.updated_at, User.updated_at, func.max(Amenity.updated_at), func.count(Amenity.id))
+        .select_from(Place)
+        .join(User, User.id == Place.owner_id)
+        .outerjoin(place_amenity, place_amenity.c.place_id == Place.id)
+        .outerjoin(Amenity, Amenity.id == place_amenity.c.amenity_id)
+        .where(Place.id == place_id)
+        .group_by(Place.id)
+    )
+
+
+def place_reviews_version(place_id, place=False):
+    """
+    Version of the reviews of a place and their authors, and of the place
+    if included; no row when the place does not exist
+    """
+    columns = [func.max(Review.updated_at), func.count(Review.id), func.max(User.updated_at)]
+    return (
+        select(*columns, *([Place.updated_at] if place else []))
+        .select_from(Place)
+        .outerjoin(Review, Review.place_id == Place.id)
+        .outerjoin(User, User.id == Review.user_id)
+        .where(Place.id == place_id)
+        .group_by(Place.id)
+    )
+
+
+def review_version(review_id, place=False):
+    """Version of a review and its author, and of its place if included"""
+    query = (
+        select(Review.updated_at, User.updated_at)
+        .join(User, User.id == Review.user_id)
+        .where(Review.id == review_id)
+    )
+    if place:
+        query = query.add_columns(Place.updated_at).join(Place, Place.id == Review.place_id)
+    return query
+
+
+def amenities_version():
+    return select(func.max(Amenity.updated_at), func.count(Amenity.id))
+
+
+def amenity_version(amenity_id):
+    return select(Amenity.updated_at).where(Amenity.id == amenity_id)
@@ -0,0 +1,184 @@
+"""
+asyncio version of the HBnB facade.
+Same methods as HBnBFacade, as coroutines, over the async repositories.
+"""
+from app.persistence.listing import PlaceListing
+from app.services.cache import invalidates
+from app.persistence.async_repository import (
+    AsyncUserRepository, AsyncPlaceRepository, AsyncReviewRepository, AsyncAmenityRepository
+)
+from app.services.facade import (
+    BULK_CHUNK_SIZE, DEFAULT_PAGE_SIZE, build_places, bulk_result, check_nearby, place_changes
+)
+from app.models.user import User
+from app.models.place import Place
+from app.models.review import Review
+from app.models.amenity import Amenity
+
+
+class AsyncHBnBFacade:
+    """asyncio facade for HBnB application - see HBnBFacade"""
+
+    def __init__(self):
+        """Initialize repositories"""
+        self.user_repo = AsyncUserRepository()
+        self.place_repo = AsyncPlaceRepository()
+        self.review_repo = AsyncReviewRepository()
+        self.amenity_repo = AsyncAmenityRepository()
+
+    # ========== User Methods ==========
+
+    @invalidates("user")
+    async def create_user(self, user_data):
+        """Create a new user"""
+        return await self.user_repo.create(User(**user_data))
+
+    async def get_user(self, user_id):
+        """Get a user by ID"""
+        return await self.user_repo.get_by_id(user_id)
+
+    async def get_user_by_email(self, email):
+        """Get a user by email"""
+        return await self.user_repo.get_by_email(email)
+
+    async def get_all_users(self, limit=None, cursor=None):
+        """Get all users, or one keyset page (items, next_cursor)"""
+        if limit is None and cursor is None:
+            return await self.user_repo.get_all()
+        return await self.user_repo.get_page(limit or DEFAULT_PAGE_SIZE, cursor)
+
+    @invalidates("user")
+    async def update_user(self, user_id, user_data):
+        """Update a user"""
+        return await self.user_repo.update(user_id, user_data)
+
+    @invalidates("user", "place", "review")
+    async def delete_user(self, user_id):
+        """Delete a user"""
+        return await self.user_repo.delete(user_id)
+
+    # ========== Place Methods ==========
+
+    @invalidates("place")
+    async def create_place(self, place_data):
+        """Create a new place"""
+        return await self.place_repo.create(Place(**place_data))
+
+    @invalidates("place")
+    async def create_places_bulk(self, places_data, chunk_size=BULK_CHUNK_SIZE):
+        """Create many places, committing once per chunk (see HBnBFacade)"""
+        places, positions, errors = build_places(places_data)
+        created, failed = await self.place_repo.create_many(places, chunk_size)
+        return bulk_result(created, failed, positions, errors)
+
+    async def get_place(self, place_id):
+        """Get a place by ID"""
+        return await self.place_repo.get_by_id(place_id)
+
+    async def get_all_places(self, limit=None, cursor=None):
+        """Get all places, or one keyset page (items, next_cursor)"""
+        if limit is None and cursor is None:
+            return await self.place_repo.get_all()
+        return await self.place_repo.get_page(limit or DEFAULT_PAGE_SIZE, cursor)
+
+    @invalidates("place")
+    async def update_place(self, place_id, place_data):
+        """Update the PLACE_FIELDS of a place; other keys of place_data are ignored"""
+        return await self.place_repo.update(place_id, place_changes(place_data))
+
+    @invalidates("place", "review")
+    async def delete_place(self, place_id):
+        """Delete a place"""
+        return await self.place_repo.delete(place_id)
+
+    async def get_places_by_owner(self, owner_id):
+        """Get all places by a specific owner"""
+        return await self.place_repo.get_all_by(owner_id=owner_id)
+
+    async def get_places_nearby(self, lat, lon, radius_km, limit=None):
+        """Nearest places within radius_km, nearest first (see HBnBFacade)"""
+        check_nearby(lat, lon, radius_km)
+        return await self.place_repo.get_nearby(lat, lon, radius_km, limit or DEFAULT_PAGE_SIZE)
+
+    async def get_places_within(self, bbox, limit=None):
+        """Places inside the bounding box (see HBnBFacade)"""
+        return await self.place_repo.get_within(bbox, limit or DEFAULT_PAGE_SIZE)
+
+    async def search_places(self, q, limit=None, cursor=None):
+        """Full-text search of the places, one page (see HBnBFacade)"""
+        return await self.place_repo.search(q, limit or DEFAULT_PAGE_SIZE, cursor)
+
+    async def list_places(self, filters, limit=None, cursor=None):
+        """Filtered and sorted page of places with facets (see HBnBFacade)"""
+        listing = PlaceListing(**filters)
+        return await self.place_repo.get_listing(listing, limit or DEFAULT_PAGE_SIZE, cursor, facets=cursor is None)
+
+    # ========== Review Methods ==========
+
+    async def get_all_reviews(self, limit=None, cursor=None):
+        """Get all reviews, or one keyset page (items, next_cursor)"""
+        if limit is None and cursor is None:
+            return await self.review_repo.get_all()
+        return await self.review_repo.get_page(limit or DEFAULT_PAGE_SIZE, cursor)
+
+    async def get_review(self, review_id):
+        """Get a review by ID"""
+        return await self.review_repo.get_by_id(review_id)
+
+    @invalidates("review")
+    async def create_review(self, review_data):
+        """Create a new review"""
+        return await self.review_repo.create(Review(**review_data))
+
+    @invalidates("review")
+    async def update_review(self, review_id, review_data):
+        """Update a review"""
+        return await self.review_repo.update(review_id, review_data)
+
+    @invalidates("review")
+    async def delete_review(self, review_id):
+        """Delete a review"""
+        return await self.review_repo.delete(review_id)
+
+    async def has_reviewed(self, user_id, place_id):
+        """Whether user_id has reviewed place_id"""
+        return await self.review_repo.has_reviewed(user_id, place_id)
+
+    async def get_reviews_by_place(self, place_id):
+        """Get all reviews for a specific place"""
+        return await self.review_repo.get_all_by(place_id=place_id)
+
+    async def get_reviews_by_user(self, user_id):
+        """Get all reviews by a specific user"""
+        return await self.review_repo.get_all_by(user_id=user_id)
+
+    # ========== Amenity Methods ==========
+
+    @invalidates("amenity")
+    async def create_amenity(self, amenity_data):
+        """Create a new amenity"""
+        return await self.amenity_repo.create(Amenity(**amenity_data))
+
+    async def get_amenity(self, amenity_id):
+        """Get an amenity by ID"""
+        return await self.amenity_repo.get_by_id(amenity_id)
+
+    async def get_all_amenities(self, limit=None, cursor=None):
+        """Get all amenities, or one keyset page (items, next_cursor)"""
+        if limit is None and cursor is None:
+            return await self.amenity_repo.get_all()
+        return await self.amenity_repo.get_page(limit or DEFAULT_PAGE_SIZE, cursor)
+
+    async def get_amenity_by_name(self, name):
+        """Get an amenity by name"""
+        return await self.amenity_repo.get_first_by(name=name)
+
+    @invalidates("amenity")
+    async def update_amenity(self, amenity_id, amenity_data):
+        """Update an amenity"""
+        return await self.amenity_repo.update(amenity_id, amenity_data)
+
+    @invalidates("amenity")
+    async def delete_amenity(self, amenity_id):
+        """Delete an amenity"""
+        return await self.amenity_repo.delete(amenity_id)
@@ -0,0 +1,323 @@
+"""
+Response cache of the public read endpoints.
+
+A cached response is keyed on its path, its query string and the version
+counters of the entities it shows (see app/api/v1/caching.py). The write
+methods of the facades bump the counters of the entities they change
+(@invalidates), so the next read builds a new key: entries are never
+deleted on write, stale ones age out by TTL and LRU.
+
+The RESPONSE_CACHE setting picks the backend:
+    memory  MemoryCache, one LRU dict per process, bounded by a TTL and
+            a byte budget. Its counters are per process too: with several
+            workers, the others serve stale responses for up to the TTL.
+    shared  SharedMemoryCache, a hash table in a shared memory segment
+            that every worker of the host attaches to by name, counters
+            included.
+"""
+import functools
+import hashlib
+import inspect
+import os
+import struct
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager, suppress
+
+from flask import current_app
+
+# Entities with a version counter, in their order in the shared memory header
+ENTITIES = ("user", "place", "review", "amenity")
+_EXTENSION_KEY = "response_cache"
+
+
+class MemoryCache:
+    """
+    In-process LRU cache of bytes values.
+
+    Args:
+        max_bytes (int): Budget of the keys and values; the least
+            recently used entries go first when it is exceeded
+        ttl (float): Seconds an entry stays valid
+        clock: Monotonic time source (seconds)
+        max_entry_bytes (int): Size of the largest value stored, the
+            whole budget when None
+    """
+
+    def __init__(self, max_bytes, ttl, clock=time.monotonic, max_entry_bytes=None):
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_bytes if max_entry_bytes is None else min(max_entry_bytes, max_bytes)
+        self.ttl = ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        # key -> (expires, value), least recently used first
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._versions = dict.fromkeys(ENTITIES, 0)
+        self._stats = dict.fromkeys(("hits", "misses", "stores", "evictions"), 0)
+
+    def get(self, key):
+        """The value of key, None when missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= self._clock():
+                self._remove(key)
+                entry = None
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return entry[1]
+
+    @property
+    def max_value_bytes(self):
+        """Size of the largest value set() stores"""
+        return self.max_entry_bytes
+
+    def set(self, key, value):
+        """Store value under key; a value larger than max_entry_bytes or the budget is not stored"""
+        size = len(key) + len(value)
+        if len(value) > self.max_entry_bytes or size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (self._clock() + self.ttl, value)
+            self._bytes += size
+            self._stats["stores"] += 1
+            while self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self._stats["evictions"] += 1
+
+    def _remove(self, key):
+        _, value = self._entries.pop(key)
+        self._bytes -= len(key) + len(value)
+
+    def versions(self, entities):
+        with self._lock:
+            return tuple(self._versions[entity] for entity in entities)
+
+    def bump(self, entities):
+        with self._lock:
+            for entity in entities:
+                self._versions[entity] += 1
+
+    def stats(self):
+        """Hit/miss counters and the size of the cache"""
+        with self._lock:
+            return {**self._stats, "entries": len(self._entries), "bytes": self._bytes,
+                    "hit_rate": _hit_rate(self._stats)}
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+
+class SharedMemoryCache:
+    """
+    Cache of bytes values in a shared memory segment, for the workers of
+    one host (POSIX only).
+
+    The segment holds a header (counters and entity versions) and
+    max_bytes / slot_bytes fixed-size slots. A key goes to the slot of
+    its hash, replacing whatever was there; values that do not fit in a
+    slot are not stored. An exclusive lock on a file next to the segment
+    serializes the workers.
+
+    Args:
+        name (str): Name of the segment; created by the first worker
+        max_bytes (int): Size of the slots together
+        ttl (float): Seconds an entry stays valid
+        slot_bytes (int): Size of one slot, header included
+    """
+
+    # magic, slots, slot_bytes, hits, misses, stores, evictions, versions
+    _HEADER = struct.Struct(f"<4sII4Q{len(ENTITIES)}Q")
+    _HITS, _MISSES, _STORES, _EVICTIONS, _VERSIONS = range(3, 8)
+    _SLOT = struct.Struct("<16sdI")
+    _MAGIC = b"HBRC"
+
+    def __init__(self, name, max_bytes, ttl, slot_bytes=64 * 1024):
+        # Imported here: both are POSIX only
+        import fcntl
+        from multiprocessing import resource_tracker, shared_memory
+
+        self._fcntl = fcntl
+        self._resource_tracker = resource_tracker
+        self._thread_lock = threading.Lock()
+        self.ttl = ttl
+        self.slot_bytes = slot_bytes
+        self.slots = max(1, max_bytes // slot_bytes)
+        self._lock_file = open(os.path.join(tempfile.gettempdir(), f"{name}.lock"), "a+b")
+        size = self._HEADER.size + self.slots * slot_bytes
+        with self._locked():
+            try:
+                self._memory = shared_memory.SharedMemory(name, create=True, size=size)
+                self._memory.buf[:self._HEADER.size] = self._HEADER.pack(
+                    self._MAGIC, self.slots, slot_bytes, *[0] * (4 + len(ENTITIES))
+                )
+            except FileExistsError:
+                self._memory = shared_memory.SharedMemory(name)
+        # The segment outlives the worker that created it; unlink() removes it
+        resource_tracker.unregister(self._memory._name, "shared_memory")
+        magic, slots, slot_bytes, *_ = self._HEADER.unpack_from(self._memory.buf)
+        if magic != self._MAGIC or (slots, slot_bytes) != (self.slots, self.slot_bytes):
+            raise ValueError(f"Shared memory segment {name!r} holds another cache layout")
+
+    @contextmanager
+    def _locked(self):
+        # flock excludes the other workers, the thread lock this worker's threads
+        with self._thread_lock:
+            self._fcntl.flock(self._lock_file, self._fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                self._fcntl.flock(self._lock_file, self._fcntl.LOCK_UN)
+
+    def _header(self):
+        return list(self._HEADER.unpack_from(self._memory.buf))
+
+    def _count(self, index):
+        """Increment the counter at index of the header"""
+        header = self._header()
+        header[index] += 1
+        self._HEADER.pack_into(self._memory.buf, 0, *header)
+
+    def _slot(self, digest):
+        return self._HEADER.size + int.from_bytes(digest[:8], "little") % self.slots * self.slot_bytes
+
+    def get(self, key):
+        digest = _digest(key)
+        offset = self._slot(digest)
+        with self._locked():
+            stored, expires, length = self._SLOT.unpack_from(self._memory.buf, offset)
+            if stored != digest or expires <= time.time():
+                self._count(self._MISSES)
+                return None
+            self._count(self._HITS)
+            start = offset + self._SLOT.size
+            return bytes(self._memory.buf[start:start + length])
+
+    @property
+    def max_value_bytes(self):
+        """Size of the largest value set() stores: what fits in a slot"""
+        return self.slot_bytes - self._SLOT.size
+
+    def set(self, key, value):
+        if len(value) > self.max_value_bytes:
+            return
+        digest = _digest(key)
+        offset = self._slot(digest)
+        now = time.time()
+        with self._locked():
+            stored, expires, _ = self._SLOT.unpack_from(self._memory.buf, offset)
+            if stored not in (digest, bytes(16)) and expires > now:
+                self._count(self._EVICTIONS)
+            self._SLOT.pack_into(self._memory.buf, offset, digest, now + self.ttl, len(value))
+            start = offset + self._SLOT.size
+            self._memory.buf[start:start + len(value)] = value
+            self._count(self._STORES)
+
+    def versions(self, entities):
+        with self._locked():
+            header = self._header()
+        return tuple(header[self._VERSIONS + ENTITIES.index(entity)] for entity in entities)
+
+    def bump(self, entities):
+        with self._locked():
+            for entity in entities:
+                self._count(self._VERSIONS + ENTITIES.index(entity))
+
+    def stats(self):
+        with self._locked():
+            header = self._header()
+        names = ("hits", "misses", "stores", "evictions")
+        stats = dict(zip(names, header[self._HITS:self._VERSIONS]))
+        return {**stats, "slots": self.slots, "hit_rate": _hit_rate(stats)}
+
+    def clear(self):
+        with self._locked():
+            for slot in range(self.slots):
+                offset = self._HEADER.size + slot * self.slot_bytes
+                self._SLOT.pack_into(self._memory.buf, offset, bytes(16), 0.0, 0)
+
+    def close(self):
+        self._memory.close()
+        self._lock_file.close()
+
+    def unlink(self):
+        """Remove the segment and its lock file, once every worker is done with them"""
+        # unlink() unregisters the segment from the tracker again
+        self._resource_tracker.register(self._memory._name, "shared_memory")
+        self._memory.unlink()
+        with suppress(FileNotFoundError):
+            os.remove(self._lock_file.name)
+
+
+def _digest(key):
+    return hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+
+
+def _hit_rate(stats):
+    lookups = stats["hits"] + stats["misses"]
+    return round(stats["hits"] / lookups, 4) if lookups else None
+
+
+def create_cache(config):
+    """The backend named by config["RESPONSE_CACHE"], None when disabled"""
+    backend = (config.get("RESPONSE_CACHE") or "none").lower()
+    max_bytes = config.get("RESPONSE_CACHE_MAX_BYTES", 64 * 1024 * 1024)
+    ttl = config.get("RESPONSE_CACHE_TTL", 60)
+    if backend == "none":
+        return None
+    if backend == "memory":
+        return MemoryCache(max_bytes, ttl, max_entry_bytes=config.get("RESPONSE_CACHE_MAX_ENTRY_BYTES"))
+    if backend == "shared":
+        return SharedMemoryCache(config.get("RESPONSE_CACHE_NAME", "hbnb-response-cache"), max_bytes, ttl,
+                                 config.get("RESPONSE_CACHE_SLOT_BYTES", 64 * 1024))
+    raise ValueError(f"Unknown RESPONSE_CACHE backend {backend!r}")
+
+
+def init_response_cache(app):
+    app.extensions[_EXTENSION_KEY] = create_cache(app.config)
+
+
+def response_cache():
+    """The response cache of the current app, None when disabled"""
+    return current_app.extensions.get(_EXTENSION_KEY)
+
+
+def invalidates(*entities):
+    """
+    Decorate a facade write method (sync or async): once it returns, bump
+    the versions of entities, so cached responses showing them miss.
+    """
+    for entity in entities:
+        if entity not in ENTITIES:
+            raise ValueError(f"Unknown cached entity {entity!r}")
+
+    def bump():
+        cache = response_cache()
+        if cache is not None:
+            cache.bump(entities)
+
+    def decorator(method):
+        if inspect.iscoroutinefunction(method):
+            @functools.wraps(method)
+            async def wrapper(*args, **kwargs):
+                result = await method(*args, **kwargs)
+                bump()
+                return result
+        else:
+            @functools.wraps(method)
+            def wrapper(*args, **kwargs):
+                result = method(*args, **kwargs)
+                bump()
+                return result
+        return wrapper
+
+    return decorator
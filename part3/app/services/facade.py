@@ -2,11 +2,144 @@
 Facade pattern for HBnB application.
 Provides a unified interface to the business logic layer.
 """
-from app.persistence.repository import BaseRepository
+from functools import cache
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import configure_mappers, joinedload, selectinload
+
+from app.extensions import db
+from app.persistence.fieldsets import Fieldset
+from app.persistence.listing import PlaceListing
+from app.persistence.repository import BaseRepository, PlaceRepository
+from app.persistence import versions
+from app.persistence.ratings import rating_changes
+from app.services.cache import invalidates
 from app.models.user import User
 from app.models.place import Place
-from app.models.review import Review
+from app.models.review import DuplicateReviewError, Review
 from app.models.amenity import Amenity
+from app.models.geo import check_coordinates
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+BULK_CHUNK_SIZE = 500
+STREAM_BATCH_SIZE = 500
+MAX_NEARBY_RADIUS_KM = 1000
+
+
+# Loading profiles: the relationships that the serializer of an endpoint
+# reads, loaded up front instead of one lazy query per object.
+#   card    list items: owner / author name and the amenities
+#   detail  a single object with the same relationships
+#   admin   detail plus the reviews of a place or the place of a review
+# Without a profile, relationships load lazily when first read. A Fieldset
+# (app/persistence/fieldsets.py) is a profile too, built per request.
+@cache
+def loading_profiles():
+    """{model: {profile name: loader options}}, built once the mappers are configured"""
+    # The backrefs (Place.owner, Review.user) exist once the mappers are configured
+    configure_mappers()
+    owner_name = selectinload(Place.owner).load_only(User.first_name, User.last_name)
+    author_name = selectinload(Review.user).load_only(User.first_name, User.last_name)
+    return {
+        Place: {
+            "card": (owner_name, selectinload(Place.amenities)),
+            "detail": (joinedload(Place.owner), selectinload(Place.amenities)),
+            "admin": (joinedload(Place.owner), selectinload(Place.amenities), selectinload(Place.reviews)),
+        },
+        Review: {
+            "card": (author_name,),
+            "detail": (joinedload(Review.user),),
+            "admin": (joinedload(Review.user), joinedload(Review.place)),
+        },
+    }
+
+
+def loader_options(model, profile):
+    """Loader options of the named loading profile of model (() for None), or of a Fieldset"""
+    if profile is None:
+        return ()
+    if isinstance(profile, Fieldset):
+        return profile.options()
+    try:
+        return loading_profiles()[model][profile]
+    except KeyError:
+        raise ValueError(f"Unknown loading profile {profile!r} for {model.__name__}")
+
+
+def check_nearby(lat, lon, radius_km):
+    """Raise ValueError unless (lat, lon, radius_km) is a valid nearby search"""
+    check_coordinates(lat, lon)
+    if not 0 < radius_km <= MAX_NEARBY_RADIUS_KM:
+        raise ValueError(f"radius_km must be greater than 0 and at most {MAX_NEARBY_RADIUS_KM}")
+
+
+# Fields of a place its owner may set; the others (rating aggregates,
+# ordinal, geohash) are maintained by the app
+PLACE_FIELDS = ("title", "description", "price", "latitude", "longitude")
+
+
+def place_changes(place_data):
+    """The items of place_data a client may change (PLACE_FIELDS); the others are ignored"""
+    return {key: value for key, value in place_data.items() if key in PLACE_FIELDS}
+
+
+# JSON types of the fields a batch item may set, and how to name them
+PLACE_FIELD_TYPES = {
+    "title": (str, "a string"),
+    "description": ((str, type(None)), "a string"),
+    "price": ((int, float), "a number"),
+    "latitude": ((int, float), "a number"),
+    "longitude": ((int, float), "a number"),
+    "owner_id": (str, "a string"),
+}
+
+
+def check_place_types(place_data):
+    """Raise ValueError unless the fields of place_data have the JSON type of PLACE_FIELD_TYPES"""
+    for name, value in place_data.items():
+        if name not in PLACE_FIELD_TYPES:
+            continue
+        types, expected = PLACE_FIELD_TYPES[name]
+        # bool is an int to isinstance, not a number to JSON
+        if isinstance(value, bool) or not isinstance(value, types):
+            raise ValueError(f"{name} must be {expected}")
+
+
+def build_places(places_data):
+    """
+    Validate every item of places_data: the types of its fields
+    (check_place_types), then the rules of Place.__init__.
+
+    Returns (places, positions, errors): the valid Place objects, a map
+    id(place) -> (index, place id), and {'index', 'error'} for the others.
+    """
+    places, positions, errors = [], {}, []
+    for index, place_data in enumerate(places_data):
+        try:
+            if not isinstance(place_data, dict):
+                raise ValueError("Place data must be an object")
+            check_place_types(place_data)
+            place = Place(**place_data)
+        except ValueError as e:
+            errors.append({'index': index, 'error': str(e)})
+            continue
+        except (TypeError, AttributeError):
+            errors.append({'index': index, 'error': "Invalid field type"})
+            continue
+        # Keep the id aside: the rollback of a failing chunk expires the
+        # places already committed and reading place.id would reload them
+        positions[id(place)] = (index, place.id)
+        places.append(place)
+    return places, positions, errors
+
+
+def bulk_result(created, failed, positions, errors):
+    """Turn the outcome of create_many into the (created, errors) lists"""
+    errors = errors + [{'index': positions[id(place)][0], 'error': error} for place, error in failed]
+    errors.sort(key=lambda e: e['index'])
+    created = [dict(zip(('index', 'id'), positions[id(place)])) for place in created]
+    return created, errors
 
 
 class HBnBFacade:
@@ -15,12 +148,13 @@ class HBnBFacade:
     def __init__(self):
         """Initialize repositories"""
         self.user_repo = BaseRepository(User)
-        self.place_repo = BaseRepository(Place)
+        self.place_repo = PlaceRepository()
         self.review_repo = BaseRepository(Review)
         self.amenity_repo = BaseRepository(Amenity)
     
     # ========== User Methods ==========
     
+    @invalidates("user")
     def create_user(self, user_data):
         """Create a new user"""
         user = User(**user_data)
@@ -35,10 +169,18 @@ class HBnBFacade:
         # Note: You may need to implement this in BaseRepository
         return User.query.filter_by(email=email).first()
     
-    def get_all_users(self):
-        """Get all users"""
-        return self.user_repo.get_all()
+    def get_all_users(self, limit=None, cursor=None):
+        """
+        Get all users.
+
+        When `limit` or `cursor` is given, return one keyset page instead:
+        a tuple (items, next_cursor).
+        """
+        if limit is None and cursor is None:
+            return self.user_repo.get_all()
+        return self.user_repo.get_page(limit or DEFAULT_PAGE_SIZE, cursor)
     
+    @invalidates("user")
     def update_user(self, user_id, user_data):
         """Update a user"""
         user = self.get_user(user_id)
@@ -49,10 +191,14 @@ class HBnBFacade:
             db.session.commit()
         return user
     
+    @invalidates("user", "place", "review")
     def delete_user(self, user_id):
         """Delete a user"""
         user = self.get_user(user_id)
         if user:
+            # The user's reviews go with it
+            for review in user.reviews:
+                self._count_rating((review.place_id, review.rating), None)
             db.session.delete(user)
             db.session.commit()
             return True
@@ -60,29 +206,57 @@ class HBnBFacade:
     
     # ========== Place Methods ==========
     
+    @invalidates("place")
     def create_place(self, place_data):
         """Create a new place"""
         place = Place(**place_data)
         return self.place_repo.create(place)
     
-    def get_place(self, place_id):
-        """Get a place by ID"""
-        return self.place_repo.get_by_id(place_id)
+    @invalidates("place")
+    def create_places_bulk(self, places_data, chunk_size=BULK_CHUNK_SIZE):
+        """
+        Create many places, committing once per chunk.
+
+        Every item is validated by Place.__init__ first; invalid items are
+        reported and skipped. Returns (created, errors): created is a list
+        of {'index', 'id'} and errors a list of {'index', 'error'}, where
+        index is the position of the item in places_data.
+        """
+        places, positions, errors = build_places(places_data)
+        created, failed = self.place_repo.create_many(places, chunk_size)
+        return bulk_result(created, failed, positions, errors)
+
+    def get_place(self, place_id, profile=None):
+        """Get a place by ID, loading the relationships of profile"""
+        return self.place_repo.get_by_id(place_id, loader_options(Place, profile))
     
-    def get_all_places(self):
-        """Get all places"""
-        return self.place_repo.get_all()
+    def get_all_places(self, limit=None, cursor=None, profile=None):
+        """
+        Get all places, loading the relationships of profile.
+
+        When `limit` or `cursor` is given, return one keyset page instead:
+        a tuple (items, next_cursor).
+        """
+        options = loader_options(Place, profile)
+        if limit is None and cursor is None:
+            return self.place_repo.get_all(options)
+        return self.place_repo.get_page(limit or DEFAULT_PAGE_SIZE, cursor, options)
+
+    def iter_places(self, profile=None):
+        """Iterate over all places in batches of STREAM_BATCH_SIZE, for streamed responses"""
+        return self.place_repo.iter_all(loader_options(Place, profile), STREAM_BATCH_SIZE)
     
+    @invalidates("place")
     def update_place(self, place_id, place_data):
-        """Update a place"""
+        """Update the PLACE_FIELDS of a place; other keys of place_data are ignored"""
         place = self.get_place(place_id)
         if place:
-            for key, value in place_data.items():
-                if hasattr(place, key):
-                    setattr(place, key, value)
+            for key, value in place_changes(place_data).items():
+                setattr(place, key, value)
             db.session.commit()
         return place
     
+    @invalidates("place", "review")
     def delete_place(self, place_id):
         """Delete a place"""
         place = self.get_place(place_id)
@@ -92,54 +266,158 @@ class HBnBFacade:
             return True
         return False
     
-    def get_places_by_owner(self, owner_id):
+    def list_places(self, filters, limit=None, cursor=None, profile=None):
+        """
+        One keyset page of the places matching filters, in their sort order.
+
+        filters holds price_min, price_max, amenities (ids), min_rating
+        and sort ("recent", "price" or "rating"); see PlaceListing. Returns
+        (items, next_cursor, facets): the facets, counts of the matching
+        places per price bucket and per amenity, come with the first page
+        only and are None on the next ones.
+
+        Raises:
+            ValueError: If a filter or the cursor is invalid
+        """
+        listing = PlaceListing(**filters)
+        return self.place_repo.get_listing(listing, limit or DEFAULT_PAGE_SIZE, cursor,
+                                           facets=cursor is None, options=loader_options(Place, profile))
+
+    def get_places_by_owner(self, owner_id, profile=None):
         """Get all places by a specific owner"""
-        return Place.query.filter_by(owner_id=owner_id).all()
+        return Place.query.options(*loader_options(Place, profile)).filter_by(owner_id=owner_id).all()
+
+    def get_places_nearby(self, lat, lon, radius_km, limit=None, profile=None):
+        """
+        (distance in km, place) pairs of the `limit` places nearest to
+        (lat, lon) within radius_km, nearest first.
+
+        Raises:
+            ValueError: If the coordinates or the radius are out of range
+        """
+        check_nearby(lat, lon, radius_km)
+        return self.place_repo.get_nearby(lat, lon, radius_km, limit or DEFAULT_PAGE_SIZE,
+                                          loader_options(Place, profile))
+
+    def get_places_within(self, bbox, limit=None, profile=None):
+        """Up to `limit` places inside the (south, west, north, east) bounding box"""
+        return self.place_repo.get_within(bbox, limit or DEFAULT_PAGE_SIZE, loader_options(Place, profile))
+
+    def search_places(self, q, limit=None, cursor=None, profile=None):
+        """
+        Full-text search of the titles, descriptions and reviews of the
+        places, best match first. Returns one page ([(snippet, place)],
+        next_cursor); snippets are HTML with the matches in <mark>.
+
+        Raises:
+            ValueError: If q has no word or the cursor is invalid
+        """
+        return self.place_repo.search(q, limit or DEFAULT_PAGE_SIZE, cursor, loader_options(Place, profile))
     
     # ========== Review Methods ==========
     
-    def get_all_reviews(self):
-        """Get all reviews"""
-        return self.review_repo.get_all()
+    def get_all_reviews(self, limit=None, cursor=None, profile=None):
+        """
+        Get all reviews, loading the relationships of profile.
+
+        When `limit` or `cursor` is given, return one keyset page instead:
+        a tuple (items, next_cursor).
+        """
+        options = loader_options(Review, profile)
+        if limit is None and cursor is None:
+            return self.review_repo.get_all(options)
+        return self.review_repo.get_page(limit or DEFAULT_PAGE_SIZE, cursor, options)
+
+    def iter_reviews(self, profile=None):
+        """Iterate over all reviews in batches of STREAM_BATCH_SIZE, for streamed responses"""
+        return self.review_repo.iter_all(loader_options(Review, profile), STREAM_BATCH_SIZE)
     
-    def get_review(self, review_id):
-        """Get a review by ID"""
-        return self.review_repo.get_by_id(review_id)
+    def get_review(self, review_id, profile=None):
+        """Get a review by ID, loading the relationships of profile"""
+        return self.review_repo.get_by_id(review_id, loader_options(Review, profile))
     
+    @invalidates("review")
     def create_review(self, review_data):
-        """Create a new review"""
+        """
+        Create a new review and count it in the rating of its place.
+
+        Raises DuplicateReviewError when the user has already reviewed the
+        place; the unique (user_id, place_id) index decides, so two
+        concurrent requests cannot both succeed.
+        """
         review = Review(**review_data)
-        return self.review_repo.create(review)
+        self._count_rating(None, (review.place_id, review.rating))
+        try:
+            return self.review_repo.create(review)
+        except IntegrityError:
+            db.session.rollback()
+            self._raise_if_duplicate(review.user_id, review.place_id)
+            raise
     
+    @invalidates("review")
     def update_review(self, review_id, review_data):
-        """Update a review"""
+        """
+        Update a review and the rating of its place.
+        Raises DuplicateReviewError when moved to a place the user has
+        already reviewed.
+        """
         review = self.get_review(review_id)
         if review:
+            before = (review.place_id, review.rating)
             for key, value in review_data.items():
                 if hasattr(review, key):
                     setattr(review, key, value)
-            db.session.commit()
+            user_id, place_id = review.user_id, review.place_id
+            self._count_rating(before, (place_id, review.rating))
+            try:
+                db.session.commit()
+            except IntegrityError:
+                db.session.rollback()
+                self._raise_if_duplicate(user_id, place_id)
+                raise
         return review
     
+    @invalidates("review")
     def delete_review(self, review_id):
-        """Delete a review"""
+        """Delete a review and remove it from the rating of its place"""
         review = self.get_review(review_id)
         if review:
+            self._count_rating((review.place_id, review.rating), None)
             db.session.delete(review)
             db.session.commit()
             return True
         return False
     
-    def get_reviews_by_place(self, place_id):
+    def has_reviewed(self, user_id, place_id):
+        """Whether user_id has reviewed place_id: one probe of the unique index"""
+        query = Review.query.filter_by(user_id=user_id, place_id=place_id)
+        return db.session.query(query.exists()).scalar()
+
+    def _raise_if_duplicate(self, user_id, place_id):
+        if self.has_reviewed(user_id, place_id):
+            raise DuplicateReviewError("You have already reviewed this place")
+
+    def _count_rating(self, before, after):
+        """
+        Move a review from before to after in the rating aggregates of the
+        places, in the current transaction (see app/persistence/ratings.py)
+        """
+        # Without autoflush: a conflicting review change must fail at commit
+        with db.session.no_autoflush:
+            for statement in rating_changes(before, after):
+                db.session.execute(statement)
+
+    def get_reviews_by_place(self, place_id, profile=None):
         """Get all reviews for a specific place"""
-        return Review.query.filter_by(place_id=place_id).all()
+        return Review.query.options(*loader_options(Review, profile)).filter_by(place_id=place_id).all()
     
-    def get_reviews_by_user(self, user_id):
+    def get_reviews_by_user(self, user_id, profile=None):
         """Get all reviews by a specific user"""
-        return Review.query.filter_by(user_id=user_id).all()
+        return Review.query.options(*loader_options(Review, profile)).filter_by(user_id=user_id).all()
     
     # ========== Amenity Methods ==========
     
+    @invalidates("amenity")
     def create_amenity(self, amenity_data):
         """Create a new amenity"""
         amenity = Amenity(**amenity_data)
@@ -149,14 +427,22 @@ class HBnBFacade:
         """Get an amenity by ID"""
         return self.amenity_repo.get_by_id(amenity_id)
     
-    def get_all_amenities(self):
-        """Get all amenities"""
-        return self.amenity_repo.get_all()
+    def get_all_amenities(self, limit=None, cursor=None):
+        """
+        Get all amenities.
+
+        When `limit` or `cursor` is given, return one keyset page instead:
+        a tuple (items, next_cursor).
+        """
+        if limit is None and cursor is None:
+            return self.amenity_repo.get_all()
+        return self.amenity_repo.get_page(limit or DEFAULT_PAGE_SIZE, cursor)
     
     def get_amenity_by_name(self, name):
         """Get an amenity by name"""
         return Amenity.query.filter_by(name=name).first()
     
+    @invalidates("amenity")
     def update_amenity(self, amenity_id, amenity_data):
         """Update an amenity"""
         amenity = self.get_amenity(amenity_id)
@@ -167,6 +453,7 @@ class HBnBFacade:
             db.session.commit()
         return amenity
     
+    @invalidates("amenity")
     def delete_amenity(self, amenity_id):
         """Delete an amenity"""
         amenity = self.get_amenity(amenity_id)
@@ -175,3 +462,33 @@ class HBnBFacade:
             db.session.commit()
             return True
         return False
+
+    # ========== Versions ==========
+
+    def get_places_version(self, reviews=False):
+        """
+        Version of the place lists, one aggregate query: a row that
+        changes whenever a response of the endpoint could (see
+        app/persistence/versions.py); reviews and place cover the related
+        data included in the payloads. The get_*_version methods of single
+        resources return None when the resource does not exist.
+        """
+        return db.session.execute(versions.places_version(reviews)).first()
+
+    def get_place_version(self, place_id, reviews=False):
+        version = db.session.execute(versions.place_version(place_id)).first()
+        if version is None or not reviews:
+            return version
+        return (*version, *self.get_place_reviews_version(place_id))
+
+    def get_place_reviews_version(self, place_id, place=False):
+        return db.session.execute(versions.place_reviews_version(place_id, place)).first()
+
+    def get_review_version(self, review_id, place=False):
+        return db.session.execute(versions.review_version(review_id, place)).first()
+
+    def get_amenities_version(self):
+        return db.session.execute(versions.amenities_version()).first()
+
+    def get_amenity_version(self, amenity_id):
+        return db.session.execute(versions.amenity_version(amenity_id)).first()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+HBnB - Serializer throughput
+
+Compares the compiled serializers of app/api/v1/serializers.py with the
+per-field functions, flask_restx marshalling and json encoding they
+replaced. Each run serializes and encodes a list of places (with owner
+and amenities) and a list of reviews (marshalled, as the review
+endpoints did); the objects are built in memory, without a database.
+
+Usage:
+    python benchmarks/serializers.py [--rows 20000] [--repeat 5]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask_restx import fields, marshal
+
+from app.api.v1 import serializers
+from app.api.v1.places import place_to_dict
+from app.api.v1.reviews import review_to_dict
+from app.models.amenity import Amenity
+from app.models.place import Place
+from app.models.review import Review
+from app.models.user import User
+
+# The payloads as they were built before the serializers were compiled
+PLACE_VALUES = {
+    "id":          lambda place: place.id,
+    "title":       lambda place: place.title,
+    "description": lambda place: place.description,
+    "price":       lambda place: place.price,
+    "latitude":    lambda place: place.latitude,
+    "longitude":   lambda place: place.longitude,
+    "owner_id":    lambda place: place.owner_id,
+    "owner_name":  lambda place: place.owner.get_full_name() if place.owner else None,
+    "review_count":     lambda place: place.review_count or 0,
+    "average_rating":   lambda place: place.get_average_rating(),
+    "rating_histogram": lambda place: place.get_rating_histogram(),
+    "amenities":   lambda place: [{"id": a.id, "name": a.name} for a in place.amenities],
+}
+REVIEW_VALUES = {
+    "id":         lambda review: review.id,
+    "text":       lambda review: review.text,
+    "rating":     lambda review: review.rating,
+    "user_id":    lambda review: review.user_id,
+    "user_name":  lambda review: review.user.get_full_name() if review.user else None,
+    "place_id":   lambda review: review.place_id,
+    "created_at": lambda review: review.created_at.isoformat() if review.created_at else None,
+    "updated_at": lambda review: review.updated_at.isoformat() if review.updated_at else None,
+}
+REVIEW_RESPONSE = {
+    "id": fields.String, "text": fields.String, "rating": fields.Integer,
+    "user_id": fields.String, "user_name": fields.String, "place_id": fields.String,
+    "created_at": fields.String, "updated_at": fields.String,
+}
+
+
+def build(rows):
+    """rows places, each with an owner, two amenities and a review"""
+    now = datetime.utcnow()
+    owner = User(first_name="Bench", last_name="Owner", email="owner@bench.com", password="123456")
+    author = User(first_name="Bench", last_name="Author", email="author@bench.com", password="123456")
+    amenities = [Amenity(name="Wifi"), Amenity(name="Pool")]
+    places, reviews = [], []
+    for i in range(rows):
+        place = Place(title=f"Place {i}", description="A bench place", price=100 + i % 50,
+                      latitude=24.7, longitude=46.6, owner=owner)
+        place.amenities.extend(amenities)
+        place.review_count, place.rating_sum = 1, 4
+        place.rating_1 = place.rating_2 = place.rating_3 = place.rating_5 = 0
+        place.rating_4 = 1
+        review = Review(text="A bench review", rating=4, user_id=author.id, place_id=place.id)
+        review.user, review.created_at, review.updated_at = author, now, now
+        places.append(place)
+        reviews.append(review)
+    return places, reviews
+
+
+def before(places, reviews):
+    body = json.dumps([{name: value(p) for name, value in PLACE_VALUES.items()} for p in places])
+    items = [{name: value(r) for name, value in REVIEW_VALUES.items()} for r in reviews]
+    return body, json.dumps(marshal(items, REVIEW_RESPONSE))
+
+
+def after(places, reviews):
+    return serializers.dumps(place_to_dict.many(places)), serializers.dumps(review_to_dict.many(reviews))
+
+
+def rows_per_second(serialize, places, reviews, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        serialize(places, reviews)
+        best = min(best, time.perf_counter() - start)
+    return (len(places) + len(reviews)) / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    places, reviews = build(args.rows)
+    assert json.loads(before(places, reviews)[0]) == json.loads(after(places, reviews)[0])
+    assert json.loads(before(places, reviews)[1]) == json.loads(after(places, reviews)[1])
+
+    runs = [("per-field + marshal + json", before), ("compiled + json", after)]
+    if serializers.orjson is not None:
+        runs.append(("compiled + orjson", after))
+
+    print(f"\n{args.rows} places and {args.rows} reviews, best of {args.repeat}")
+    print(f"{'serializer':<30}{'rows/s':>12}")
+    orjson = serializers.orjson
+    for name, serialize in runs:
+        serializers.orjson = orjson if "orjson" in name else None
+        print(f"{name:<30}{rows_per_second(serialize, places, reviews, args.repeat):>12.0f}")
+    serializers.orjson = orjson
+
+
+if __name__ == "__main__":
+    main()
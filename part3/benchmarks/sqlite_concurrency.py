@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+HBnB - SQLite read throughput under concurrent writers
+
+Compares the default SQLite setup (DevelopmentConfig) with the WAL and
+pragma settings of ProductionConfig. Readers do primary key lookups on
+`places` while writers keep inserting rows, each in its own transaction.
+
+Usage:
+    python benchmarks/sqlite_concurrency.py [--readers 8] [--writers 2] [--seconds 5]
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.exc import OperationalError
+
+from config import DevelopmentConfig, ProductionConfig
+from app.extensions import db
+from app.models.place import Place
+from app.persistence.engine import set_sqlite_pragmas
+
+SEED_ROWS = 10000
+
+
+def place_row():
+    now = datetime.utcnow()
+    return {
+        "id": str(uuid.uuid4()), "title": "Bench place", "description": "",
+        "price": 100.0, "latitude": 24.7, "longitude": 46.6,
+        "owner_id": "bench-owner", "created_at": now, "updated_at": now,
+    }
+
+
+def make_engine(path, config):
+    options = dict(getattr(config, "SQLALCHEMY_ENGINE_OPTIONS", {}))
+    engine = create_engine(f"sqlite:///{path}", **options)
+    set_sqlite_pragmas(engine, config.SQLITE_PRAGMAS)
+    return engine
+
+
+def run(config, readers, writers, seconds):
+    """Return (reads/sec, writes/sec, read errors, write errors)"""
+    workdir = tempfile.mkdtemp(prefix="hbnb-bench-")
+    engine = make_engine(os.path.join(workdir, "bench.db"), config)
+    places = Place.__table__
+
+    db.metadata.create_all(engine, tables=[places])
+    seed = [place_row() for _ in range(SEED_ROWS)]
+    with engine.begin() as conn:
+        conn.execute(places.insert(), seed)
+    ids = [row["id"] for row in seed]
+
+    stop = threading.Event()
+    counts = {"reads": 0, "writes": 0, "read_errors": 0, "write_errors": 0}
+    lock = threading.Lock()
+
+    def reader(offset):
+        done = errors = 0
+        query = select(places).where(places.c.id == db.bindparam("id"))
+        i = offset
+        while not stop.is_set():
+            try:
+                with engine.connect() as conn:
+                    conn.execute(query, {"id": ids[i % len(ids)]}).first()
+                done += 1
+            except OperationalError:
+                errors += 1
+            i += 7
+        with lock:
+            counts["reads"] += done
+            counts["read_errors"] += errors
+
+    def writer():
+        done = errors = 0
+        while not stop.is_set():
+            try:
+                with engine.begin() as conn:
+                    conn.execute(places.insert(), [place_row() for _ in range(10)])
+                done += 1
+            except OperationalError:
+                errors += 1
+        with lock:
+            counts["writes"] += done
+            counts["write_errors"] += errors
+
+    threads = [threading.Thread(target=reader, args=(n,)) for n in range(readers)]
+    threads += [threading.Thread(target=writer) for _ in range(writers)]
+    for t in threads:
+        t.start()
+    time.sleep(seconds)
+    stop.set()
+    for t in threads:
+        t.join()
+    engine.dispose()
+    shutil.rmtree(workdir, ignore_errors=True)
+
+    return (counts["reads"] / seconds, counts["writes"] / seconds,
+            counts["read_errors"], counts["write_errors"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--seconds", type=float, default=5)
+    args = parser.parse_args()
+
+    print(f"\n{args.readers} readers, {args.writers} writers, {args.seconds:g}s per run")
+    print(f"{'config':<20}{'reads/s':>12}{'write tx/s':>12}{'read err':>10}{'write err':>10}")
+    for name, config in (("default", DevelopmentConfig), ("WAL + pragmas", ProductionConfig)):
+        reads, writes, read_errors, write_errors = run(config, args.readers, args.writers, args.seconds)
+        print(f"{name:<20}{reads:>12.0f}{writes:>12.0f}{read_errors:>10}{write_errors:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+HBnB - Query plan check
+
+Migrates the database, then runs EXPLAIN QUERY PLAN on every hot query
+(see app/persistence/query_plans.py) and exits with status 1 if one of
+them scans a whole table instead of using an index.
+
+Usage:
+    python check_query_plans.py
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import create_app
+from app.extensions import db
+from app.persistence.migrations import migrate
+from app.persistence.query_plans import full_scans
+
+
+def main():
+    app = create_app("development")
+    with app.app_context():
+        migrate(db.engine)
+        with db.engine.connect() as connection:
+            problems = full_scans(connection)
+
+    for name, plan in problems.items():
+        print(f"FULL SCAN  {name}")
+        for detail in plan:
+            print(f"    {detail}")
+    if problems:
+        return 1
+    print("All hot queries use an index")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
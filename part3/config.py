@@ -5,7 +5,58 @@ class DevelopmentConfig:
     SQLALCHEMY_DATABASE_URI = "sqlite:///hbnb.db"
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     JWT_SECRET_KEY = "super-secret-key"
+    # PRAGMA name -> value, run on every new SQLite connection
+    SQLITE_PRAGMAS = {}
+    # Serve the read endpoints from their asyncio handlers (AsyncHBnBFacade);
+    # needs the aiosqlite, greenlet and asgiref packages
+    ASYNC_READS = False
+    # Response cache of the public GET endpoints (app/services/cache.py):
+    # None, "memory" (one per worker) or "shared" (one per host)
+    RESPONSE_CACHE = None
+    RESPONSE_CACHE_TTL = 60  # seconds
+    RESPONSE_CACHE_MAX_BYTES = 64 * 1024 * 1024
+    # Largest response the "memory" backend stores: a streamed list is
+    # buffered up to this size only
+    RESPONSE_CACHE_MAX_ENTRY_BYTES = 4 * 1024 * 1024
+    # Shared memory segment of the "shared" backend and the size of its slots
+    RESPONSE_CACHE_NAME = "hbnb-response-cache"
+    RESPONSE_CACHE_SLOT_BYTES = 64 * 1024
+
+class ProductionConfig(DevelopmentConfig):
+    DEBUG = False
+    SQLALCHEMY_DATABASE_URI = os.environ.get("DATABASE_URL", "sqlite:///hbnb.db")
+    # Required: create_app() refuses to start without it
+    JWT_SECRET_KEY = os.environ.get("JWT_SECRET_KEY")
+
+    # Optional read replica (kept in sync outside the app, e.g. by
+    # LiteFS/Litestream). Reads go there; writes and any read issued
+    # after a write in the same request go to the primary.
+    READ_REPLICA_URI = os.environ.get("DATABASE_REPLICA_URL")
+    SQLALCHEMY_BINDS = {"replica": READ_REPLICA_URI} if READ_REPLICA_URI else {}
+
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        "pool_size": int(os.environ.get("DB_POOL_SIZE", 10)),
+        "max_overflow": int(os.environ.get("DB_MAX_OVERFLOW", 20)),
+        "pool_pre_ping": os.environ.get("DB_POOL_PRE_PING", "true").lower() == "true",
+    }
+
+    ASYNC_READS = os.environ.get("HBNB_ASYNC_READS", "false").lower() == "true"
+
+    RESPONSE_CACHE = os.environ.get("HBNB_RESPONSE_CACHE")
+    RESPONSE_CACHE_TTL = int(os.environ.get("HBNB_RESPONSE_CACHE_TTL", 60))
+    RESPONSE_CACHE_MAX_BYTES = int(os.environ.get("HBNB_RESPONSE_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+    RESPONSE_CACHE_MAX_ENTRY_BYTES = int(os.environ.get("HBNB_RESPONSE_CACHE_MAX_ENTRY_BYTES", 4 * 1024 * 1024))
+
+    # WAL lets readers run alongside a writer instead of hitting "database is locked"
+    SQLITE_PRAGMAS = {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "mmap_size": int(os.environ.get("SQLITE_MMAP_SIZE", 256 * 1024 * 1024)),
+        "cache_size": int(os.environ.get("SQLITE_CACHE_SIZE", -64000)),  # negative = KiB
+        "busy_timeout": int(os.environ.get("SQLITE_BUSY_TIMEOUT", 5000)),  # ms
+    }
 
 config_dict = {
-    "development": DevelopmentConfig
+    "development": DevelopmentConfig,
+    "production": ProductionConfig,
 }
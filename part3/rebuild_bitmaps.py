@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+"""
+HBnB - Amenity bitmaps rebuild
+
+Recomputes the bitmap of the places of every amenity from place_amenity
+(see app/persistence/bitmaps.py), e.g. after links were imported or
+deleted outside the ORM.
+
+Usage:
+    python rebuild_bitmaps.py
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import create_app
+from app.extensions import db
+from app.persistence.bitmaps import rebuild_amenity_bitmaps
+
+
+def main():
+    app = create_app("development")
+    with app.app_context():
+        rebuilt = rebuild_amenity_bitmaps(db.session)
+    print(f"Rebuilt the bitmaps of {rebuilt} amenity(ies)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+"""
+HBnB - Rating aggregates repair
+
+Recomputes review_count, rating_sum and the rating histogram of every
+place from the reviews table (one GROUP BY, see app/persistence/ratings.py),
+e.g. after reviews were imported or deleted outside the API.
+
+Usage:
+    python repair_ratings.py
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import create_app
+from app.extensions import db
+from app.persistence.ratings import recompute_ratings
+
+
+def main():
+    app = create_app("development")
+    with app.app_context():
+        repaired = recompute_ratings(db.session)
+    print(f"Repaired the rating aggregates of {repaired} place(s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,6 +3,7 @@
 HBnB - Database Setup Script
 """
 
+import argparse
 import os
 import sys
 
@@ -15,10 +16,17 @@ from app.models.user import User
 from app.models.place import Place
 from app.models.amenity import Amenity
 from app.models.review import Review
+from app.persistence.migrations import migrate
+from app.persistence.ratings import recompute_ratings
 import uuid
 
 def main():
 
+    parser = argparse.ArgumentParser(description="Migrate and seed the HBnB database")
+    parser.add_argument("--reset", action="store_true",
+                        help="drop every table (data included) before migrating")
+    args = parser.parse_args()
+
     print("\n" + "="*60)
     print("HBnB Database Setup")
     print("="*60)
@@ -27,15 +35,23 @@ def main():
 
     with app.app_context():
         try:
-            # Step 1: Drop & Create tables
-            print("\nDropping existing tables...")
-            db.drop_all()
+            # Step 1: Migrate the schema
+            if args.reset:
+                print("\nDropping existing tables...")
+                db.drop_all()
+                with db.engine.begin() as connection:
+                    connection.exec_driver_sql("DROP TABLE IF EXISTS schema_version")
 
-            print("Creating fresh tables...")
-            db.create_all()
+            print("\nApplying migrations...")
+            for version, name in migrate(db.engine):
+                print(f"  {version:04d} {name}")
 
             print("Tables ready!")
 
+            if User.query.first():
+                print("\nDatabase already has data, skipping seed (use --reset to start over)")
+                return 0
+
             # Step 2: Create Users
             print("\nCreating users...")
 
@@ -185,6 +201,7 @@ def main():
                 db.session.add(review)
 
             db.session.commit()
+            recompute_ratings(db.session)
             print(f"Created {Review.query.count()} reviews")
 
             # Summary
@@ -0,0 +1,65 @@
+-- Tables as created by db.create_all() before migrations existed.
+-- IF NOT EXISTS lets databases created that way adopt the migrations.
+
+CREATE TABLE IF NOT EXISTS users (
+    first_name VARCHAR(50) NOT NULL,
+    last_name VARCHAR(50) NOT NULL,
+    email VARCHAR(120) NOT NULL,
+    password VARCHAR(128) NOT NULL,
+    is_admin BOOLEAN,
+    id VARCHAR(36) NOT NULL,
+    created_at DATETIME,
+    updated_at DATETIME,
+    PRIMARY KEY (id),
+    UNIQUE (email)
+);
+
+CREATE TABLE IF NOT EXISTS amenities (
+    name VARCHAR(50) NOT NULL,
+    description VARCHAR(200),
+    id VARCHAR(36) NOT NULL,
+    created_at DATETIME,
+    updated_at DATETIME,
+    PRIMARY KEY (id)
+);
+
+CREATE TABLE IF NOT EXISTS places (
+    title VARCHAR(100) NOT NULL,
+    description TEXT,
+    price FLOAT NOT NULL,
+    latitude FLOAT NOT NULL,
+    longitude FLOAT NOT NULL,
+    owner_id VARCHAR(36) NOT NULL,
+    id VARCHAR(36) NOT NULL,
+    created_at DATETIME,
+    updated_at DATETIME,
+    PRIMARY KEY (id),
+    FOREIGN KEY(owner_id) REFERENCES users (id)
+);
+
+CREATE TABLE IF NOT EXISTS place_amenity (
+    place_id VARCHAR(36) NOT NULL,
+    amenity_id VARCHAR(36) NOT NULL,
+    PRIMARY KEY (place_id, amenity_id),
+    FOREIGN KEY(place_id) REFERENCES places (id),
+    FOREIGN KEY(amenity_id) REFERENCES amenities (id)
+);
+
+CREATE TABLE IF NOT EXISTS reviews (
+    text TEXT NOT NULL,
+    rating INTEGER NOT NULL,
+    user_id VARCHAR(36) NOT NULL,
+    place_id VARCHAR(36) NOT NULL,
+    id VARCHAR(36) NOT NULL,
+    created_at DATETIME,
+    updated_at DATETIME,
+    PRIMARY KEY (id),
+    FOREIGN KEY(user_id) REFERENCES users (id),
+    FOREIGN KEY(place_id) REFERENCES places (id)
+);
+
+-- Keyset pagination on (created_at, id)
+CREATE INDEX IF NOT EXISTS ix_users_created_at_id ON users (created_at, id);
+CREATE INDEX IF NOT EXISTS ix_amenities_created_at_id ON amenities (created_at, id);
+CREATE INDEX IF NOT EXISTS ix_places_created_at_id ON places (created_at, id);
+CREATE INDEX IF NOT EXISTS ix_reviews_created_at_id ON reviews (created_at, id);
@@ -0,0 +1,10 @@
+-- Indexes for the lookups by foreign key and name: get_reviews_by_place,
+-- get_reviews_by_user, get_places_by_owner, get_amenity_by_name and the
+-- amenity -> places side of place_amenity. The trailing created_at returns
+-- the rows in creation order without a sort.
+
+CREATE INDEX IF NOT EXISTS ix_reviews_place_id_created_at ON reviews (place_id, created_at);
+CREATE INDEX IF NOT EXISTS ix_reviews_user_id_created_at ON reviews (user_id, created_at);
+CREATE INDEX IF NOT EXISTS ix_places_owner_id_created_at ON places (owner_id, created_at);
+CREATE INDEX IF NOT EXISTS ix_amenities_name ON amenities (name);
+CREATE INDEX IF NOT EXISTS ix_place_amenity_amenity_id_place_id ON place_amenity (amenity_id, place_id);
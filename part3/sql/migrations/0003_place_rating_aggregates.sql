@@ -0,0 +1,21 @@
+-- Rating aggregates of the places, maintained with the reviews (see
+-- app/persistence/ratings.py), then filled from the existing reviews.
+-- SQLite has no ADD COLUMN IF NOT EXISTS: if this migration fails half
+-- way, drop the columns it added before running it again.
+
+ALTER TABLE places ADD COLUMN review_count INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE places ADD COLUMN rating_sum INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE places ADD COLUMN rating_1 INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE places ADD COLUMN rating_2 INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE places ADD COLUMN rating_3 INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE places ADD COLUMN rating_4 INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE places ADD COLUMN rating_5 INTEGER NOT NULL DEFAULT 0;
+
+UPDATE places SET
+    review_count = (SELECT COUNT(*) FROM reviews WHERE reviews.place_id = places.id),
+    rating_sum = (SELECT COALESCE(SUM(rating), 0) FROM reviews WHERE reviews.place_id = places.id),
+    rating_1 = (SELECT COUNT(*) FROM reviews WHERE reviews.place_id = places.id AND rating = 1),
+    rating_2 = (SELECT COUNT(*) FROM reviews WHERE reviews.place_id = places.id AND rating = 2),
+    rating_3 = (SELECT COUNT(*) FROM reviews WHERE reviews.place_id = places.id AND rating = 3),
+    rating_4 = (SELECT COUNT(*) FROM reviews WHERE reviews.place_id = places.id AND rating = 4),
+    rating_5 = (SELECT COUNT(*) FROM reviews WHERE reviews.place_id = places.id AND rating = 5);
@@ -0,0 +1,24 @@
+-- One review per user and place. The API refused duplicates before, but
+-- without a constraint two concurrent requests could both get through:
+-- keep the oldest review of each (user, place) pair, then enforce it.
+
+DELETE FROM reviews
+WHERE EXISTS (
+    SELECT 1 FROM reviews AS older
+    WHERE older.user_id = reviews.user_id
+      AND older.place_id = reviews.place_id
+      AND (older.created_at < reviews.created_at
+           OR (older.created_at = reviews.created_at AND older.id < reviews.id))
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS uq_reviews_user_id_place_id ON reviews (user_id, place_id);
+
+-- The deleted duplicates were counted in the rating aggregates (0003)
+UPDATE places SET
+    review_count = (SELECT COUNT(*) FROM reviews WHERE reviews.place_id = places.id),
+    rating_sum = (SELECT COALESCE(SUM(rating), 0) FROM reviews WHERE reviews.place_id = places.id),
+    rating_1 = (SELECT COUNT(*) FROM reviews WHERE reviews.place_id = places.id AND rating = 1),
+    rating_2 = (SELECT COUNT(*) FROM reviews WHERE reviews.place_id = places.id AND rating = 2),
+    rating_3 = (SELECT COUNT(*) FROM reviews WHERE reviews.place_id = places.id AND rating = 3),
+    rating_4 = (SELECT COUNT(*) FROM reviews WHERE reviews.place_id = places.id AND rating = 4),
+    rating_5 = (SELECT COUNT(*) FROM reviews WHERE reviews.place_id = places.id AND rating = 5);
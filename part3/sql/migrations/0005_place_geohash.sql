@@ -0,0 +1,11 @@
+-- Geohash of the location of the places, kept in sync by the Place model
+-- and indexed for the nearby / bounding box searches (app/models/geo.py).
+-- geohash() is registered on the connection by app/persistence/engine.py.
+-- SQLite has no ADD COLUMN IF NOT EXISTS: if this migration fails half
+-- way, drop the column before running it again.
+
+ALTER TABLE places ADD COLUMN geohash VARCHAR(12);
+
+UPDATE places SET geohash = geohash(latitude, longitude);
+
+CREATE INDEX IF NOT EXISTS ix_places_geohash ON places (geohash);
@@ -0,0 +1,59 @@
+-- Full-text search of the places: an FTS5 document per place and per
+-- review, kept in sync by triggers (see app/persistence/search.py, which
+-- creates the same objects for db.create_all()).
+
+CREATE TABLE IF NOT EXISTS place_search_docs (
+    id INTEGER PRIMARY KEY,
+    kind VARCHAR(6) NOT NULL,
+    entity_id VARCHAR(36) NOT NULL,
+    UNIQUE (kind, entity_id)
+);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS place_search USING fts5(
+    place_id UNINDEXED, title, description, review,
+    tokenize = 'porter unicode61 remove_diacritics 2', prefix = '2 3'
+);
+
+-- Index the existing places and reviews
+INSERT INTO place_search_docs (kind, entity_id) SELECT 'place', id FROM places;
+INSERT INTO place_search_docs (kind, entity_id) SELECT 'review', id FROM reviews;
+INSERT INTO place_search (rowid, place_id, title, description)
+SELECT place_search_docs.id, places.id, places.title, places.description
+FROM places JOIN place_search_docs ON place_search_docs.kind = 'place' AND place_search_docs.entity_id = places.id;
+INSERT INTO place_search (rowid, place_id, review)
+SELECT place_search_docs.id, reviews.place_id, reviews.text
+FROM reviews JOIN place_search_docs ON place_search_docs.kind = 'review' AND place_search_docs.entity_id = reviews.id;
+
+CREATE TRIGGER IF NOT EXISTS place_search_place_insert AFTER INSERT ON places BEGIN
+    INSERT INTO place_search_docs (kind, entity_id) VALUES ('place', new.id);
+    INSERT INTO place_search (rowid, place_id, title, description)
+    VALUES (last_insert_rowid(), new.id, new.title, new.description);
+END;
+
+CREATE TRIGGER IF NOT EXISTS place_search_place_update AFTER UPDATE OF title, description ON places BEGIN
+    UPDATE place_search SET title = new.title, description = new.description
+    WHERE rowid = (SELECT id FROM place_search_docs WHERE kind = 'place' AND entity_id = new.id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS place_search_place_delete AFTER DELETE ON places BEGIN
+    DELETE FROM place_search
+    WHERE rowid = (SELECT id FROM place_search_docs WHERE kind = 'place' AND entity_id = old.id);
+    DELETE FROM place_search_docs WHERE kind = 'place' AND entity_id = old.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS place_search_review_insert AFTER INSERT ON reviews BEGIN
+    INSERT INTO place_search_docs (kind, entity_id) VALUES ('review', new.id);
+    INSERT INTO place_search (rowid, place_id, review)
+    VALUES (last_insert_rowid(), new.place_id, new.text);
+END;
+
+CREATE TRIGGER IF NOT EXISTS place_search_review_update AFTER UPDATE OF text, place_id ON reviews BEGIN
+    UPDATE place_search SET place_id = new.place_id, review = new.text
+    WHERE rowid = (SELECT id FROM place_search_docs WHERE kind = 'review' AND entity_id = new.id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS place_search_review_delete AFTER DELETE ON reviews BEGIN
+    DELETE FROM place_search
+    WHERE rowid = (SELECT id FROM place_search_docs WHERE kind = 'review' AND entity_id = old.id);
+    DELETE FROM place_search_docs WHERE kind = 'review' AND entity_id = old.id;
+END;
@@ -0,0 +1,14 @@
+-- Server-side filtering and sorting of the place listings (see
+-- app/persistence/listing.py): the average rating is stored with the other
+-- rating aggregates, and (price, id) / (average_rating, id) serve the
+-- sorted, keyset-paginated listings.
+-- SQLite has no ADD COLUMN IF NOT EXISTS: if this migration fails half
+-- way, drop the column before running it again.
+
+ALTER TABLE places ADD COLUMN average_rating FLOAT NOT NULL DEFAULT 0;
+
+UPDATE places SET average_rating = CASE
+    WHEN review_count > 0 THEN CAST(rating_sum AS FLOAT) / review_count ELSE 0.0 END;
+
+CREATE INDEX IF NOT EXISTS ix_places_price_id ON places (price, id);
+CREATE INDEX IF NOT EXISTS ix_places_average_rating_id ON places (average_rating, id);
@@ -0,0 +1,29 @@
+-- Bitmap index of the amenities (see app/persistence/bitmaps.py): every
+-- place gets a dense ordinal, set on insert by the place_ordinal trigger,
+-- and amenity_bitmaps holds the compressed bitmap of the ordinals of the
+-- places of each amenity, built here with the bitmap() aggregate
+-- registered on the connection by app/persistence/engine.py.
+-- SQLite has no ADD COLUMN IF NOT EXISTS: if this migration fails half
+-- way, drop the column before running it again.
+
+ALTER TABLE places ADD COLUMN ordinal INTEGER;
+
+UPDATE places SET ordinal = rowid;
+
+CREATE UNIQUE INDEX IF NOT EXISTS uq_places_ordinal ON places (ordinal);
+
+CREATE TRIGGER IF NOT EXISTS place_ordinal AFTER INSERT ON places WHEN new.ordinal IS NULL BEGIN
+    UPDATE places SET ordinal = (SELECT COALESCE(MAX(ordinal), 0) + 1 FROM places)
+    WHERE rowid = new.rowid;
+END;
+
+CREATE TABLE IF NOT EXISTS amenity_bitmaps (
+    amenity_id VARCHAR(36) NOT NULL PRIMARY KEY,
+    bitmap BLOB NOT NULL,
+    FOREIGN KEY (amenity_id) REFERENCES amenities(id)
+);
+
+INSERT INTO amenity_bitmaps (amenity_id, bitmap)
+SELECT place_amenity.amenity_id, bitmap(places.ordinal)
+FROM place_amenity JOIN places ON places.id = place_amenity.place_id
+GROUP BY place_amenity.amenity_id;
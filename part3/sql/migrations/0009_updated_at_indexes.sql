@@ -0,0 +1,6 @@
+-- Conditional GETs (see app/persistence/versions.py): the version of the
+-- place lists reads MAX(updated_at) of the places and of their owners,
+-- one index probe each.
+
+CREATE INDEX IF NOT EXISTS ix_places_updated_at ON places (updated_at);
+CREATE INDEX IF NOT EXISTS ix_users_updated_at ON users (updated_at);
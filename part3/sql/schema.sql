@@ -18,7 +18,17 @@ CREATE TABLE places (
     price FLOAT NOT NULL,
     latitude FLOAT NOT NULL,
     longitude FLOAT NOT NULL,
+    geohash VARCHAR(12),
     owner_id VARCHAR(36) NOT NULL,
+    review_count INTEGER NOT NULL DEFAULT 0,
+    rating_sum INTEGER NOT NULL DEFAULT 0,
+    rating_1 INTEGER NOT NULL DEFAULT 0,
+    rating_2 INTEGER NOT NULL DEFAULT 0,
+    rating_3 INTEGER NOT NULL DEFAULT 0,
+    rating_4 INTEGER NOT NULL DEFAULT 0,
+    rating_5 INTEGER NOT NULL DEFAULT 0,
+    average_rating FLOAT NOT NULL DEFAULT 0,
+    ordinal INTEGER,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     FOREIGN KEY (owner_id) REFERENCES users(id) ON DELETE CASCADE
@@ -54,3 +64,80 @@ CREATE TABLE place_amenity (
     FOREIGN KEY (place_id) REFERENCES places(id) ON DELETE CASCADE,
     FOREIGN KEY (amenity_id) REFERENCES amenities(id) ON DELETE CASCADE
 );
+
+-- Indexes (see sql/migrations)
+CREATE INDEX ix_users_created_at_id ON users (created_at, id);
+CREATE INDEX ix_users_updated_at ON users (updated_at);
+CREATE INDEX ix_places_created_at_id ON places (created_at, id);
+CREATE INDEX ix_places_owner_id_created_at ON places (owner_id, created_at);
+CREATE INDEX ix_places_geohash ON places (geohash);
+CREATE INDEX ix_places_price_id ON places (price, id);
+CREATE INDEX ix_places_average_rating_id ON places (average_rating, id);
+CREATE INDEX ix_places_updated_at ON places (updated_at);
+CREATE INDEX ix_reviews_created_at_id ON reviews (created_at, id);
+CREATE INDEX ix_reviews_place_id_created_at ON reviews (place_id, created_at);
+CREATE INDEX ix_reviews_user_id_created_at ON reviews (user_id, created_at);
+CREATE UNIQUE INDEX uq_reviews_user_id_place_id ON reviews (user_id, place_id);
+CREATE INDEX ix_amenities_created_at_id ON amenities (created_at, id);
+CREATE INDEX ix_amenities_name ON amenities (name);
+CREATE INDEX ix_place_amenity_amenity_id_place_id ON place_amenity (amenity_id, place_id);
+CREATE UNIQUE INDEX uq_places_ordinal ON places (ordinal);
+
+-- Bitmap index of the amenities (see app/persistence/bitmaps.py)
+CREATE TABLE amenity_bitmaps (
+    amenity_id VARCHAR(36) NOT NULL PRIMARY KEY,
+    bitmap BLOB NOT NULL,
+    FOREIGN KEY (amenity_id) REFERENCES amenities(id)
+);
+
+CREATE TRIGGER place_ordinal AFTER INSERT ON places WHEN new.ordinal IS NULL BEGIN
+    UPDATE places SET ordinal = (SELECT COALESCE(MAX(ordinal), 0) + 1 FROM places)
+    WHERE rowid = new.rowid;
+END;
+
+-- Full-text search of the places (see app/persistence/search.py)
+CREATE TABLE place_search_docs (
+    id INTEGER PRIMARY KEY,
+    kind VARCHAR(6) NOT NULL,
+    entity_id VARCHAR(36) NOT NULL,
+    UNIQUE (kind, entity_id)
+);
+
+CREATE VIRTUAL TABLE place_search USING fts5(
+    place_id UNINDEXED, title, description, review,
+    tokenize = 'porter unicode61 remove_diacritics 2', prefix = '2 3'
+);
+
+CREATE TRIGGER place_search_place_insert AFTER INSERT ON places BEGIN
+    INSERT INTO place_search_docs (kind, entity_id) VALUES ('place', new.id);
+    INSERT INTO place_search (rowid, place_id, title, description)
+    VALUES (last_insert_rowid(), new.id, new.title, new.description);
+END;
+
+CREATE TRIGGER place_search_place_update AFTER UPDATE OF title, description ON places BEGIN
+    UPDATE place_search SET title = new.title, description = new.description
+    WHERE rowid = (SELECT id FROM place_search_docs WHERE kind = 'place' AND entity_id = new.id);
+END;
+
+CREATE TRIGGER place_search_place_delete AFTER DELETE ON places BEGIN
+    DELETE FROM place_search
+    WHERE rowid = (SELECT id FROM place_search_docs WHERE kind = 'place' AND entity_id = old.id);
+    DELETE FROM place_search_docs WHERE kind = 'place' AND entity_id = old.id;
+END;
+
+CREATE TRIGGER place_search_review_insert AFTER INSERT ON reviews BEGIN
+    INSERT INTO place_search_docs (kind, entity_id) VALUES ('review', new.id);
+    INSERT INTO place_search (rowid, place_id, review)
+    VALUES (last_insert_rowid(), new.place_id, new.text);
+END;
+
+CREATE TRIGGER place_search_review_update AFTER UPDATE OF text, place_id ON reviews BEGIN
+    UPDATE place_search SET place_id = new.place_id, review = new.text
+    WHERE rowid = (SELECT id FROM place_search_docs WHERE kind = 'review' AND entity_id = new.id);
+END;
+
+CREATE TRIGGER place_search_review_delete AFTER DELETE ON reviews BEGIN
+    DELETE FROM place_search
+    WHERE rowid = (SELECT id FROM place_search_docs WHERE kind = 'review' AND entity_id = old.id);
+    DELETE FROM place_search_docs WHERE kind = 'review' AND entity_id = old.id;
+END;
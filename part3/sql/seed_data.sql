@@ -13,16 +13,24 @@ INSERT INTO amenities (id, name, description) VALUES
 ('3', 'Air Conditioning', 'AC in all rooms');
 
 -- Sample Place
-INSERT INTO places (id, title, description, price, latitude, longitude, owner_id)
+INSERT INTO places (id, title, description, price, latitude, longitude, geohash, owner_id)
 VALUES
-('1', 'Cozy Apartment', 'Nice and cozy', 100.0, 24.7136, 46.6753, '1');
+('1', 'Cozy Apartment', 'Nice and cozy', 100.0, 24.7136, 46.6753, 'th3hw4gzj', '1');
 
 -- Sample Review
 INSERT INTO reviews (id, text, rating, user_id, place_id)
 VALUES
 ('1', 'Great place!', 5, '1', '1');
 
+-- Rating aggregates of the sample place
+UPDATE places SET review_count = 1, rating_sum = 5, rating_5 = 1, average_rating = 5.0 WHERE id = '1';
+
 -- Link Place to Amenities
 INSERT INTO place_amenity (place_id, amenity_id) VALUES
 ('1', '1'),
 ('1', '2');
+
+-- Amenity bitmaps: the sample place has ordinal 1 (app/models/bitmap.py)
+INSERT INTO amenity_bitmaps (amenity_id, bitmap) VALUES
+('1', X'01000000010000000100'),
+('2', X'01000000010000000100');
@@ -0,0 +1,33 @@
+"""Test helper counting the SQL statements that a block of code runs"""
+from contextlib import contextmanager
+
+from sqlalchemy import event
+
+
+class QueryCountMixin:
+    """
+    unittest.TestCase mixin:
+
+        with self.assertMaxQueries(engine, 3) as statements:
+            self.client.get("/api/v1/places/")
+
+    fails when the block runs more than 3 SQL statements on engine, and
+    lists them. statements holds the SQL of the statements run so far.
+    """
+
+    @contextmanager
+    def assertMaxQueries(self, engine, maximum):
+        statements = []
+
+        def record(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(engine, "before_cursor_execute", record)
+        try:
+            yield statements
+        finally:
+            event.remove(engine, "before_cursor_execute", record)
+        self.assertLessEqual(
+            len(statements), maximum,
+            f"{len(statements)} statements run, at most {maximum} expected:\n" + "\n".join(statements)
+        )
@@ -0,0 +1,96 @@
+import asyncio
+import importlib.util
+import unittest
+from app import create_app
+from app.extensions import db
+from app.models.user import User
+from app.models.place import Place
+from app.models.amenity import Amenity
+from app.services.async_facade import AsyncHBnBFacade
+from config import DevelopmentConfig
+
+ASYNC_EXTRAS = all(importlib.util.find_spec(name) for name in ("aiosqlite", "greenlet", "asgiref"))
+
+
+class AsyncReadsConfig(DevelopmentConfig):
+    ASYNC_READS = True
+
+
+@unittest.skipUnless(ASYNC_EXTRAS, "aiosqlite, greenlet and asgiref are required")
+class TestAsyncReads(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app(AsyncReadsConfig)
+        self.app.config["TESTING"] = True
+        self.client = self.app.test_client()
+
+        with self.app.app_context():
+            db.create_all()
+
+            owner = User(first_name="Async", last_name="Owner", email="async@test.com", password="123456")
+            wifi = Amenity(name="Wifi")
+            db.session.add_all([owner, wifi])
+            db.session.commit()
+
+            place = Place(title="Async place", price=100, latitude=10, longitude=20, owner_id=owner.id)
+            place.amenities.append(wifi)
+            db.session.add(place)
+            db.session.commit()
+            self.owner_id = owner.id
+            self.place_id = place.id
+            self.wifi_id = wifi.id
+
+    def tearDown(self):
+        with self.app.app_context():
+            db.drop_all()
+
+    def test_facade_loads_relationships(self):
+        facade = AsyncHBnBFacade()
+
+        async def read():
+            return await facade.get_place(self.place_id), await facade.get_all_places(limit=1)
+
+        with self.app.app_context():
+            place, (page, next_cursor) = asyncio.run(read())
+
+        # Loaded eagerly: the session is already closed here
+        self.assertEqual(place.owner.id, self.owner_id)
+        self.assertEqual([a.name for a in place.amenities], ["Wifi"])
+        self.assertEqual([p.id for p in page], [self.place_id])
+        self.assertIsNone(next_cursor)
+
+    def test_read_endpoints_use_async_handlers(self):
+        response = self.client.get(f"/api/v1/places/{self.place_id}")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()["owner_name"], "Async Owner")
+        self.assertEqual(response.get_json()["amenities"][0]["name"], "Wifi")
+
+        response = self.client.get("/api/v1/places/?limit=10")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.get_json()["items"]), 1)
+
+        response = self.client.get(f"/api/v1/places/?sort=price&price_max=100&amenities={self.wifi_id}")
+        self.assertEqual([p["id"] for p in response.get_json()["items"]], [self.place_id])
+        self.assertEqual(response.get_json()["facets"]["amenities"][0]["count"], 1)
+
+        response = self.client.get("/api/v1/places/nearby?lat=10.01&lon=20&radius_km=5")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()[0]["distance_km"], 1.112)
+        self.assertEqual(response.get_json()[0]["owner_name"], "Async Owner")
+
+        response = self.client.get("/api/v1/places/within?bbox=19,9,21,11")
+        self.assertEqual([p["id"] for p in response.get_json()], [self.place_id])
+
+        response = self.client.get("/api/v1/places/search?q=async")
+        self.assertEqual(response.get_json()["items"][0]["snippet"], "<mark>Async</mark> place")
+
+        response = self.client.get("/api/v1/amenities/missing")
+        self.assertEqual(response.status_code, 404)
+
+        response = self.client.get(f"/api/v1/reviews/places/{self.place_id}/reviews")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,142 @@
+import unittest
+from sqlalchemy import insert, select
+from app import create_app
+from app.extensions import db
+from app.models.amenity import Amenity, amenity_bitmaps
+from app.models.bitmap import ARRAY_MAX, Bitmap
+from app.models.user import User
+from app.models.place import Place, place_amenity
+from app.persistence.bitmaps import rebuild_amenity_bitmaps
+from app.services.facade import HBnBFacade
+
+
+class TestBitmap(unittest.TestCase):
+
+    def test_set_operations(self):
+        evens = Bitmap(range(0, 3 * (1 << 16), 2))
+        small = Bitmap([1, 2, 3, 70000, 1 << 31])
+        self.assertEqual(len(evens), 3 * (1 << 15))
+        self.assertIn(70000, evens)
+        self.assertNotIn(70001, evens)
+        self.assertEqual(list(small & evens), [2, 70000])
+        self.assertEqual(small.intersection_count(evens), 2)
+        self.assertEqual(evens.intersection_count(Bitmap(range(0, 100))), 50)
+        self.assertEqual(list(small), sorted(small))
+        with self.assertRaises(ValueError):
+            Bitmap([-1])
+
+    def test_containers_switch_form(self):
+        bitmap = Bitmap(range(ARRAY_MAX))
+        bitmap.add(ARRAY_MAX)
+        self.assertEqual(len(bitmap), ARRAY_MAX + 1)
+        bitmap.discard(0)
+        bitmap.discard(0)
+        # Back to an array: equal to the bitmap built from the same values
+        self.assertEqual(bitmap, Bitmap(range(1, ARRAY_MAX + 1)))
+        for value in range(1, ARRAY_MAX + 1):
+            bitmap.discard(value)
+        self.assertEqual(bitmap, Bitmap())
+
+    def test_serialization(self):
+        for values in ([], [1], range(0, 200000, 3), range(10000)):
+            bitmap = Bitmap(values)
+            self.assertEqual(Bitmap.from_bytes(bitmap.to_bytes()), bitmap)
+        self.assertEqual(Bitmap([1]).to_bytes().hex(), "01000000010000000100")
+        for data in (b"", b"\x02", Bitmap([1]).to_bytes()[:4]):
+            with self.assertRaises(ValueError):
+                Bitmap.from_bytes(data)
+
+
+class TestAmenityBitmaps(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app("development")
+        self.app.config["TESTING"] = True
+
+        with self.app.app_context():
+            db.create_all()
+            owner = User(first_name="Bit", last_name="Owner", email="owner@bitmap.com", password="123456")
+            wifi, pool = Amenity(name="Wifi"), Amenity(name="Pool")
+            places = [
+                Place(title=f"Bitmap {i}", price=100, latitude=10, longitude=20, owner=owner)
+                for i in range(3)
+            ]
+            places[0].amenities.extend([wifi, pool])
+            pool.places.append(places[1])
+            db.session.add_all([owner] + places)
+            db.session.commit()
+
+            self.wifi_id, self.pool_id = wifi.id, pool.id
+            self.place_ids = [place.id for place in places]
+
+    def tearDown(self):
+        with self.app.app_context():
+            db.drop_all()
+
+    def stored(self):
+        """{amenity_id: [place_id]} read from the bitmaps"""
+        with self.app.app_context():
+            place_ids = dict(db.session.execute(select(Place.ordinal, Place.id)).all())
+            rows = db.session.execute(select(amenity_bitmaps.c.amenity_id, amenity_bitmaps.c.bitmap)).all()
+            return {amenity_id: sorted(place_ids[ordinal] for ordinal in Bitmap.from_bytes(data))
+                    for amenity_id, data in rows}
+
+    def test_ordinals_are_dense(self):
+        with self.app.app_context():
+            ordinals = db.session.scalars(select(Place.ordinal).order_by(Place.ordinal)).all()
+        self.assertEqual(ordinals, [1, 2, 3])
+
+    def test_links_maintain_bitmaps(self):
+        first, second, third = self.place_ids
+        self.assertEqual(self.stored(), {self.wifi_id: [first], self.pool_id: sorted([first, second])})
+
+        with self.app.app_context():
+            wifi = db.session.get(Amenity, self.wifi_id)
+            wifi.places.append(db.session.get(Place, third))
+            db.session.get(Place, first).amenities.remove(wifi)
+            db.session.commit()
+        self.assertEqual(self.stored()[self.wifi_id], [third])
+
+        with self.app.app_context():
+            db.session.delete(db.session.get(Place, second))
+            db.session.commit()
+        self.assertEqual(self.stored()[self.pool_id], [first])
+
+        with self.app.app_context():
+            db.session.delete(db.session.get(Amenity, self.pool_id))
+            db.session.commit()
+        self.assertEqual(self.stored(), {self.wifi_id: [third]})
+
+    def test_delete_in_the_session_that_created_the_place(self):
+        with self.app.app_context():
+            wifi = db.session.get(Amenity, self.wifi_id)
+            place = Place(title="Short-lived", price=100, latitude=10, longitude=20,
+                          owner_id=db.session.get(Place, self.place_ids[0]).owner_id)
+            place.amenities.append(wifi)
+            db.session.add(place)
+            db.session.commit()
+            # The ordinal the trigger set, not the NULL of the INSERT
+            self.assertEqual(place.ordinal, 4)
+            self.assertEqual(len(self.stored()[self.wifi_id]), 2)
+
+            HBnBFacade().delete_place(place.id)
+            self.assertEqual(rebuild_amenity_bitmaps(db.session), 0)
+        self.assertEqual(self.stored()[self.wifi_id], [self.place_ids[0]])
+
+    def test_rebuild_repairs_bitmaps(self):
+        with self.app.app_context():
+            # Written behind the ORM's back
+            db.session.execute(insert(place_amenity).values(place_id=self.place_ids[2], amenity_id=self.wifi_id))
+            db.session.execute(amenity_bitmaps.delete().where(amenity_bitmaps.c.amenity_id == self.pool_id))
+            db.session.commit()
+
+            self.assertEqual(rebuild_amenity_bitmaps(db.session), 2)
+            self.assertEqual(rebuild_amenity_bitmaps(db.session), 0)
+        self.assertEqual(self.stored(), {
+            self.wifi_id: sorted([self.place_ids[0], self.place_ids[2]]),
+            self.pool_id: sorted(self.place_ids[:2]),
+        })
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,129 @@
+import unittest
+from app import create_app
+from app.extensions import db
+from app.models.user import User
+from app.models.place import Place
+from app.models.amenity import Amenity
+from app.services.cache import response_cache
+from app.services.facade import HBnBFacade
+from config import DevelopmentConfig
+from tests.query_count import QueryCountMixin
+
+
+class CacheConfig(DevelopmentConfig):
+    RESPONSE_CACHE = "memory"
+
+
+class TestConditionalGet(QueryCountMixin, unittest.TestCase):
+
+    config = "development"
+
+    def setUp(self):
+        self.app = create_app(self.config)
+        self.app.config["TESTING"] = True
+        self.client = self.app.test_client()
+        self.facade = HBnBFacade()
+
+        with self.app.app_context():
+            db.create_all()
+            owner = User(first_name="Etag", last_name="Owner", email="owner@etag.com", password="123456")
+            reviewer = User(first_name="Etag", last_name="Reviewer", email="reviewer@etag.com", password="123456")
+            wifi, pool = Amenity(name="Wifi"), Amenity(name="Pool")
+            place = Place(title="Validated", price=100, latitude=10, longitude=20, owner=owner)
+            place.amenities.append(wifi)
+            db.session.add_all([owner, reviewer, place, pool])
+            db.session.commit()
+            self.place_id, self.wifi_id, self.pool_id, self.reviewer_id = place.id, wifi.id, pool.id, reviewer.id
+            self.engine = db.engine
+
+        self.place_url = f"/api/v1/places/{self.place_id}"
+
+    def tearDown(self):
+        with self.app.app_context():
+            db.drop_all()
+
+    def etag(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, url)
+        self.assertTrue(response.headers["Cache-Control"].startswith("no-cache"))
+        self.assertIsNotNone(response.last_modified)
+        return response.headers["ETag"]
+
+    def test_not_modified(self):
+        etag = self.etag(self.place_url)
+        # One aggregate query, nothing loaded or serialized
+        with self.assertMaxQueries(self.engine, 1):
+            response = self.client.get(self.place_url, headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.data, b"")
+        self.assertEqual(response.headers["ETag"], etag)
+
+        last_modified = self.client.get(self.place_url).headers["Last-Modified"]
+        response = self.client.get(self.place_url, headers={"If-Modified-Since": last_modified})
+        self.assertEqual(response.status_code, 304)
+        response = self.client.get(self.place_url, headers={"If-None-Match": '"other"',
+                                                            "If-Modified-Since": last_modified})
+        self.assertEqual(response.status_code, 200)
+
+        # Missing resources have no validators
+        response = self.client.get("/api/v1/places/missing")
+        self.assertEqual(response.status_code, 404)
+        self.assertNotIn("ETag", response.headers)
+
+    def test_changes_change_the_etag(self):
+        urls = [self.place_url, "/api/v1/places/", "/api/v1/places/?sort=price",
+                f"/api/v1/reviews/places/{self.place_id}/reviews", "/api/v1/amenities/",
+                f"/api/v1/amenities/{self.wifi_id}"]
+        etags = {url: self.etag(url) for url in urls}
+        self.assertEqual(len(set(etags.values())), len(urls))
+
+        def changed(*expected):
+            nonlocal etags
+            current = {url: self.etag(url) for url in urls}
+            self.assertEqual({url for url in urls if current[url] != etags[url]}, set(expected))
+            etags = current
+
+        with self.app.app_context():
+            self.facade.create_review({"text": "Validated", "rating": 5,
+                                       "user_id": self.reviewer_id, "place_id": self.place_id})
+        # The rating of the place changed too
+        changed(*urls[:4])
+
+        with self.app.app_context():
+            place = db.session.get(Place, self.place_id)
+            place.amenities.append(db.session.get(Amenity, self.pool_id))
+            db.session.commit()
+            # Not a facade write, the response cache does not see it
+            if response_cache() is not None:
+                response_cache().bump(("place",))
+        changed(*urls[:3])
+
+        with self.app.app_context():
+            self.facade.update_amenity(self.wifi_id, {"name": "Fast wifi"})
+        changed(*urls[:3], *urls[4:])
+
+        with self.app.app_context():
+            self.facade.delete_place(self.place_id)
+        self.assertEqual(self.client.get(self.place_url).status_code, 404)
+        self.assertNotEqual(self.etag("/api/v1/places/"), etags["/api/v1/places/"])
+
+
+class TestConditionalCachedGet(TestConditionalGet):
+    """The same behavior with responses served from the cache"""
+
+    config = CacheConfig
+
+    def test_hits_revalidate_without_queries(self):
+        etag = self.etag(self.place_url)
+        with self.assertMaxQueries(self.engine, 0):
+            response = self.client.get(self.place_url, headers={"If-None-Match": etag})
+            self.assertEqual(response.status_code, 304)
+            self.assertEqual(response.headers["X-Cache"], "HIT")
+            response = self.client.get(self.place_url)
+            self.assertEqual(response.headers["ETag"], etag)
+            self.assertEqual(response.headers["Last-Modified"],
+                             self.client.get(self.place_url).headers["Last-Modified"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+import unittest
+from flask_jwt_extended import create_access_token
+from app import create_app
+from app.extensions import db
+from app.models.user import User
+from app.models.place import Place
+from app.models.review import DuplicateReviewError
+from app.services.facade import HBnBFacade
+from tests.query_count import QueryCountMixin
+
+
+class TestDuplicateReviews(QueryCountMixin, unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app("development")
+        self.app.config["TESTING"] = True
+        self.client = self.app.test_client()
+
+        with self.app.app_context():
+            db.create_all()
+            owner = User(first_name="Dup", last_name="Owner", email="owner@dup.com", password="123456")
+            reviewer = User(first_name="Dup", last_name="Reviewer", email="reviewer@dup.com", password="123456")
+            db.session.add_all([owner, reviewer])
+            db.session.commit()
+            places = [Place(title=f"Dup {i}", price=100, latitude=10, longitude=20, owner_id=owner.id)
+                      for i in range(2)]
+            db.session.add_all(places)
+            db.session.commit()
+
+            self.place_ids = [place.id for place in places]
+            self.reviewer_id = reviewer.id
+            self.headers = {"Authorization": f"Bearer {create_access_token(identity=reviewer.id)}"}
+            self.engine = db.engine
+
+    def tearDown(self):
+        with self.app.app_context():
+            db.drop_all()
+
+    def post_review(self, place_index=0):
+        return self.client.post(
+            "/api/v1/reviews/",
+            json={"text": "Again", "rating": 3, "place_id": self.place_ids[place_index]},
+            headers=self.headers,
+        )
+
+    def test_second_review_is_refused(self):
+        self.assertEqual(self.post_review().status_code, 201)
+        # user, place, one existence probe: no scan of the place's reviews
+        with self.assertMaxQueries(self.engine, 3):
+            response = self.post_review()
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(response.get_json()["error"], "You have already reviewed this place")
+
+    def test_unique_index_catches_concurrent_duplicates(self):
+        facade = HBnBFacade()
+        data = {"text": "Race", "rating": 5, "user_id": self.reviewer_id, "place_id": self.place_ids[0]}
+        with self.app.app_context():
+            facade.create_review(dict(data))
+        with self.app.app_context():
+            # As if the existence check of both requests had passed
+            with self.assertRaises(DuplicateReviewError):
+                facade.create_review(dict(data))
+            place = facade.get_place(self.place_ids[0])
+            self.assertEqual((place.review_count, place.rating_sum), (1, 5))
+
+    def test_moving_review_onto_reviewed_place(self):
+        first = self.post_review(0).get_json()["id"]
+        self.assertEqual(self.post_review(1).status_code, 201)
+
+        response = self.client.put(
+            f"/api/v1/reviews/{first}",
+            json={"text": "Moved", "rating": 3, "place_id": self.place_ids[1]},
+            headers=self.headers,
+        )
+        self.assertEqual(response.status_code, 403)
+
+
+if __name__ == "__main__":
+    unittest.main()
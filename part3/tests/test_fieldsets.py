@@ -0,0 +1,122 @@
+import unittest
+from app import create_app
+from app.extensions import db
+from app.models.user import User
+from app.models.place import Place
+from app.models.review import Review
+from app.models.amenity import Amenity
+from app.services.facade import HBnBFacade
+from config import DevelopmentConfig
+from tests.query_count import QueryCountMixin
+
+
+class AsyncReadsConfig(DevelopmentConfig):
+    ASYNC_READS = True
+
+
+class TestFieldsets(QueryCountMixin, unittest.TestCase):
+
+    config = "development"
+
+    def setUp(self):
+        self.app = create_app(self.config)
+        self.app.config["TESTING"] = True
+        self.client = self.app.test_client()
+
+        with self.app.app_context():
+            db.create_all()
+            owner = User(first_name="Sparse", last_name="Owner", email="owner@sparse.com", password="123456")
+            reviewers = [User(first_name="Sparse", last_name=f"Reviewer {i}", email=f"reviewer{i}@sparse.com",
+                              password="123456") for i in range(2)]
+            wifi = Amenity(name="Wifi")
+            places = [Place(title=f"Place {i}", description="A long description", price=100 + i,
+                            latitude=10, longitude=20, owner=owner) for i in range(3)]
+            places[0].amenities.append(wifi)
+            db.session.add_all(reviewers + places)
+            db.session.commit()
+            reviews = [Review(text=f"Review {i}", rating=4, user_id=reviewer.id, place_id=places[0].id)
+                       for i, reviewer in enumerate(reviewers)]
+            db.session.add_all(reviews)
+            db.session.commit()
+            self.place_id, self.owner_id, self.review_id = places[0].id, owner.id, reviews[0].id
+            self.engine = db.engine
+
+    def tearDown(self):
+        with self.app.app_context():
+            db.drop_all()
+
+    def get(self, url, status=200):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status, response.get_data(as_text=True))
+        return response.get_json()
+
+    def test_sparse_fields(self):
+        # The version, the page, the price facet and the amenity bitmaps
+        with self.assertMaxQueries(self.engine, 4) as statements:
+            page = self.get("/api/v1/places/?limit=2&sort=price&fields=title,price")
+        self.assertEqual(page["items"], [{"id": page["items"][0]["id"], "title": "Place 0", "price": 100.0},
+                                         {"id": page["items"][1]["id"], "title": "Place 1", "price": 101.0}])
+        # Columns the payload does not show are not fetched
+        self.assertNotIn("places.description", statements[1])
+
+        # Pages go on with the cursor
+        page = self.get(f"/api/v1/places/?limit=2&sort=price&fields=title&cursor={page['next_cursor']}")
+        self.assertEqual([p["title"] for p in page["items"]], ["Place 2"])
+
+        places = self.get("/api/v1/places/?fields=owner_name,amenities")
+        self.assertEqual(set(places[0]), {"id", "owner_name", "amenities"})
+        self.assertEqual(places[0]["owner_name"], "Sparse Owner")
+
+        review = self.get(f"/api/v1/reviews/{self.review_id}?fields=rating")
+        self.assertEqual(review, {"id": self.review_id, "rating": 4})
+
+        self.get("/api/v1/places/?fields=title,secret", 400)
+        self.get(f"/api/v1/places/{self.place_id}?include=bookings", 400)
+
+    def test_includes(self):
+        # The version, the place, then one batched query per relationship
+        with self.assertMaxQueries(self.engine, 2 + 5):
+            place = self.get(f"/api/v1/places/{self.place_id}?include=reviews,owner,amenities")
+        self.assertEqual(place["owner"], {"id": self.owner_id, "first_name": "Sparse", "last_name": "Owner"})
+        self.assertEqual(place["amenities"][0]["name"], "Wifi")
+        self.assertEqual(sorted((r["text"], r["user_name"]) for r in place["reviews"]),
+                         [("Review 0", "Sparse Reviewer 0"), ("Review 1", "Sparse Reviewer 1")])
+        # Fields and includes combine
+        place = self.get(f"/api/v1/places/{self.place_id}?fields=title&include=owner")
+        self.assertEqual(set(place), {"id", "title", "owner"})
+
+        reviews = self.get(f"/api/v1/reviews/places/{self.place_id}/reviews?fields=text&include=user,place")
+        self.assertEqual({r["place"]["title"] for r in reviews}, {"Place 0"})
+        self.assertEqual(set(reviews[0]["user"]), {"id", "first_name", "last_name"})
+
+        places = self.get("/api/v1/places/?fields=title&include=reviews")
+        self.assertEqual({p["title"]: len(p["reviews"]) for p in places},
+                         {"Place 0": 2, "Place 1": 0, "Place 2": 0})
+
+    def test_included_data_changes_the_etag(self):
+        urls = [f"/api/v1/places/{self.place_id}?include=reviews", "/api/v1/places/?include=reviews",
+                f"/api/v1/reviews/{self.review_id}?include=place"]
+        etags = [self.client.get(url).headers["ETag"] for url in urls]
+
+        with self.app.app_context():
+            HBnBFacade().update_review(self.review_id, {"text": "Edited"})
+        place = self.client.get(urls[0])
+        self.assertNotEqual(place.headers["ETag"], etags[0])
+        self.assertIn("Edited", [r["text"] for r in place.get_json()["reviews"]])
+        self.assertNotEqual(self.client.get(urls[1]).headers["ETag"], etags[1])
+
+        with self.app.app_context():
+            HBnBFacade().update_place(self.place_id, {"title": "Renamed"})
+        review = self.client.get(urls[2])
+        self.assertNotEqual(review.headers["ETag"], etags[2])
+        self.assertEqual(review.get_json()["place"]["title"], "Renamed")
+
+
+class TestAsyncFieldsets(TestFieldsets):
+    """The sync handlers serve the fieldsets when the async ones serve reads"""
+
+    config = AsyncReadsConfig
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+import random
+import unittest
+from app import create_app
+from app.extensions import db
+from app.models.user import User
+from app.models.place import Place
+from app.models.geo import encode_geohash, haversine_km
+from app.services.facade import HBnBFacade
+from tests.query_count import QueryCountMixin
+
+
+class TestGeoSearch(QueryCountMixin, unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app("development")
+        self.app.config["TESTING"] = True
+        self.client = self.app.test_client()
+
+        rng = random.Random(17)
+        # Clusters around Paris and across the antimeridian (Fiji), plus noise
+        self.points = (
+            [(48.85 + rng.uniform(-0.3, 0.3), 2.35 + rng.uniform(-0.4, 0.4)) for _ in range(150)]
+            + [(-17.7 + rng.uniform(-1, 1), rng.choice((178.5, -179.5)) + rng.uniform(-1, 1)) for _ in range(50)]
+            + [(rng.uniform(-80, 80), rng.uniform(-180, 180)) for _ in range(100)]
+        )
+        with self.app.app_context():
+            db.create_all()
+            owner = User(first_name="Geo", last_name="Owner", email="owner@geo.com", password="123456")
+            db.session.add(owner)
+            db.session.commit()
+            places = [
+                Place(title=f"Place {i}", price=100, latitude=lat, longitude=(lon + 180) % 360 - 180,
+                      owner_id=owner.id)
+                for i, (lat, lon) in enumerate(self.points)
+            ]
+            db.session.add_all(places)
+            db.session.commit()
+            self.places = {p.id: (p.latitude, p.longitude) for p in places}
+            self.engine = db.engine
+
+    def tearDown(self):
+        with self.app.app_context():
+            db.drop_all()
+
+    def test_geohash_follows_the_location(self):
+        self.assertEqual(encode_geohash(57.64911, 10.40744, 11), "u4pruydqqvj")
+        with self.app.app_context():
+            place_id = next(iter(self.places))
+            HBnBFacade().update_place(place_id, {"latitude": 57.64911, "longitude": 10.40744})
+            self.assertEqual(db.session.get(Place, place_id).geohash, "u4pruydqq")
+
+    def test_nearby_matches_brute_force(self):
+        for lat, lon, radius in ((48.85, 2.35, 10), (-17.7, 179.9, 150), (0, 0, 1000)):
+            expected = sorted(
+                (haversine_km(lat, lon, *point), place_id) for place_id, point in self.places.items()
+            )
+            expected = [place_id for distance, place_id in expected if distance <= radius][:100]
+
+            response = self.client.get(f"/api/v1/places/nearby?lat={lat}&lon={lon}&radius_km={radius}&limit=100")
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual([p["id"] for p in response.get_json()], expected)
+            distances = [p["distance_km"] for p in response.get_json()]
+            self.assertEqual(distances, sorted(distances))
+
+    def test_within_matches_brute_force(self):
+        for west, south, east, north in ((2.2, 48.7, 2.5, 49.0), (178, -19, -178, -16), (-180, -90, 180, 90)):
+            def inside(lat, lon):
+                in_lon = west <= lon <= east if west <= east else lon >= west or lon <= east
+                return south <= lat <= north and in_lon
+            expected = {place_id for place_id, point in self.places.items() if inside(*point)}
+
+            with self.assertMaxQueries(self.engine, 3):
+                response = self.client.get(f"/api/v1/places/within?bbox={west},{south},{east},{north}&limit=100")
+            self.assertEqual(response.status_code, 200)
+            found = {p["id"] for p in response.get_json()}
+            if len(expected) <= 100:
+                self.assertEqual(found, expected)
+            else:
+                self.assertEqual(len(found), 100)
+                self.assertLessEqual(found, expected)
+
+    def test_invalid_parameters(self):
+        for query in ("nearby?lat=91&lon=0&radius_km=5", "nearby?lat=0&lon=0&radius_km=0",
+                      "nearby?lat=0&lon=0", "within?bbox=1,2,3", "within?bbox=0,10,1,5"):
+            response = self.client.get(f"/api/v1/places/{query}")
+            self.assertEqual(response.status_code, 400, query)
+            self.assertIn("error", response.get_json())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+import unittest
+from flask_jwt_extended import create_access_token
+from app import create_app
+from app.extensions import db
+from app.models.user import User
+from app.models.place import Place
+from app.services.facade import HBnBFacade
+from tests.query_count import QueryCountMixin
+
+
+class TestIdentityMap(QueryCountMixin, unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app("development")
+        self.app.config["TESTING"] = True
+        self.client = self.app.test_client()
+
+        with self.app.app_context():
+            db.create_all()
+            owner = User(first_name="Map", last_name="Owner", email="owner@map.com", password="123456")
+            reviewer = User(first_name="Map", last_name="Reviewer", email="reviewer@map.com", password="123456")
+            db.session.add_all([owner, reviewer])
+            db.session.commit()
+            place = Place(title="Mapped", price=100, latitude=10, longitude=20, owner_id=owner.id)
+            db.session.add(place)
+            db.session.commit()
+
+            self.place_id = place.id
+            self.owner_token = create_access_token(identity=owner.id)
+            self.reviewer_token = create_access_token(identity=reviewer.id)
+            self.engine = db.engine
+
+    def tearDown(self):
+        with self.app.app_context():
+            db.drop_all()
+
+    def test_repeated_get_hits_memory(self):
+        facade = HBnBFacade()
+        with self.app.app_context():
+            place = facade.get_place(self.place_id)
+            with self.assertMaxQueries(self.engine, 0):
+                self.assertIs(facade.get_place(self.place_id), place)
+
+    def test_commit_keeps_loaded_objects(self):
+        with self.assertMaxQueries(self.engine, 6) as statements:
+            response = self.client.post(
+                "/api/v1/reviews/",
+                json={"text": "Great", "rating": 5, "place_id": self.place_id},
+                headers={"Authorization": f"Bearer {self.reviewer_token}"},
+            )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.get_json()["user_name"], "Map Reviewer")
+        # No reload of the new review nor of its user after the commit
+        inserts = [i for i, s in enumerate(statements) if s.startswith("INSERT")]
+        self.assertEqual(statements[inserts[-1] + 1:], [])
+
+        with self.assertMaxQueries(self.engine, 5):
+            response = self.client.put(
+                f"/api/v1/places/{self.place_id}",
+                json={"title": "Renamed"},
+                headers={"Authorization": f"Bearer {self.owner_token}"},
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()["title"], "Renamed")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,120 @@
+import unittest
+from app import create_app
+from app.extensions import db
+from app.models.user import User
+from app.models.place import Place
+from app.models.amenity import Amenity
+from app.services.facade import HBnBFacade
+from tests.query_count import QueryCountMixin
+
+
+class TestPlaceListing(QueryCountMixin, unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app("development")
+        self.app.config["TESTING"] = True
+        self.client = self.app.test_client()
+        self.facade = HBnBFacade()
+
+        with self.app.app_context():
+            db.create_all()
+            owner = User(first_name="List", last_name="Owner", email="owner@list.com", password="123456")
+            reviewers = [
+                User(first_name="List", last_name=str(i), email=f"reviewer{i}@list.com", password="123456")
+                for i in range(2)
+            ]
+            wifi, pool = Amenity(name="Wifi"), Amenity(name="Pool")
+            db.session.add_all([owner, wifi, pool] + reviewers)
+            db.session.commit()
+
+            places = [
+                Place(title=title, price=price, latitude=10, longitude=20, owner_id=owner.id)
+                for title, price in (("Hostel", 30), ("Cabin", 80), ("Loft", 150), ("Villa", 600))
+            ]
+            places[0].amenities.append(wifi)
+            places[1].amenities.extend([wifi, pool])
+            places[3].amenities.extend([wifi, pool])
+            db.session.add_all(places)
+            db.session.commit()
+
+            # Average ratings: Hostel 2, Cabin 4.5, Loft none, Villa 4
+            for place, ratings in zip(places, ((2,), (5, 4), (), (4,))):
+                for reviewer, rating in zip(reviewers, ratings):
+                    self.facade.create_review({"text": "Listed", "rating": rating,
+                                               "user_id": reviewer.id, "place_id": place.id})
+
+            self.wifi_id, self.pool_id = wifi.id, pool.id
+            self.engine = db.engine
+
+    def tearDown(self):
+        with self.app.app_context():
+            db.drop_all()
+
+    def listing(self, **params):
+        response = self.client.get("/api/v1/places/", query_string=params)
+        self.assertEqual(response.status_code, 200)
+        return response.get_json()
+
+    def titles(self, **params):
+        return [place["title"] for place in self.listing(**params)["items"]]
+
+    def test_filters_and_sorts(self):
+        self.assertEqual(self.titles(sort="price"), ["Hostel", "Cabin", "Loft", "Villa"])
+        self.assertEqual(self.titles(sort="rating"), ["Cabin", "Villa", "Hostel", "Loft"])
+        self.assertEqual(self.titles(sort="recent", price_min=50, price_max=150), ["Loft", "Cabin"])
+        self.assertEqual(self.titles(sort="price", amenities=f"{self.wifi_id},{self.pool_id}"),
+                         ["Cabin", "Villa"])
+        self.assertEqual(self.titles(sort="price", min_rating=4), ["Cabin", "Villa"])
+
+    def test_facets(self):
+        result = self.listing(price_max=100, amenities=self.wifi_id)
+        self.assertEqual(result["facets"]["price"], [
+            {"min": 0, "max": 10, "count": 0},
+            {"min": 10, "max": 50, "count": 1},
+            {"min": 50, "max": 100, "count": 1},
+            {"min": 100, "max": 200, "count": 0},
+            {"min": 200, "max": 500, "count": 0},
+            {"min": 500, "max": None, "count": 1},
+        ])
+        self.assertEqual(result["facets"]["amenities"], [
+            {"id": self.wifi_id, "name": "Wifi", "count": 2},
+            {"id": self.pool_id, "name": "Pool", "count": 1},
+        ])
+
+    def test_pagination(self):
+        seen, cursor = [], None
+        while True:
+            params = {"sort": "rating", "limit": 1, **({"cursor": cursor} if cursor else {})}
+            # The version of the ETag, the page, its owners and amenities;
+            # with the first page, the price facet and the amenity bitmaps
+            with self.assertMaxQueries(self.engine, 6 if cursor is None else 4):
+                page = self.listing(**params)
+            self.assertEqual(page["facets"] is None, cursor is not None)
+            seen += [place["title"] for place in page["items"]]
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+        self.assertEqual(seen, ["Cabin", "Villa", "Hostel", "Loft"])
+
+    def test_rating_changes_move_places(self):
+        with self.app.app_context():
+            reviewer = User(first_name="Late", last_name="Reviewer", email="late@list.com", password="123456")
+            db.session.add(reviewer)
+            db.session.commit()
+            loft = Place.query.filter_by(title="Loft").one()
+            self.facade.create_review({"text": "Best", "rating": 5, "user_id": reviewer.id, "place_id": loft.id})
+        self.assertEqual(self.titles(sort="rating")[0], "Loft")
+
+    def test_invalid_parameters(self):
+        price_cursor = self.listing(sort="price", limit=1)["next_cursor"]
+        for params in ({"sort": "cheap"}, {"price_min": "free"}, {"price_min": 10, "price_max": 5},
+                       {"min_rating": 6}, {"sort": "rating", "cursor": price_cursor}):
+            response = self.client.get("/api/v1/places/", query_string=params)
+            self.assertEqual(response.status_code, 400, params)
+
+        # Without filters, the unpaginated list is unchanged
+        self.assertEqual(len(self.client.get("/api/v1/places/").get_json()), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
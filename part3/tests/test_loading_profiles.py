@@ -0,0 +1,83 @@
+import unittest
+from app import create_app
+from app.extensions import db
+from app.models.user import User
+from app.models.place import Place
+from app.models.review import Review
+from app.models.amenity import Amenity
+from app.services.facade import HBnBFacade
+from tests.query_count import QueryCountMixin
+
+
+class TestLoadingProfiles(QueryCountMixin, unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app("development")
+        self.app.config["TESTING"] = True
+        self.client = self.app.test_client()
+
+        with self.app.app_context():
+            db.create_all()
+            users = [
+                User(first_name="Owner", last_name=str(i), email=f"owner{i}@profiles.com", password="123456")
+                for i in range(4)
+            ]
+            amenities = [Amenity(name="Wifi"), Amenity(name="Pool")]
+            db.session.add_all(users + amenities)
+            db.session.commit()
+
+            places = []
+            for i in range(8):
+                place = Place(title=f"Place {i}", price=100, latitude=10, longitude=20,
+                              owner_id=users[i % 4].id)
+                place.amenities.append(amenities[i % 2])
+                places.append(place)
+            db.session.add_all(places)
+            db.session.commit()
+
+            db.session.add_all([
+                Review(text="Nice", rating=4, user_id=user.id, place_id=places[0].id) for user in users[1:]
+            ])
+            db.session.commit()
+
+            self.place_id = places[0].id
+            self.engine = db.engine
+
+    def tearDown(self):
+        with self.app.app_context():
+            db.drop_all()
+
+    def test_list_endpoints_do_not_query_per_item(self):
+        # version of the ETag + list + owners + amenities, whatever the number of places
+        with self.assertMaxQueries(self.engine, 4):
+            response = self.client.get("/api/v1/places/")
+        self.assertEqual(len(response.get_json()), 8)
+        self.assertEqual(response.get_json()[0]["owner_name"], "Owner 0")
+        self.assertEqual(response.get_json()[1]["amenities"][0]["name"], "Pool")
+
+        with self.assertMaxQueries(self.engine, 4):
+            response = self.client.get("/api/v1/places/?limit=5")
+        self.assertEqual(len(response.get_json()["items"]), 5)
+
+        with self.assertMaxQueries(self.engine, 2):
+            response = self.client.get("/api/v1/reviews/")
+        self.assertEqual({r["user_name"] for r in response.get_json()}, {"Owner 1", "Owner 2", "Owner 3"})
+
+        with self.assertMaxQueries(self.engine, 4):
+            response = self.client.get(f"/api/v1/reviews/places/{self.place_id}/reviews")
+        self.assertEqual(len(response.get_json()), 3)
+
+    def test_detail_endpoint(self):
+        with self.assertMaxQueries(self.engine, 3):
+            response = self.client.get(f"/api/v1/places/{self.place_id}")
+        self.assertEqual(response.get_json()["owner_name"], "Owner 0")
+        self.assertEqual([a["name"] for a in response.get_json()["amenities"]], ["Wifi"])
+
+    def test_unknown_profile(self):
+        with self.app.app_context():
+            with self.assertRaises(ValueError):
+                HBnBFacade().get_all_places(profile="missing")
+
+
+if __name__ == "__main__":
+    unittest.main()
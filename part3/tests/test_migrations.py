@@ -0,0 +1,129 @@
+import os
+import tempfile
+import unittest
+from sqlalchemy import create_engine, inspect
+from app import create_app
+from app.extensions import db
+from app.models.bitmap import Bitmap
+from app.persistence.migrations import available_migrations, current_version, migrate
+from app.persistence.query_plans import explain, full_scans, hot_queries
+
+
+class TestMigrations(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.engine = create_engine(f"sqlite:///{os.path.join(self.directory, 'migrations.db')}")
+
+    def tearDown(self):
+        self.engine.dispose()
+
+    def test_migrate_applies_each_migration_once(self):
+        latest = available_migrations()[-1][0]
+
+        applied = migrate(self.engine)
+        self.assertEqual([version for version, _ in applied], [v for v, _, _ in available_migrations()])
+        self.assertEqual(current_version(self.engine), latest)
+        self.assertEqual(migrate(self.engine), [])
+
+    def test_migrations_match_models(self):
+        migrate(self.engine)
+
+        app = create_app("development")
+        with app.app_context():
+            for table in db.metadata.sorted_tables:
+                columns = {column["name"] for column in inspect(self.engine).get_columns(table.name)}
+                self.assertEqual({column.name for column in table.columns}, columns, table.name)
+                indexes = {index["name"] for index in inspect(self.engine).get_indexes(table.name)}
+                self.assertLessEqual({index.name for index in table.indexes}, indexes, table.name)
+
+    def test_unique_review_migration_drops_duplicates(self):
+        migrate(self.engine, target=3)
+        with self.engine.begin() as connection:
+            connection.exec_driver_sql(
+                "INSERT INTO reviews (id, text, rating, user_id, place_id, created_at) VALUES "
+                "('r1', 'First', 5, 'u1', 'p1', '2024-01-01'), ('r2', 'Again', 1, 'u1', 'p1', '2024-01-02')"
+            )
+
+        migrate(self.engine)
+        with self.engine.connect() as connection:
+            ids = [row[0] for row in connection.exec_driver_sql("SELECT id FROM reviews")]
+        self.assertEqual(ids, ["r1"])
+
+    def test_geohash_migration_fills_existing_places(self):
+        migrate(self.engine, target=4)
+        with self.engine.begin() as connection:
+            connection.exec_driver_sql(
+                "INSERT INTO places (id, title, price, latitude, longitude, owner_id) "
+                "VALUES ('p1', 'Aalborg', 100, 57.64911, 10.40744, 'u1')"
+            )
+
+        migrate(self.engine)
+        with self.engine.connect() as connection:
+            geohash = connection.exec_driver_sql("SELECT geohash FROM places").scalar()
+        self.assertEqual(geohash, "u4pruydqq")
+
+    def test_search_migration_indexes_existing_rows(self):
+        migrate(self.engine, target=5)
+        with self.engine.begin() as connection:
+            connection.exec_driver_sql(
+                "INSERT INTO places (id, title, price, latitude, longitude, owner_id) "
+                "VALUES ('p1', 'Old barn', 100, 10, 20, 'u1')"
+            )
+            connection.exec_driver_sql(
+                "INSERT INTO reviews (id, text, rating, user_id, place_id) VALUES ('r1', 'Cosy barn', 5, 'u2', 'p1')"
+            )
+
+        migrate(self.engine)
+        search = "SELECT place_id FROM place_search WHERE place_search MATCH 'barn'"
+        objects = "SELECT type, name FROM sqlite_master WHERE name LIKE 'place\\_search%' ESCAPE '\\'"
+        with self.engine.begin() as connection:
+            self.assertEqual([row[0] for row in connection.exec_driver_sql(search)], ["p1", "p1"])
+            connection.exec_driver_sql("DELETE FROM reviews WHERE id = 'r1'")
+            self.assertEqual([row[0] for row in connection.exec_driver_sql(search)], ["p1"])
+            migrated = set(connection.exec_driver_sql(objects))
+
+        # db.create_all() creates the same search tables and triggers
+        app = create_app("development")
+        with app.app_context():
+            db.create_all()
+            with db.engine.connect() as connection:
+                created = set(connection.exec_driver_sql(objects))
+            db.drop_all()
+        self.assertEqual(migrated, created)
+
+    def test_bitmap_migration_indexes_existing_links(self):
+        migrate(self.engine, target=7)
+        with self.engine.begin() as connection:
+            for place_id in ("p1", "p2"):
+                connection.exec_driver_sql(
+                    "INSERT INTO places (id, title, price, latitude, longitude, owner_id) "
+                    f"VALUES ('{place_id}', 'Old barn', 100, 10, 20, 'u1')"
+                )
+            connection.exec_driver_sql("INSERT INTO amenities (id, name) VALUES ('a1', 'Wifi')")
+            connection.exec_driver_sql("INSERT INTO place_amenity (place_id, amenity_id) VALUES ('p2', 'a1')")
+
+        migrate(self.engine)
+        with self.engine.begin() as connection:
+            connection.exec_driver_sql(
+                "INSERT INTO places (id, title, price, latitude, longitude, owner_id) "
+                "VALUES ('p3', 'New barn', 100, 10, 20, 'u1')"
+            )
+            ordinals = connection.exec_driver_sql("SELECT id, ordinal FROM places ORDER BY id").all()
+            bitmap = connection.exec_driver_sql("SELECT bitmap FROM amenity_bitmaps WHERE amenity_id = 'a1'").scalar()
+        self.assertEqual(ordinals, [("p1", 1), ("p2", 2), ("p3", 3)])
+        self.assertEqual(list(Bitmap.from_bytes(bitmap)), [2])
+
+    def test_hot_queries_use_indexes(self):
+        migrate(self.engine, target=1)
+        with self.engine.connect() as connection:
+            plan = explain(connection, hot_queries()["get_reviews_by_place"])
+            self.assertTrue(any(detail.startswith("SCAN reviews") for detail in plan), plan)
+
+        migrate(self.engine)
+        with self.engine.connect() as connection:
+            self.assertEqual(full_scans(connection), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
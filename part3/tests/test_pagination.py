@@ -0,0 +1,73 @@
+import unittest
+from app import create_app
+from app.extensions import db
+from app.models.user import User
+from app.models.place import Place
+
+
+class TestPagination(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app("development")
+        self.app.config["TESTING"] = True
+        self.client = self.app.test_client()
+
+        with self.app.app_context():
+            db.create_all()
+
+            owner = User(
+                first_name="Page",
+                last_name="Owner",
+                email="pages@test.com",
+                password="123456"
+            )
+            db.session.add(owner)
+            db.session.commit()
+
+            for i in range(5):
+                db.session.add(Place(
+                    title=f"Place {i}",
+                    price=100,
+                    latitude=10,
+                    longitude=20,
+                    owner_id=owner.id
+                ))
+            db.session.commit()
+
+    def tearDown(self):
+        with self.app.app_context():
+            db.drop_all()
+
+    def test_list_without_limit_returns_plain_list(self):
+        response = self.client.get("/api/v1/places/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.get_json()), 5)
+
+    def test_walk_all_pages(self):
+        seen = []
+        cursor = None
+        while True:
+            params = {"limit": 2}
+            if cursor:
+                params["cursor"] = cursor
+            response = self.client.get("/api/v1/places/", query_string=params)
+            self.assertEqual(response.status_code, 200)
+
+            data = response.get_json()
+            self.assertLessEqual(len(data["items"]), 2)
+            seen.extend(p["id"] for p in data["items"])
+            cursor = data["next_cursor"]
+            if not cursor:
+                break
+
+        self.assertEqual(len(seen), 5)
+        self.assertEqual(len(set(seen)), 5)
+
+    def test_invalid_cursor(self):
+        response = self.client.get("/api/v1/places/?cursor=not-a-cursor")
+        self.assertEqual(response.status_code, 400)
+
+    def test_invalid_limit(self):
+        response = self.client.get("/api/v1/amenities/?limit=0")
+        self.assertEqual(response.status_code, 400)
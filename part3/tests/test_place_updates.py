@@ -0,0 +1,78 @@
+import unittest
+from app import create_app
+from app.extensions import db
+from app.models.user import User
+from app.models.place import Place
+from app.models.amenity import Amenity
+
+
+class TestPlaceUpdates(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app("development")
+        self.app.config["TESTING"] = True
+        self.client = self.app.test_client()
+
+        with self.app.app_context():
+            db.create_all()
+            owner = User(first_name="Update", last_name="Owner", email="owner@update.com", password="123456")
+            place = Place(title="Editable", price=100, latitude=10, longitude=20, owner=owner)
+            db.session.add(place)
+            db.session.commit()
+            self.place_id = place.id
+
+        token = self.client.post("/api/v1/auth/login", json={
+            "email": "owner@update.com",
+            "password": "123456"
+        }).get_json()["access_token"]
+        self.headers = {"Authorization": f"Bearer {token}"}
+
+    def tearDown(self):
+        with self.app.app_context():
+            db.drop_all()
+
+    def put(self, data):
+        response = self.client.put(f"/api/v1/places/{self.place_id}", json=data, headers=self.headers)
+        self.assertEqual(response.status_code, 200, response.get_data(as_text=True))
+        return response.get_json()
+
+    def test_rating_aggregates_are_not_editable(self):
+        place = self.put({"title": "Edited", "review_count": 1000, "rating_sum": 5000, "rating_5": 1000,
+                          "average_rating": 5.0})
+        self.assertEqual(place["title"], "Edited")
+
+        place = self.client.get(f"/api/v1/places/{self.place_id}").get_json()
+        self.assertEqual((place["title"], place["review_count"], place["average_rating"]), ("Edited", 0, 0.0))
+        self.assertEqual(place["rating_histogram"], {"1": 0, "2": 0, "3": 0, "4": 0, "5": 0})
+
+    def test_ordinal_is_not_editable(self):
+        with self.app.app_context():
+            place, amenity = db.session.get(Place, self.place_id), Amenity(name="Wifi")
+            other = Place(title="Other", price=100, latitude=10, longitude=20, owner_id=place.owner_id)
+            place.amenities.append(amenity)
+            db.session.add(other)
+            db.session.commit()
+            amenity_id, other_ordinal = amenity.id, other.ordinal
+
+        # Neither a new ordinal nor the one of another place
+        self.put({"ordinal": 77})
+        self.put({"ordinal": other_ordinal})
+        places = self.client.get(f"/api/v1/places/?amenities={amenity_id}").get_json()["items"]
+        self.assertEqual([p["id"] for p in places], [self.place_id])
+
+    def test_geohash_is_not_editable(self):
+        self.put({"geohash": "zzzzzzzzz"})
+        within = self.client.get("/api/v1/places/within?bbox=19,9,21,11").get_json()
+        nearby = self.client.get("/api/v1/places/nearby?lat=10&lon=20&radius_km=5").get_json()
+        self.assertEqual([p["id"] for p in within], [self.place_id])
+        self.assertEqual([p["id"] for p in nearby], [self.place_id])
+
+        # Moving the place recomputes it
+        self.put({"latitude": 48.85, "longitude": 2.35})
+        self.assertEqual(self.client.get("/api/v1/places/within?bbox=19,9,21,11").get_json(), [])
+        within = self.client.get("/api/v1/places/within?bbox=2,48,3,49").get_json()
+        self.assertEqual([p["id"] for p in within], [self.place_id])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+import unittest
+from app import create_app
+from app.extensions import db
+from app.models.user import User
+from app.models.place import Place
+
+
+class TestPlacesBatch(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app("development")
+        self.app.config["TESTING"] = True
+        self.client = self.app.test_client()
+
+        with self.app.app_context():
+            db.create_all()
+
+            user = User(
+                first_name="Batch",
+                last_name="Owner",
+                email="batch@test.com",
+                password="123456"
+            )
+            db.session.add(user)
+            db.session.commit()
+
+    def tearDown(self):
+        with self.app.app_context():
+            db.drop_all()
+
+    def get_token(self):
+        response = self.client.post("/api/v1/auth/login", json={
+            "email": "batch@test.com",
+            "password": "123456"
+        })
+        return response.get_json()["access_token"]
+
+    def test_batch_requires_auth(self):
+        response = self.client.post("/api/v1/places/batch", json=[])
+        self.assertEqual(response.status_code, 401)
+
+    def test_batch_reports_per_item_errors(self):
+        token = self.get_token()
+        places = [
+            {"title": f"Place {i}", "price": 100, "latitude": 10, "longitude": 20}
+            for i in range(3)
+        ]
+        places.append({"title": "", "price": 100, "latitude": 10, "longitude": 20})
+
+        response = self.client.post(
+            "/api/v1/places/batch",
+            json=places,
+            headers={"Authorization": f"Bearer {token}"}
+        )
+
+        self.assertEqual(response.status_code, 201)
+        data = response.get_json()
+        self.assertEqual([c["index"] for c in data["created"]], [0, 1, 2])
+        self.assertEqual([e["index"] for e in data["errors"]], [3])
+
+        with self.app.app_context():
+            self.assertEqual(Place.query.count(), 3)
+
+    def test_batch_reports_wrong_types_per_item(self):
+        token = self.get_token()
+        places = [
+            {"title": "Valid", "price": 100, "latitude": 10, "longitude": 20},
+            {"title": 5, "price": 100, "latitude": 10, "longitude": 20},
+            {"title": "Text price", "price": "100", "latitude": 10, "longitude": 20},
+            {"title": "Bool latitude", "price": 100, "latitude": True, "longitude": 20},
+            {"title": "List description", "description": ["x"], "price": 100, "latitude": 10, "longitude": 20},
+        ]
+
+        response = self.client.post(
+            "/api/v1/places/batch",
+            json=places,
+            headers={"Authorization": f"Bearer {token}"}
+        )
+
+        self.assertEqual(response.status_code, 201)
+        data = response.get_json()
+        self.assertEqual([c["index"] for c in data["created"]], [0])
+        self.assertEqual(data["errors"], [
+            {"index": 1, "error": "title must be a string"},
+            {"index": 2, "error": "price must be a number"},
+            {"index": 3, "error": "latitude must be a number"},
+            {"index": 4, "error": "description must be a string"},
+        ])
+
+    def test_batch_with_no_valid_item(self):
+        token = self.get_token()
+
+        response = self.client.post(
+            "/api/v1/places/batch",
+            json=[{"title": "No price"}],
+            headers={"Authorization": f"Bearer {token}"}
+        )
+
+        self.assertEqual(response.status_code, 400)
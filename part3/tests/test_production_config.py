@@ -0,0 +1,50 @@
+import os
+import unittest
+from sqlalchemy import text
+from app import create_app
+from app.extensions import db
+from config import ProductionConfig
+
+
+class ProductionTestConfig(ProductionConfig):
+    SQLALCHEMY_DATABASE_URI = "sqlite:///hbnb_production_test.db"
+    JWT_SECRET_KEY = "production-test-key"
+
+
+class TestProductionConfig(unittest.TestCase):
+
+    def test_requires_a_jwt_secret_key(self):
+        # No fallback to the development key
+        self.assertEqual(ProductionConfig.JWT_SECRET_KEY, os.environ.get("JWT_SECRET_KEY"))
+
+        class NoSecretConfig(ProductionTestConfig):
+            JWT_SECRET_KEY = None
+
+        with self.assertRaises(ValueError):
+            create_app(NoSecretConfig)
+
+    def test_engine_settings(self):
+        app = create_app(ProductionTestConfig)
+        path = os.path.join(app.instance_path, "hbnb_production_test.db")
+        try:
+            with app.app_context():
+                # The connect hook runs SQLITE_PRAGMAS on every new connection
+                with db.engine.connect() as conn:
+                    self.assertEqual(conn.execute(text("PRAGMA journal_mode")).scalar(), "wal")
+                    self.assertEqual(conn.execute(text("PRAGMA synchronous")).scalar(), 1)  # NORMAL
+                    self.assertEqual(conn.execute(text("PRAGMA busy_timeout")).scalar(),
+                                     ProductionConfig.SQLITE_PRAGMAS["busy_timeout"])
+
+                options = ProductionConfig.SQLALCHEMY_ENGINE_OPTIONS
+                self.assertEqual(db.engine.pool.size(), options["pool_size"])
+                self.assertEqual(db.engine.pool._max_overflow, options["max_overflow"])
+                self.assertEqual(db.engine.pool._pre_ping, options["pool_pre_ping"])
+                db.engine.dispose()
+        finally:
+            for suffix in ("", "-wal", "-shm"):
+                if os.path.exists(path + suffix):
+                    os.remove(path + suffix)
+
+
+if __name__ == "__main__":
+    unittest.main()
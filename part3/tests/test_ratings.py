@@ -0,0 +1,99 @@
+import unittest
+from app import create_app
+from app.extensions import db
+from app.models.user import User
+from app.models.place import Place
+from app.models.review import Review
+from app.persistence.ratings import recompute_ratings
+from app.services.facade import HBnBFacade
+
+
+class TestRatingAggregates(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app("development")
+        self.app.config["TESTING"] = True
+        self.facade = HBnBFacade()
+
+        with self.app.app_context():
+            db.create_all()
+            owner = User(first_name="Rated", last_name="Owner", email="owner@rated.com", password="123456")
+            self.reviewers = [
+                User(first_name="Rater", last_name=str(i), email=f"rater{i}@rated.com", password="123456")
+                for i in range(3)
+            ]
+            db.session.add_all([owner] + self.reviewers)
+            db.session.commit()
+            places = [
+                Place(title=f"Rated {i}", price=100, latitude=10, longitude=20, owner_id=owner.id)
+                for i in range(2)
+            ]
+            db.session.add_all(places)
+            db.session.commit()
+
+            self.place_ids = [place.id for place in places]
+            self.reviewer_ids = [user.id for user in self.reviewers]
+
+    def tearDown(self):
+        with self.app.app_context():
+            db.drop_all()
+
+    def aggregates(self, place_id):
+        with self.app.app_context():
+            place = db.session.get(Place, place_id)
+            return place.review_count, place.rating_sum, place.get_rating_histogram()
+
+    def review(self, user_index, rating, place_index=0):
+        with self.app.app_context():
+            return self.facade.create_review({
+                "text": "Rated", "rating": rating,
+                "user_id": self.reviewer_ids[user_index], "place_id": self.place_ids[place_index],
+            }).id
+
+    def test_reviews_maintain_aggregates(self):
+        first = self.review(0, 5)
+        second = self.review(1, 3)
+        self.assertEqual(self.aggregates(self.place_ids[0]),
+                         (2, 8, {"1": 0, "2": 0, "3": 1, "4": 0, "5": 1}))
+
+        with self.app.app_context():
+            self.facade.update_review(second, {"rating": 4})
+        self.assertEqual(self.aggregates(self.place_ids[0]),
+                         (2, 9, {"1": 0, "2": 0, "3": 0, "4": 1, "5": 1}))
+
+        with self.app.app_context():
+            self.facade.update_review(second, {"place_id": self.place_ids[1]})
+            self.facade.delete_review(first)
+        self.assertEqual(self.aggregates(self.place_ids[0]), (0, 0, dict.fromkeys("12345", 0)))
+        self.assertEqual(self.aggregates(self.place_ids[1])[:2], (1, 4))
+
+        with self.app.app_context():
+            self.assertEqual(db.session.get(Place, self.place_ids[1]).get_average_rating(), 4.0)
+            self.assertEqual(db.session.get(Place, self.place_ids[1]).average_rating, 4.0)
+            self.facade.delete_user(self.reviewer_ids[1])
+        self.assertEqual(self.aggregates(self.place_ids[1])[:2], (0, 0))
+
+    def test_invalid_rating_is_rejected(self):
+        review_id = self.review(0, 2)
+        with self.app.app_context():
+            with self.assertRaises(ValueError):
+                self.facade.update_review(review_id, {"rating": 9})
+        self.assertEqual(self.aggregates(self.place_ids[0])[:2], (1, 2))
+
+    def test_recompute_repairs_aggregates(self):
+        self.review(0, 5)
+        with self.app.app_context():
+            # Written behind the facade's back
+            db.session.add(Review(text="Raw", rating=1, user_id=self.reviewer_ids[1],
+                                  place_id=self.place_ids[1]))
+            db.session.commit()
+
+            self.assertEqual(recompute_ratings(db.session), 1)
+            self.assertEqual(recompute_ratings(db.session), 0)
+        self.assertEqual(self.aggregates(self.place_ids[0])[:2], (1, 5))
+        self.assertEqual(self.aggregates(self.place_ids[1]),
+                         (1, 1, {"1": 1, "2": 0, "3": 0, "4": 0, "5": 0}))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+import asyncio
+import unittest
+from app import create_app
+from app.extensions import db, REPLICA_BIND_KEY
+from app.models.user import User
+from app.services.async_facade import AsyncHBnBFacade
+from config import DevelopmentConfig
+from tests.test_async_reads import ASYNC_EXTRAS
+
+
+class ReplicaConfig(DevelopmentConfig):
+    SQLALCHEMY_DATABASE_URI = "sqlite:///hbnb_primary_test.db"
+    SQLALCHEMY_BINDS = {REPLICA_BIND_KEY: "sqlite:///hbnb_replica_test.db"}
+
+
+class TestReadReplica(unittest.TestCase):
+
+    config = ReplicaConfig
+
+    def setUp(self):
+        self.app = create_app(self.config)
+        self.app.config["TESTING"] = True
+        self.client = self.app.test_client()
+
+        with self.app.app_context():
+            db.create_all()
+            db.metadata.create_all(db.engines[REPLICA_BIND_KEY])
+
+    def tearDown(self):
+        with self.app.app_context():
+            db.drop_all()
+            db.metadata.drop_all(db.engines[REPLICA_BIND_KEY])
+        # init_app registered an (empty) metadata for the bind on the shared
+        # db object; drop it so apps without a replica can create_all()
+        db.metadatas.pop(REPLICA_BIND_KEY, None)
+
+    def add_user(self, email):
+        user = User(first_name="Read", last_name="Replica", email=email, password="123456")
+        db.session.add(user)
+        db.session.commit()
+        return user.id
+
+    def test_reads_go_to_replica(self):
+        with self.app.app_context():
+            self.add_user("primary@test.com")
+
+        # The replica has not received the row yet
+        with self.app.app_context():
+            self.assertEqual(User.query.count(), 0)
+
+    def test_reads_after_write_stick_to_primary(self):
+        with self.app.app_context():
+            user_id = self.add_user("sticky@test.com")
+            self.assertIsNotNone(User.query.get(user_id))
+
+
+class AsyncReplicaConfig(ReplicaConfig):
+    ASYNC_READS = True
+
+
+@unittest.skipUnless(ASYNC_EXTRAS, "aiosqlite, greenlet and asgiref are required")
+class TestAsyncReadReplica(TestReadReplica):
+    """The sessions of the async facade are routed like the sync ones"""
+
+    config = AsyncReplicaConfig
+
+    def test_async_reads_go_to_replica(self):
+        facade = AsyncHBnBFacade()
+        with self.app.app_context():
+            user_id = self.add_user("primary@test.com")
+            self.assertEqual(asyncio.run(facade.get_all_users()), [])
+            self.assertIsNone(asyncio.run(facade.get_user(user_id)))
+
+    def test_async_writes_go_to_primary(self):
+        facade = AsyncHBnBFacade()
+        user = {"first_name": "Async", "last_name": "Write", "email": "async@test.com", "password": "123456"}
+        with self.app.app_context():
+            user_id = asyncio.run(facade.create_user(user)).id
+            self.assertIsNone(asyncio.run(facade.get_user(user_id)))
+            db.session().stick_to_primary()
+            self.assertEqual(db.session.get(User, user_id).email, "async@test.com")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,208 @@
+import json
+import os
+import unittest
+from flask import Response
+from app import create_app
+from app.extensions import db
+from app.models.user import User
+from app.models.place import Place
+from app.models.amenity import Amenity
+from app.api.v1.caching import _StoreWhenSent
+from app.services.cache import MemoryCache, SharedMemoryCache, response_cache
+from app.services.facade import HBnBFacade
+from config import DevelopmentConfig
+from tests.query_count import QueryCountMixin
+
+
+class CacheConfig(DevelopmentConfig):
+    RESPONSE_CACHE = "memory"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestMemoryCache(unittest.TestCase):
+
+    def test_lru_within_byte_budget(self):
+        cache = MemoryCache(max_bytes=25, ttl=60)
+        cache.set("a", b"x" * 9)
+        cache.set("b", b"x" * 9)
+        self.assertEqual(cache.get("a"), b"x" * 9)
+        # "b" is the least recently used
+        cache.set("c", b"x" * 9)
+        self.assertIsNone(cache.get("b"))
+        cache.set("huge", b"x" * 100)
+        self.assertIsNone(cache.get("huge"))
+        self.assertEqual(cache.stats(), {"hits": 1, "misses": 2, "stores": 3, "evictions": 1,
+                                         "entries": 2, "bytes": 20, "hit_rate": 0.3333})
+
+    def test_entry_size_limit(self):
+        cache = MemoryCache(max_bytes=1000, ttl=60, max_entry_bytes=10)
+        self.assertEqual(cache.max_value_bytes, 10)
+        cache.set("a", b"x" * 10)
+        cache.set("b", b"x" * 11)
+        self.assertEqual(cache.get("a"), b"x" * 10)
+        self.assertIsNone(cache.get("b"))
+
+    def test_entries_expire(self):
+        clock = FakeClock()
+        cache = MemoryCache(max_bytes=1000, ttl=10, clock=clock)
+        cache.set("a", b"1")
+        clock.now = 9.9
+        self.assertEqual(cache.get("a"), b"1")
+        clock.now = 10
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.stats()["bytes"], 0)
+
+    def test_versions(self):
+        cache = MemoryCache(max_bytes=1000, ttl=10)
+        cache.bump(("place", "review"))
+        cache.bump(("place",))
+        self.assertEqual(cache.versions(("place", "review", "amenity")), (2, 1, 0))
+
+
+@unittest.skipUnless(os.name == "posix", "shared memory cache needs POSIX")
+class TestSharedMemoryCache(unittest.TestCase):
+
+    def setUp(self):
+        self.name = f"hbnb-test-cache-{os.getpid()}"
+        self.first = SharedMemoryCache(self.name, max_bytes=4 * 1024, ttl=60, slot_bytes=1024)
+        # A second worker attaches to the same segment
+        self.second = SharedMemoryCache(self.name, max_bytes=4 * 1024, ttl=60, slot_bytes=1024)
+
+    def tearDown(self):
+        self.second.close()
+        self.first.unlink()
+        self.first.close()
+
+    def test_workers_share_entries_and_versions(self):
+        self.first.set("/places/?", b'{"items": []}')
+        self.assertEqual(self.second.get("/places/?"), b'{"items": []}')
+        self.assertIsNone(self.second.get("/amenities/?"))
+        self.second.set("too big", b"x" * 2048)
+        self.assertIsNone(self.first.get("too big"))
+
+        self.second.bump(("amenity",))
+        self.assertEqual(self.first.versions(("place", "amenity")), (0, 1))
+        self.assertEqual({key: value for key, value in self.first.stats().items() if key != "slots"},
+                         {"hits": 1, "misses": 2, "stores": 1, "evictions": 0, "hit_rate": 0.3333})
+
+        self.first.clear()
+        self.assertIsNone(self.second.get("/places/?"))
+
+    def test_layout_mismatch(self):
+        with self.assertRaises(ValueError):
+            SharedMemoryCache(self.name, max_bytes=8 * 1024, ttl=60, slot_bytes=1024)
+
+
+class TestCachedEndpoints(QueryCountMixin, unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app(CacheConfig)
+        self.app.config["TESTING"] = True
+        self.client = self.app.test_client()
+        self.facade = HBnBFacade()
+
+        with self.app.app_context():
+            db.create_all()
+            owner = User(first_name="Cache", last_name="Owner", email="owner@cache.com", password="123456")
+            reviewer = User(first_name="Cache", last_name="Reviewer", email="reviewer@cache.com",
+                            password="123456")
+            wifi = Amenity(name="Wifi")
+            place = Place(title="Cached", price=100, latitude=10, longitude=20, owner=owner)
+            place.amenities.append(wifi)
+            db.session.add_all([owner, reviewer, place])
+            db.session.commit()
+            self.place_id, self.wifi_id, self.reviewer_id = place.id, wifi.id, reviewer.id
+            self.engine = db.engine
+
+    def tearDown(self):
+        with self.app.app_context():
+            db.drop_all()
+
+    def get(self, url, cache):
+        response = self.client.get(url)
+        self.assertEqual(response.headers.get("X-Cache"), cache, url)
+        return response.get_json()
+
+    def test_hits_skip_the_database(self):
+        place_url = f"/api/v1/places/{self.place_id}"
+        first = self.get(place_url, "MISS")
+        with self.assertMaxQueries(self.engine, 0):
+            self.assertEqual(self.get(place_url, "HIT"), first)
+
+        # The query string is normalized
+        self.get("/api/v1/places/?sort=price&limit=5", "MISS")
+        self.get("/api/v1/places/?limit=5&sort=price", "HIT")
+
+        # Errors are not cached
+        self.assertEqual(self.client.get("/api/v1/places/missing").status_code, 404)
+        self.assertIsNone(self.client.get("/api/v1/places/missing").headers.get("X-Cache"))
+
+    def test_streamed_list_is_stored_once_sent(self):
+        first = self.get("/api/v1/places/", "MISS")
+        with self.assertMaxQueries(self.engine, 0):
+            self.assertEqual(self.get("/api/v1/places/", "HIT"), first)
+
+        # NDJSON has its own entry
+        ndjson = {"Accept": "application/x-ndjson"}
+        response = self.client.get("/api/v1/places/", headers=ndjson)
+        self.assertEqual(response.headers["X-Cache"], "MISS")
+        # Stored once all of it is read
+        response.get_data()
+        response = self.client.get("/api/v1/places/", headers=ndjson)
+        self.assertEqual((response.headers["X-Cache"], response.mimetype), ("HIT", "application/x-ndjson"))
+        self.assertEqual(json.loads(response.get_data(as_text=True).splitlines()[0]), first[0])
+
+        # Bodies larger than an entry may be are streamed without being stored
+        with self.app.app_context():
+            response_cache().max_entry_bytes = 100
+            response_cache().bump(("place",))
+        self.get("/api/v1/places/", "MISS")
+        self.get("/api/v1/places/", "MISS")
+
+    def test_large_streams_are_not_buffered(self):
+        with self.app.app_context():
+            cache = response_cache()
+            cache.max_entry_bytes = 100
+            response = Response(iter([b"x" * 60] * 1000), mimetype="application/json")
+            body = _StoreWhenSent(cache, "key", response)
+            sent = 0
+            for chunk in body:
+                sent += len(chunk)
+                # Dropped as soon as the body outgrows an entry
+                self.assertEqual(body.chunks is None, sent > 100)
+            self.assertEqual(sent, 60000)
+            self.assertIsNone(cache.get("key"))
+
+    def test_writes_invalidate(self):
+        place_url = f"/api/v1/places/{self.place_id}"
+        reviews_url = f"/api/v1/reviews/places/{self.place_id}/reviews"
+        self.get(place_url, "MISS")
+        self.assertEqual(self.get(reviews_url, "MISS"), [])
+        self.assertEqual(self.get("/api/v1/amenities/", "MISS")[0]["name"], "Wifi")
+
+        with self.app.app_context():
+            self.facade.create_review({"text": "Cached", "rating": 4,
+                                       "user_id": self.reviewer_id, "place_id": self.place_id})
+        self.assertEqual(self.get(place_url, "MISS")["review_count"], 1)
+        self.assertEqual(len(self.get(reviews_url, "MISS")), 1)
+        # Reviews do not show on the amenity list
+        self.get("/api/v1/amenities/", "HIT")
+
+        with self.app.app_context():
+            self.facade.update_amenity(self.wifi_id, {"name": "Fast wifi"})
+        self.assertEqual(self.get("/api/v1/amenities/", "MISS")[0]["name"], "Fast wifi")
+        self.assertEqual(self.get(place_url, "MISS")["amenities"][0]["name"], "Fast wifi")
+
+        with self.app.app_context():
+            self.assertEqual(response_cache().stats()["hits"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+import unittest
+from app import create_app
+from app.extensions import db
+from app.models.user import User
+from app.models.place import Place
+from app.services.facade import HBnBFacade
+from tests.query_count import QueryCountMixin
+
+
+class TestPlaceSearch(QueryCountMixin, unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app("development")
+        self.app.config["TESTING"] = True
+        self.client = self.app.test_client()
+        self.facade = HBnBFacade()
+
+        with self.app.app_context():
+            db.create_all()
+            owner = User(first_name="Search", last_name="Owner", email="owner@search.com", password="123456")
+            reviewer = User(first_name="Search", last_name="Reviewer", email="reviewer@search.com", password="123456")
+            db.session.add_all([owner, reviewer])
+            db.session.commit()
+            places = [
+                Place(title="Seaside villa", description="A <villa> by the sea with a pool", price=300,
+                      latitude=10, longitude=20, owner_id=owner.id),
+                Place(title="Mountain cabin", description="Quiet cabin in the woods", price=80,
+                      latitude=10, longitude=20, owner_id=owner.id),
+                Place(title="City loft", description="Close to the café and the museums", price=120,
+                      latitude=10, longitude=20, owner_id=owner.id),
+            ]
+            db.session.add_all(places)
+            db.session.commit()
+
+            self.place_ids = [place.id for place in places]
+            self.reviewer_id = reviewer.id
+            self.engine = db.engine
+
+    def tearDown(self):
+        with self.app.app_context():
+            db.drop_all()
+
+    def search(self, q, **params):
+        response = self.client.get("/api/v1/places/search", query_string={"q": q, **params})
+        self.assertEqual(response.status_code, 200)
+        return response.get_json()
+
+    def titles(self, q):
+        return [place["title"] for place in self.search(q)["items"]]
+
+    def test_ranking_and_snippets(self):
+        with self.app.app_context():
+            self.facade.create_review({"text": "Sea views from the terrace", "rating": 5,
+                                       "user_id": self.reviewer_id, "place_id": self.place_ids[1]})
+
+        # Title matches rank above review matches; the last word is a prefix
+        result = self.search("sea")
+        self.assertEqual([p["title"] for p in result["items"]], ["Seaside villa", "Mountain cabin"])
+        self.assertEqual(result["items"][1]["snippet"], "<mark>Sea</mark> views from the terrace")
+        self.assertIsNone(result["next_cursor"])
+
+        # Stemming, diacritics, HTML escaping
+        self.assertEqual(self.search("cafes")["items"][0]["snippet"],
+                         "Close to the <mark>café</mark> and the museums")
+        self.assertIn("&lt;<mark>villa</mark>&gt;", self.search("pool villa")["items"][0]["snippet"])
+
+    def test_index_follows_writes(self):
+        with self.app.app_context():
+            review = self.facade.create_review({"text": "Lovely fireplace", "rating": 4,
+                                                "user_id": self.reviewer_id, "place_id": self.place_ids[1]})
+        self.assertEqual(self.titles("fireplace"), ["Mountain cabin"])
+
+        with self.app.app_context():
+            self.facade.update_review(review.id, {"place_id": self.place_ids[2]})
+            self.facade.update_place(self.place_ids[0], {"title": "Beach house"})
+        self.assertEqual(self.titles("fireplace"), ["City loft"])
+        self.assertEqual(self.titles("beach"), ["Beach house"])
+        self.assertEqual(self.titles("seaside"), [])
+
+        with self.app.app_context():
+            self.facade.delete_place(self.place_ids[2])
+            rows = db.session.execute(db.text("SELECT COUNT(*) FROM place_search")).scalar()
+        self.assertEqual(self.titles("fireplace"), [])
+        self.assertEqual(rows, 2)
+
+    def test_pagination(self):
+        with self.app.app_context():
+            for place_id in self.place_ids:
+                self.facade.update_place(place_id, {"description": "Family friendly"})
+
+        seen, cursor = [], None
+        while True:
+            params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+            with self.assertMaxQueries(self.engine, 4):
+                page = self.search("family", **params)
+            seen += [place["id"] for place in page["items"]]
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+        self.assertEqual(sorted(seen), sorted(self.place_ids))
+
+    def test_invalid_parameters(self):
+        for params in ({"q": ""}, {"q": '" * ('}, {"q": "sea", "cursor": "nope"}):
+            response = self.client.get("/api/v1/places/search", query_string=params)
+            self.assertEqual(response.status_code, 400, params)
+        # FTS5 operators are searched as plain words
+        self.assertEqual(self.search('sea" OR NOT "cabin')["items"], [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,112 @@
+import json
+import unittest
+from datetime import datetime
+from unittest.mock import patch
+from app import create_app
+from app.api.v1 import serializers
+from app.api.v1.places import place_to_dict
+from app.api.v1.reviews import review_to_dict
+from app.extensions import db
+from app.models.user import User
+from app.models.place import Place
+from app.models.review import Review
+from app.models.amenity import Amenity
+from app.persistence.fieldsets import Fieldset
+
+
+class TestSerializers(unittest.TestCase):
+
+    def setUp(self):
+        self.owner = User(first_name="Compiled", last_name="Owner", email="owner@compiled.com", password="123456")
+        self.place = Place(title="Compiled", description="Fast", price=120, latitude=10, longitude=20,
+                           owner=self.owner)
+        self.place.amenities.append(Amenity(name="Wifi"))
+        self.place.review_count, self.place.rating_sum = 2, 9
+        self.place.rating_1 = self.place.rating_2 = self.place.rating_3 = 0
+        self.place.rating_4 = self.place.rating_5 = 1
+
+    def test_place_payload(self):
+        self.assertEqual(place_to_dict(self.place), {
+            "id": self.place.id, "title": "Compiled", "description": "Fast", "price": 120.0,
+            "latitude": 10.0, "longitude": 20.0, "owner_id": self.place.owner_id, "owner_name": "Compiled Owner",
+            "review_count": 2, "average_rating": 4.5,
+            "rating_histogram": {"1": 0, "2": 0, "3": 0, "4": 1, "5": 1},
+            "amenities": [{"id": self.place.amenities[0].id, "name": "Wifi"}],
+        })
+
+    def test_fieldsets_compile_once(self):
+        fieldset = Fieldset(Place, ["title"], ["owner"])
+        self.assertEqual(place_to_dict(self.place, fieldset), {
+            "id": self.place.id, "title": "Compiled",
+            "owner": {"id": self.owner.id, "first_name": "Compiled", "last_name": "Owner"},
+        })
+        compiled = place_to_dict.compile(fieldset.fields, fieldset.include)
+        again = Fieldset(Place, ["title"], ["owner"])
+        self.assertIs(place_to_dict.compile(again.fields, again.include), compiled)
+
+    def test_field_order_does_not_compile_again(self):
+        orders = [["price", "title"], ["title", "price", "id"], ["price", "title", "price"]]
+        fieldsets = [Fieldset(Place, fields, ["reviews", "owner"]) for fields in orders]
+        fieldsets.append(Fieldset(Place, ["title", "price"], ["owner", "reviews"]))
+        self.assertEqual({(f.fields, f.include) for f in fieldsets},
+                         {(("id", "title", "price"), ("owner", "reviews"))})
+
+    def test_compiled_fieldsets_are_bounded(self):
+        with patch.object(serializers, "MAX_COMPILED", 2):
+            serializer = serializers.Serializer({"id": "obj.id", "title": "obj.title", "price": "obj.price"})
+            first = serializer.compile(("id",), ())
+            serializer.compile(("id", "title"), ())
+            # Used again: the least recently used is ("id", "title")
+            self.assertIs(serializer.compile(("id",), ()), first)
+            serializer.compile(("id", "price"), ())
+            self.assertEqual(list(serializer._compiled), [(("id",), ()), (("id", "price"), ())])
+            # The full payload is always there
+            self.assertEqual(serializer(self.place), {"id": self.place.id, "title": "Compiled", "price": 120})
+
+    def test_dumps_without_orjson(self):
+        review = Review(text="Encoded", rating=4, user_id=self.owner.id, place_id=self.place.id)
+        review.user, review.created_at = self.owner, datetime(2024, 1, 2, 3, 4, 5, 678901)
+        review.updated_at = datetime(2024, 1, 2, 3, 4, 5)
+        payload = review_to_dict(review)
+        expected = {**payload, "created_at": "2024-01-02T03:04:05.678901", "updated_at": "2024-01-02T03:04:05"}
+
+        self.assertEqual(json.loads(serializers.dumps(payload)), expected)
+        with patch.object(serializers, "orjson", None):
+            self.assertEqual(json.loads(serializers.dumps(payload)), expected)
+            self.assertEqual(json.loads(serializers.dumps({1: "key"})), {"1": "key"})
+
+
+class TestSerializedResponses(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app("development")
+        self.app.config["TESTING"] = True
+        self.client = self.app.test_client()
+
+        with self.app.app_context():
+            db.create_all()
+            owner = User(first_name="Compiled", last_name="Owner", email="owner@compiled.com", password="123456")
+            place = Place(title="Compiled", price=120, latitude=10, longitude=20, owner=owner)
+            db.session.add(place)
+            db.session.commit()
+            db.session.add(Review(text="Encoded", rating=4, user_id=owner.id, place_id=place.id))
+            db.session.commit()
+
+    def tearDown(self):
+        with self.app.app_context():
+            db.drop_all()
+
+    def test_responses_are_encoded_by_dumps(self):
+        response = self.client.get("/api/v1/reviews/?limit=1")
+        self.assertEqual(response.mimetype, "application/json")
+        review = response.get_json()["items"][0]
+        self.assertEqual(review["text"], "Encoded")
+        self.assertEqual(datetime.fromisoformat(review["created_at"]).year, datetime.utcnow().year)
+
+        # Another URL, not served from the response cache
+        with patch.object(serializers, "orjson", None):
+            self.assertEqual(self.client.get("/api/v1/reviews/?limit=2").get_json()["items"][0], review)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+import json
+import unittest
+from unittest.mock import patch
+from app import create_app
+from app.extensions import db
+from app.models.user import User
+from app.models.place import Place
+from app.models.review import Review
+from app.models.amenity import Amenity
+from tests.query_count import QueryCountMixin
+
+
+class TestStreaming(QueryCountMixin, unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app("development")
+        self.app.config["TESTING"] = True
+        self.client = self.app.test_client()
+
+        with self.app.app_context():
+            db.create_all()
+            owner = User(first_name="Stream", last_name="Owner", email="owner@stream.com", password="123456")
+            reviewer = User(first_name="Stream", last_name="Reviewer", email="reviewer@stream.com",
+                            password="123456")
+            wifi = Amenity(name="Wifi")
+            places = [Place(title=f"Place {i}", price=100 + i, latitude=10, longitude=20, owner=owner)
+                      for i in range(5)]
+            places[0].amenities.append(wifi)
+            db.session.add_all([reviewer] + places)
+            db.session.commit()
+            db.session.add(Review(text="Streamed", rating=4, user_id=reviewer.id, place_id=places[0].id))
+            db.session.commit()
+            self.engine = db.engine
+
+    def tearDown(self):
+        with self.app.app_context():
+            db.drop_all()
+
+    def get(self, url, headers=None):
+        """The response to a GET, read to the end so that its stream is closed"""
+        response = self.client.get(url, headers=headers)
+        response.get_data()
+        response.close()
+        return response
+
+    def test_json_array(self):
+        # Batches of 2 places: the places query, then owners and amenities per batch
+        with patch("app.services.facade.STREAM_BATCH_SIZE", 2), self.assertMaxQueries(self.engine, 1 + 1 + 2 * 3):
+            response = self.client.get("/api/v1/places/")
+            self.assertTrue(response.is_streamed)
+            places = response.get_json()
+        self.assertEqual(response.mimetype, "application/json")
+        self.assertEqual([p["title"] for p in places], [f"Place {i}" for i in range(5)])
+        self.assertEqual(places[0]["owner_name"], "Stream Owner")
+        self.assertEqual(places[0]["amenities"][0]["name"], "Wifi")
+
+        reviews = self.client.get("/api/v1/reviews/").get_json()
+        self.assertEqual([(r["text"], r["user_name"]) for r in reviews], [("Streamed", "Stream Reviewer")])
+
+    def test_ndjson(self):
+        response = self.client.get("/api/v1/places/", headers={"Accept": "application/x-ndjson"})
+        self.assertEqual(response.mimetype, "application/x-ndjson")
+        lines = response.get_data(as_text=True).splitlines()
+        self.assertEqual([json.loads(line)["price"] for line in lines], [100, 101, 102, 103, 104])
+
+        # JSON stays the default of generic Accept headers
+        response = self.client.get("/api/v1/places/", headers={"Accept": "*/*"})
+        self.assertEqual(response.mimetype, "application/json")
+
+    def test_representations_have_their_own_etag(self):
+        ndjson = {"Accept": "application/x-ndjson"}
+        response = self.get("/api/v1/places/", headers=ndjson)
+        etag = response.headers["ETag"]
+        self.assertIn("Accept", response.vary)
+        self.assertNotEqual(self.get("/api/v1/places/").headers["ETag"], etag)
+
+        # An NDJSON validator does not revalidate a JSON response
+        response = self.get("/api/v1/places/", headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, "application/json")
+        response = self.get("/api/v1/places/", headers={**ndjson, "If-None-Match": etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertIn("Accept", response.vary)
+
+        self.assertIn("Accept", self.get("/api/v1/reviews/").vary)
+
+    def test_empty_collection(self):
+        with self.app.app_context():
+            db.session.execute(db.delete(Review))
+            db.session.commit()
+        self.assertEqual(self.client.get("/api/v1/reviews/").get_json(), [])
+        response = self.client.get("/api/v1/reviews/", headers={"Accept": "application/x-ndjson"})
+        self.assertEqual(response.get_data(), b"")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -102,6 +102,14 @@ async function loginUser(email, password) {
 
 /* INDEX PAGE HELPERS */
 let allPlaces = [];
+const SEARCH_DELAY_MS = 250;
+let latestSearch = 0;
+const PAGE_SIZE = 24;
+// The fields the place cards show: the API leaves out the rest
+const CARD_FIELDS = 'title,price,review_count,average_rating';
+const listing = { priceMax: 'all', sort: 'recent', amenities: new Set() };
+let nextCursor = null;
+let latestListing = 0;
 
 function checkAuthIndex() {
     const token = getCookie('token');
@@ -112,7 +120,15 @@ function checkAuthIndex() {
     fetchPlaces(token);
 }
 
-async function fetchPlaces(token) {
+/**
+ * Loads one page of places, filtered and sorted by the API.
+ * Without a cursor the list starts over, with the facet counts.
+ * @param {string} token - JWT token, if logged in.
+ * @param {string} cursor - next_cursor of the previous page.
+ */
+async function fetchPlaces(token, cursor = null) {
+    // Filters may change while a page loads: only the latest one is shown
+    const request = ++latestListing;
     try {
         const headers = {
             'Content-Type': 'application/json'
@@ -122,8 +138,10 @@ async function fetchPlaces(token) {
             headers['Authorization'] = `Bearer ${token}`;
         }
 
-        const response = await fetch(`${API_URL}/places/`, {
+        const response = await fetch(listingURL(cursor), {
             method: 'GET',
+            // Revalidate with the ETag: a 304 when nothing changed
+            cache: 'no-cache',
             headers: headers
         });
 
@@ -131,28 +149,87 @@ async function fetchPlaces(token) {
             throw new Error('Failed to fetch places');
         }
 
-        const places = await response.json();
+        const page = await response.json();
+        if (request !== latestListing) return;
 
-        if (Array.isArray(places)) {
-            allPlaces = places;
-        } else if (places && Array.isArray(places.places)) {
-            allPlaces = places.places;
-        } else {
-            allPlaces = [];
+        allPlaces = cursor ? allPlaces.concat(page.items) : page.items;
+        nextCursor = page.next_cursor;
+        if (page.facets) {
+            displayFacets(page.facets);
         }
 
         displayPlaces(allPlaces);
+        const loadMore = document.getElementById('load-more');
+        if (loadMore) {
+            loadMore.style.display = nextCursor ? 'block' : 'none';
+        }
     } catch (error) {
         const list = document.getElementById('places-list');
-        if (list) {
+        if (list && request === latestListing) {
             list.innerHTML = '<p style="color: var(--text-light);">Could not load places. Please try again later.</p>';
         }
     }
 }
 
+/**
+ * URL of one page of the listing with the selected filters.
+ */
+function listingURL(cursor) {
+    const params = new URLSearchParams({ sort: listing.sort, limit: PAGE_SIZE, fields: CARD_FIELDS });
+    if (listing.priceMax !== 'all') {
+        params.set('price_max', listing.priceMax);
+    }
+    if (listing.amenities.size) {
+        params.set('amenities', [...listing.amenities].join(','));
+    }
+    if (cursor) {
+        params.set('cursor', cursor);
+    }
+    return `${API_URL}/places/?${params}`;
+}
+
+/**
+ * Shows the facet counts: places per maximum price and amenity checkboxes.
+ * @param {Object} facets - {price: [{min, max, count}], amenities: [{id, name, count}]}
+ */
+function displayFacets(facets) {
+    const filter = document.getElementById('price-filter');
+    if (filter) {
+        Array.from(filter.options).forEach(option => {
+            if (option.value === 'all') return;
+            const max = parseFloat(option.value);
+            const count = facets.price
+                .filter(bucket => bucket.max !== null && bucket.max <= max)
+                .reduce((total, bucket) => total + bucket.count, 0);
+            option.textContent = `${option.value}$ (${count})`;
+        });
+    }
+
+    const amenityFilter = document.getElementById('amenity-filter');
+    if (!amenityFilter) return;
+    amenityFilter.innerHTML = '';
+    facets.amenities.forEach(amenity => {
+        const label = document.createElement('label');
+        const checkbox = document.createElement('input');
+        checkbox.type = 'checkbox';
+        checkbox.checked = listing.amenities.has(amenity.id);
+        checkbox.addEventListener('change', () => {
+            if (checkbox.checked) {
+                listing.amenities.add(amenity.id);
+            } else {
+                listing.amenities.delete(amenity.id);
+            }
+            fetchPlaces(getCookie('token'));
+        });
+        label.appendChild(checkbox);
+        label.appendChild(document.createTextNode(` ${amenity.name} (${amenity.count})`));
+        amenityFilter.appendChild(label);
+    });
+}
+
 /**
  * Renders the fetched places into the index page grid.
- * Displays the name and price for each card as required.
+ * Displays the name, price and average rating for each card.
  * @param {Array} places - Array of place objects from the API.
  */
 function displayPlaces(places) {
@@ -170,14 +247,21 @@ function displayPlaces(places) {
         const placeId = place.id || '';
         const placeName = place.name || place.title || 'Unnamed place';
         const placePrice = place.price || place.price_by_night || 0;
+        const rating = place.review_count
+            ? `⭐ ${place.average_rating.toFixed(1)} (${place.review_count})`
+            : 'No reviews yet';
 
         const card = document.createElement('div');
         card.className = 'place-card';
-        card.dataset.price = placePrice;
+
+        // Search snippets come HTML-escaped from the API, matches in <mark>
+        const snippet = place.snippet ? `<p class="snippet">${place.snippet}</p>` : '';
 
         card.innerHTML = `
             <h3>${placeName}</h3>
             <p class="price">$${placePrice} / night</p>
+            <p class="rating">${rating}</p>
+            ${snippet}
             <a href="place.html?id=${placeId}" class="details-button">View Details</a>
         `;
 
@@ -186,27 +270,76 @@ function displayPlaces(places) {
 }
 
 /**
- * Initializes the client-side price filter.
- * Hides or shows cards based on the selected maximum price.
+ * Searches the places server-side (full-text) as the user types.
+ * An empty query shows every place again.
  */
-function setupPriceFilter() {
-    const filter = document.getElementById('price-filter');
-    if (!filter) return;
+function setupSearch() {
+    const input = document.getElementById('search-input');
+    if (!input) return;
+
+    let timer = null;
+    input.addEventListener('input', () => {
+        clearTimeout(timer);
+        timer = setTimeout(() => searchPlaces(input.value.trim()), SEARCH_DELAY_MS);
+    });
+}
 
-    filter.addEventListener('change', (event) => {
-        const selected = event.target.value;
-        const cards = document.querySelectorAll('.place-card');
+async function searchPlaces(query) {
+    // Responses may arrive out of order: only the latest search is shown
+    const search = ++latestSearch;
+    const loadMore = document.getElementById('load-more');
+    if (loadMore) {
+        loadMore.style.display = !query && nextCursor ? 'block' : 'none';
+    }
+    if (!query) {
+        displayPlaces(allPlaces);
+        return;
+    }
+    try {
+        const response = await fetch(`${API_URL}/places/search?q=${encodeURIComponent(query)}&limit=50&fields=${CARD_FIELDS}`);
+        if (!response.ok) {
+            throw new Error('Search failed');
+        }
+        const page = await response.json();
+        if (search === latestSearch) {
+            displayPlaces(page.items);
+        }
+    } catch (error) {
+        if (search === latestSearch) {
+            displayPlaces([]);
+        }
+    }
+}
 
-        cards.forEach(card => {
-            const price = parseFloat(card.dataset.price);
+/**
+ * Initializes the listing controls: maximum price, sort order and "Load more".
+ * The API filters and sorts the places; only the shown page is downloaded.
+ */
+function setupListingFilters() {
+    const filter = document.getElementById('price-filter');
+    if (filter) {
+        filter.addEventListener('change', (event) => {
+            listing.priceMax = event.target.value;
+            fetchPlaces(getCookie('token'));
+        });
+    }
 
-            if (selected === 'all' || price <= parseFloat(selected)) {
-                card.style.display = 'flex';
-            } else {
-                card.style.display = 'none';
+    const sort = document.getElementById('sort-select');
+    if (sort) {
+        sort.addEventListener('change', (event) => {
+            listing.sort = event.target.value;
+            fetchPlaces(getCookie('token'));
+        });
+    }
+
+    const loadMore = document.getElementById('load-more');
+    if (loadMore) {
+        loadMore.addEventListener('click', () => {
+            if (nextCursor) {
+                fetchPlaces(getCookie('token'), nextCursor);
             }
         });
-    });
+    }
 }
 
 /*PLACE DETAILS HELPERS */
@@ -220,8 +353,11 @@ async function fetchPlaceDetails(token, placeId) {
             headers['Authorization'] = `Bearer ${token}`;
         }
 
-        const response = await fetch(`${API_URL}/places/${placeId}`, {
+        // The reviews come embedded: one request for the whole page
+        const response = await fetch(`${API_URL}/places/${placeId}?include=reviews`, {
             method: 'GET',
+            // Revalidate with the ETag: a 304 when nothing changed
+            cache: 'no-cache',
             headers: headers
         });
 
@@ -231,7 +367,7 @@ async function fetchPlaceDetails(token, placeId) {
 
         const place = await response.json();
         displayPlaceDetails(place);
-        fetchReviews(token, placeId);
+        displayReviews(place.reviews);
 
         // Hide add review section if user is owner
         const addReviewSection = document.getElementById('add-review-section');
@@ -343,30 +479,6 @@ function displayPlaceDetails(place) {
     `;
 }
 
-async function fetchReviews(token, placeId) {
-    try {
-        const headers = {
-            'Content-Type': 'application/json'
-        };
-
-        if (token) {
-            headers['Authorization'] = `Bearer ${token}`;
-        }
-
-        const response = await fetch(`${API_URL}/reviews/places/${placeId}/reviews`, {
-            method: 'GET',
-            headers: headers
-        });
-
-        if (!response.ok) return;
-
-        const reviews = await response.json();
-        displayReviews(reviews);
-    } catch (error) {
-        console.error('Could not load reviews');
-    }
-}
-
 function displayReviews(reviews) {
     const section = document.getElementById('reviews-list');
     if (!section) return;
@@ -497,7 +609,8 @@ document.addEventListener('DOMContentLoaded', () => {
     const placesList = document.getElementById('places-list');
     if (placesList) {
         checkAuthIndex();
-        setupPriceFilter();
+        setupSearch();
+        setupListingFilters();
     }
 
     /* -- PLACE DETAILS PAGE -- */